@@ -1,14 +1,23 @@
-# Make app a package
-from .billing_app import BillingApp
-from .admin_features import AdminFeatures
-from .billing_operations import BillingOperations
-from .product_operations import ProductOperations
-
 # src/app/__init__.py
 """
 Application module for RITE ELECTRICALS Billing System
+
+The UI classes are imported on first use, so the models, the report
+engine and the maintenance CLI work without Tk or a display.
 """
-from .billing_app import BillingApp
-from .admin_features import AdminFeatures
 
-__all__ = ['BillingApp', 'AdminFeatures']
\ No newline at end of file
+__all__ = ['BillingApp', 'AdminFeatures', 'BillingOperations', 'ProductOperations']
+
+_LAZY = {
+    'BillingApp': '.billing_app',
+    'AdminFeatures': '.admin_features',
+    'BillingOperations': '.billing_operations',
+    'ProductOperations': '.product_operations'
+}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        import importlib
+        return getattr(importlib.import_module(_LAZY[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
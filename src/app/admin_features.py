@@ -1,11 +1,11 @@
 # src/app/admin_features.py
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import csv
-import os
 from datetime import datetime
 from tkcalendar import DateEntry
 
+from .ui.components.virtual_grid import VirtualGrid
+
 class AdminFeatures:
     """Admin-only features for the application"""
     
@@ -51,6 +51,8 @@ class AdminFeatures:
         reports_menu.add_command(label="Fortnight Report", command=lambda: self.generate_sales_report("fortnight"))
         reports_menu.add_command(label="Monthly Report", command=lambda: self.generate_sales_report("monthly"))
         reports_menu.add_command(label="Custom Date Report", command=lambda: self.generate_sales_report("custom"))
+        reports_menu.add_separator()
+        reports_menu.add_command(label="Rebuild Sales Rollups", command=self.rebuild_sales_rollups)
         menubar.add_cascade(label="Sales Report", menu=reports_menu)
         
         self.app.root.config(menu=menubar)
@@ -59,28 +61,13 @@ class AdminFeatures:
     # Add this method to get brands
     def get_brands(self):
         """Get unique brands from products"""
-        return sorted(set(p.get("Brand", "") for p in self.app.products))
+        return self.app.catalog.brands()
     
     # Add this method to load customers
     def _load_customers(self):
         """Load customers from CSV file"""
-        if not os.path.exists("customers.csv"):
-            return []
-            
-        customers = []
-        try:
-            with open("customers.csv", mode="r", encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    customers.append({
-                        "Name": row.get("Name", ""),
-                        "Phone": row.get("Phone", ""),
-                        "Place": row.get("Place", ""),
-                        "Site": row.get("Site", "")
-                    })
-        except Exception as e:
-            print(f"Error loading customers: {str(e)}")
-        return customers
+        from .utils.file_operations import load_customers
+        return load_customers()
     
     def add_product_window(self):
         """Open add product window - FULL implementation"""
@@ -156,7 +143,7 @@ class AdminFeatures:
         def update_product_suggestions(event=None):
             selected_brand = brand_entry.get()
             if selected_brand:
-                products = [p['Product Name'] for p in self.app.products if p['Brand'] == selected_brand]
+                products = [p.name for p in self.app.catalog.products_for_brand(selected_brand)]
                 name_entry['values'] = products
             else:
                 name_entry['values'] = []
@@ -168,32 +155,27 @@ class AdminFeatures:
             
             if selected_brand and selected_product:
                 # Find existing product
-                existing_product = None
-                for product in self.app.products:
-                    if (product['Brand'].strip().lower() == selected_brand.strip().lower() and 
-                        product['Product Name'].strip().lower() == selected_product.strip().lower()):
-                        existing_product = product
-                        break
+                existing_product = self.app.catalog.find(selected_brand, selected_product)
                 
                 if existing_product:
                     # Auto-fill all fields with existing data
                     purchase_entry.delete(0, tk.END)
-                    purchase_entry.insert(0, existing_product.get('Purchase Rate', '0'))
+                    purchase_entry.insert(0, f"{existing_product.purchase_rate:.2f}")
                     
                     margin1_entry.delete(0, tk.END)
-                    margin1_entry.insert(0, existing_product.get('Margin1 (%)', '0'))
+                    margin1_entry.insert(0, f"{existing_product.margin1:.2f}")
                     
-                    wholesale_rate_var.set(existing_product.get('Wholesale Rate', '0'))
+                    wholesale_rate_var.set(f"{existing_product.wholesale_rate:.2f}")
                     
                     margin2_entry.delete(0, tk.END)
-                    margin2_entry.insert(0, existing_product.get('Margin2 (%)', '0'))
+                    margin2_entry.insert(0, f"{existing_product.margin2:.2f}")
                     
-                    retail_rate_var.set(existing_product.get('Retail Rate', '0'))
+                    retail_rate_var.set(f"{existing_product.retail_rate:.2f}")
                     
                     # Set opening stock to previous closing stock
-                    previous_closing = existing_product.get('Closing Stock', '0')
+                    previous_closing = existing_product.closing_stock
                     opening_entry.delete(0, tk.END)
-                    opening_entry.insert(0, previous_closing)
+                    opening_entry.insert(0, str(previous_closing))
                     
                     # Reset purchased stock for new purchase entry
                     purchased_entry.delete(0, tk.END)
@@ -250,6 +232,9 @@ class AdminFeatures:
         
         # Save function
         def save_product():
+            from .models.product import Product
+            from .models.stock_ledger import OPENING, ADJUSTMENT
+            
             try:
                 brand = brand_entry.get()
                 name = name_entry.get()
@@ -270,7 +255,6 @@ class AdminFeatures:
                 
                 new_purchased_qty = int(purchased_entry.get() or 0)
                 opening = int(opening_entry.get() or 0)
-                closing = opening + new_purchased_qty
                 modified_date = datetime.now().strftime("%Y-%m-%d")
                 
                 if not brand or not name:
@@ -278,22 +262,11 @@ class AdminFeatures:
                     return
                 
                 # Check if product already exists
-                existing_index = -1
-                for i, product in enumerate(self.app.products):
-                    if product['Brand'].strip().lower() == brand.strip().lower() and \
-                    product['Product Name'].strip().lower() == name.strip().lower():
-                        existing_index = i
-                        break
+                existing_product = self.app.catalog.find(brand, name)
                 
-                if existing_index >= 0:
+                if existing_product:
                     # UPDATE EXISTING PRODUCT
-                    existing_product = self.app.products[existing_index]
-                    
-                    # Get current values
-                    current_opening = int(existing_product.get('Opening Stock', 0))
-                    current_purchased = int(existing_product.get('Purchased Stock', 0))
-                    current_sold = int(existing_product.get('Sold Stock', 0))
-                    current_closing = int(existing_product.get('Closing Stock', 0))
+                    previous_closing = existing_product.closing_stock
                     
                     # For Sales Entry->Add Product:
                     new_opening = opening  # From entry field (should be previous closing)
@@ -302,39 +275,44 @@ class AdminFeatures:
                     new_closing = new_opening + new_purchased
                     
                     # Update existing product
-                    self.app.products[existing_index].update({
-                        "Purchase Date": purchase_date,
-                        "Purchase Rate": f"{purchase_rate:.2f}",
-                        "Margin1 (%)": f"{margin1:.2f}",
-                        "Wholesale Rate": f"{wholesale_rate:.2f}",
-                        "Margin2 (%)": f"{margin2:.2f}",
-                        "Retail Rate": f"{retail_rate:.2f}",
-                        "Opening Stock": str(new_opening),
-                        "Purchased Stock": str(new_purchased),
-                        "Sold Stock": str(new_sold),
-                        "Closing Stock": str(new_closing),
-                        "Modified Date": modified_date
-                    })
+                    self.app.catalog.update(
+                        existing_product,
+                        purchase_date=purchase_date,
+                        purchase_rate=purchase_rate,
+                        margin1=margin1,
+                        wholesale_rate=wholesale_rate,
+                        margin2=margin2,
+                        retail_rate=retail_rate,
+                        opening_stock=new_opening,
+                        purchased_stock=new_purchased,
+                        sold_stock=new_sold,
+                        modified_date=modified_date
+                    )
+                    
+                    # The stored spelling, so the movement lands on the same product
+                    movement = (ADJUSTMENT, existing_product.brand, existing_product.name,
+                                new_closing - previous_closing, "admin", purchase_rate)
                     
                     action_message = f"Product updated successfully!\nOpening Stock: {new_opening}\nNew Purchased: {new_purchased}\nClosing Stock: {new_closing}"
                 else:
                     # Add new product
-                    new_product = {
-                        "Brand": brand,
-                        "Product Name": name,
-                        "Purchase Date": purchase_date,
-                        "Purchase Rate": f"{purchase_rate:.2f}",
-                        "Margin1 (%)": f"{margin1:.2f}",
-                        "Wholesale Rate": f"{wholesale_rate:.2f}",
-                        "Margin2 (%)": f"{margin2:.2f}",
-                        "Retail Rate": f"{retail_rate:.2f}",
-                        "Opening Stock": str(opening),
-                        "Purchased Stock": str(new_purchased_qty),
-                        "Sold Stock": "0",
-                        "Closing Stock": str(closing),
-                        "Modified Date": modified_date
-                    }
-                    self.app.products.append(new_product)
+                    new_product = Product(
+                        brand=brand,
+                        name=name,
+                        purchase_date=purchase_date,
+                        purchase_rate=purchase_rate,
+                        margin1=margin1,
+                        wholesale_rate=wholesale_rate,
+                        margin2=margin2,
+                        retail_rate=retail_rate,
+                        opening_stock=opening,
+                        purchased_stock=new_purchased_qty,
+                        sold_stock=0,
+                        modified_date=modified_date
+                    )
+                    self.app.catalog.add(new_product)
+                    movement = (OPENING, new_product.brand, new_product.name,
+                                new_product.closing_stock, "admin", purchase_rate)
                     action_message = "New product added successfully!"
                 
                 # Save to CSV - IMPORT HERE TO AVOID CIRCULAR IMPORT
@@ -344,9 +322,7 @@ class AdminFeatures:
                     # Try relative import
                     from ..models.product import ProductModel
                 
-                if ProductModel.save_products(self.app.products):
-                    # Reload products
-                    self.app.load_products()
+                if ProductModel.save_changes(self.app.catalog, [movement]):
                     messagebox.showinfo("Success", action_message)
                     add_window.destroy()
             
@@ -361,7 +337,7 @@ class AdminFeatures:
 
     def get_brands(self):
         """Get unique brands from products"""
-        return sorted(set(p["Brand"] for p in self.app.products))
+        return self.app.catalog.brands()
     
     def view_products(self):
         """Open view products window - FULL implementation"""
@@ -371,74 +347,24 @@ class AdminFeatures:
         view_window.title("Product List")
         view_window.geometry("1200x600")
         
-        # Treeview with scrollbars
-        tree_frame = tk.Frame(view_window)
-        tree_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        
-        scroll_y = tk.Scrollbar(tree_frame)
-        scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        scroll_x = tk.Scrollbar(tree_frame, orient=tk.HORIZONTAL)
-        scroll_x.pack(side=tk.BOTTOM, fill=tk.X)
-        
-        tree = ttk.Treeview(tree_frame, columns=(
-            "Brand", "Product", "Purchase Date", "Purchase Rate", "Margin1", 
-            "Wholesale", "Margin2", "Retail", "Opening", "Purchased", 
-            "Sold", "Closing", "Modified"
-        ), yscrollcommand=scroll_y.set, xscrollcommand=scroll_x.set)
-        
-        scroll_y.config(command=tree.yview)
-        scroll_x.config(command=tree.xview)
-        
-        # Configure columns to align left
-        tree.heading("Brand", text="Brand", anchor="w")
-        tree.heading("Product", text="Product", anchor="w")
-        tree.heading("Purchase Date", text="Purchase Date", anchor="w")
-        tree.heading("Purchase Rate", text="Purchase Rate", anchor="e")
-        tree.heading("Margin1", text="Margin1 (%)", anchor="e")
-        tree.heading("Wholesale", text="Wholesale", anchor="e")
-        tree.heading("Margin2", text="Margin2 (%)", anchor="e")
-        tree.heading("Retail", text="Retail", anchor="e")
-        tree.heading("Opening", text="Opening", anchor="e")
-        tree.heading("Purchased", text="Purchased", anchor="e")
-        tree.heading("Sold", text="Sold", anchor="e")
-        tree.heading("Closing", text="Closing", anchor="e")
-        tree.heading("Modified", text="Modified", anchor="w")
-        
-        tree.column("#0", width=0, stretch=tk.NO)
-        tree.column("Brand", width=100, anchor="w")
-        tree.column("Product", width=150, anchor="w")
-        tree.column("Purchase Date", width=100, anchor="w")
-        tree.column("Purchase Rate", width=80, anchor="e")
-        tree.column("Margin1", width=70, anchor="e")
-        tree.column("Wholesale", width=80, anchor="e")
-        tree.column("Margin2", width=70, anchor="e")
-        tree.column("Retail", width=80, anchor="e")
-        tree.column("Opening", width=70, anchor="e")
-        tree.column("Purchased", width=70, anchor="e")
-        tree.column("Sold", width=70, anchor="e")
-        tree.column("Closing", width=70, anchor="e")
-        tree.column("Modified", width=100, anchor="w")
-        
-        # Add data to treeview
-        for product in self.app.products:
-            tree.insert("", tk.END, values=(
-                product.get("Brand", ""),
-                product.get("Product Name", ""),
-                product.get("Purchase Date", ""),
-                product.get("Purchase Rate", "0"),
-                product.get("Margin1 (%)", "0"),
-                product.get("Wholesale Rate", "0"),
-                product.get("Margin2 (%)", "0"),
-                product.get("Retail Rate", "0"),
-                product.get("Opening Stock", "0"),
-                product.get("Purchased Stock", "0"),
-                product.get("Sold Stock", "0"),
-                product.get("Closing Stock", "0"),
-                product.get("Modified Date", "")
-            ))
-        
-        tree.pack(fill=tk.BOTH, expand=True)
+        # Virtual grid: only the visible rows are materialized
+        tree = VirtualGrid(view_window, [
+            ("Brand", "Brand", 100, "w"),
+            ("Product", "Product", 150, "w"),
+            ("Purchase Date", "Purchase Date", 100, "w"),
+            ("Purchase Rate", "Purchase Rate", 80, "e"),
+            ("Margin1", "Margin1 (%)", 70, "e"),
+            ("Wholesale", "Wholesale", 80, "e"),
+            ("Margin2", "Margin2 (%)", 70, "e"),
+            ("Retail", "Retail", 80, "e"),
+            ("Opening", "Opening", 70, "e"),
+            ("Purchased", "Purchased", 70, "e"),
+            ("Sold", "Sold", 70, "e"),
+            ("Closing", "Closing", 70, "e"),
+            ("Modified", "Modified", 100, "w")
+        ], formatter=self._product_values, searchable=True)
+        tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        tree.set_items(self.app.products)
         
         # Add delete button for admin
         btn_frame = tk.Frame(view_window)
@@ -451,9 +377,12 @@ class AdminFeatures:
         tk.Button(btn_frame, text="Refresh", 
                 command=lambda t=tree, w=view_window: self.refresh_products_view(t, w)).pack(side=tk.LEFT, padx=5)
         
-        tk.Button(btn_frame, text="Export to CSV", 
+        tk.Button(btn_frame, text="Export...", 
                 command=self.export_products_to_csv).pack(side=tk.LEFT, padx=5)
         
+        tk.Button(btn_frame, text="Import from CSV", 
+                command=lambda t=tree, w=view_window: self.import_products_from_csv(t, w)).pack(side=tk.LEFT, padx=5)
+        
         tk.Button(btn_frame, text="Close", 
                 command=view_window.destroy).pack(side=tk.RIGHT, padx=5)
 
@@ -464,16 +393,13 @@ class AdminFeatures:
             messagebox.showerror("Error", "Please select a product to delete")
             return
             
-        item = tree.item(selected[0])
-        values = item['values']
+        product = selected[0]
         
-        if not messagebox.askyesno("Confirm", f"Delete product {values[1]}?"):
+        if not messagebox.askyesno("Confirm", f"Delete product {product.name}?"):
             return
             
         # Remove from products list
-        self.app.products = [p for p in self.app.products 
-                            if not (p.get("Brand", "") == values[0] and 
-                                p.get("Product Name", "") == values[1])]
+        self.app.catalog.remove(product.brand, product.name)
         
         # Try to save to CSV - IMPORT HERE
         try:
@@ -482,45 +408,45 @@ class AdminFeatures:
             except ImportError:
                 from ..models.product import ProductModel
             
-            if ProductModel.save_products(self.app.products):
+            if ProductModel.save_changes(self.app.catalog):
                 messagebox.showinfo("Success", "Product deleted successfully!")
                 # Refresh the view
-                self.refresh_products_view(tree, tree.master.master)  # Get toplevel window
+                self.refresh_products_view(tree, tree.winfo_toplevel())
         except Exception as e:
             messagebox.showerror("Error", f"Failed to delete product: {str(e)}")
 
+    @staticmethod
+    def _product_values(product):
+        """Product List row for a product"""
+        row = product.to_row()
+        return (
+            row["Brand"],
+            row["Product Name"],
+            row["Purchase Date"],
+            row["Purchase Rate"],
+            row["Margin1 (%)"],
+            row["Wholesale Rate"],
+            row["Margin2 (%)"],
+            row["Retail Rate"],
+            row["Opening Stock"],
+            row["Purchased Stock"],
+            row["Sold Stock"],
+            row["Closing Stock"],
+            row["Modified Date"]
+        )
+
     def refresh_products_view(self, tree, window):
         """Refresh the products view"""
-        # Reload products
-        self.app.load_products()
-        
-        # Clear the tree
-        for item in tree.get_children():
-            tree.delete(item)
-        
-        # Add data to treeview
-        for product in self.app.products:
-            tree.insert("", tk.END, values=(
-                product.get("Brand", ""),
-                product.get("Product Name", ""),
-                product.get("Purchase Date", ""),
-                product.get("Purchase Rate", "0"),
-                product.get("Margin1 (%)", "0"),
-                product.get("Wholesale Rate", "0"),
-                product.get("Margin2 (%)", "0"),
-                product.get("Retail Rate", "0"),
-                product.get("Opening Stock", "0"),
-                product.get("Purchased Stock", "0"),
-                product.get("Sold Stock", "0"),
-                product.get("Closing Stock", "0"),
-                product.get("Modified Date", "")
-            ))
+        tree.set_items(self.app.products)
 
     def export_products_to_csv(self):
-        """Export products to CSV file"""
+        """Export products to CSV, JSON Lines or Excel, streamed from the product store"""
+        from .utils.exporters import export_products, FILETYPES
+        from .models.product import ProductModel
+        
         filename = filedialog.asksaveasfilename(
             defaultextension=".csv",
-            filetypes=[("CSV files", "*.csv")],
+            filetypes=FILETYPES,
             title="Save products as"
         )
         
@@ -528,38 +454,32 @@ class AdminFeatures:
             return
             
         try:
-            with open(filename, mode="w", newline="", encoding='utf-8') as file:
-                writer = csv.writer(file)
-                
-                # Write headers
-                writer.writerow([
-                    "Brand", "Product Name", "Purchase Date", "Purchase Rate", 
-                    "Margin1 (%)", "Wholesale Rate", "Margin2 (%)", "Retail Rate",
-                    "Opening Stock", "Purchased Stock", "Sold Stock", "Closing Stock", "Modified Date"
-                ])
-                
-                # Write data
-                for product in self.app.products:
-                    writer.writerow([
-                        product.get("Brand", ""),
-                        product.get("Product Name", ""),
-                        product.get("Purchase Date", ""),
-                        product.get("Purchase Rate", "0"),
-                        product.get("Margin1 (%)", "0"),
-                        product.get("Wholesale Rate", "0"),
-                        product.get("Margin2 (%)", "0"),
-                        product.get("Retail Rate", "0"),
-                        product.get("Opening Stock", "0"),
-                        product.get("Purchased Stock", "0"),
-                        product.get("Sold Stock", "0"),
-                        product.get("Closing Stock", "0"),
-                        product.get("Modified Date", "")
-                    ])
-            
-            messagebox.showinfo("Success", f"Products exported to {filename}")
+            ProductModel.save_changes(self.app.catalog)
+            ProductModel.wait_for_queued_writes()
+            count = export_products(filename, ProductModel.get_store())
+            messagebox.showinfo("Success", f"{count} products exported to {filename}")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to export products: {str(e)}")
     
+    def import_products_from_csv(self, tree, window):
+        """Import products from a CSV file into the product store"""
+        filename = filedialog.askopenfilename(
+            filetypes=[("CSV files", "*.csv")],
+            title="Import products from"
+        )
+        
+        if not filename:
+            return
+            
+        try:
+            from .models.product import ProductModel
+            count = ProductModel.import_csv(filename)
+            self.app.load_products()  # the import wrote to the store directly
+            self.refresh_products_view(tree, window)
+            messagebox.showinfo("Success", f"Imported {count} products from {filename}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to import products: {str(e)}")
+    
     def rate_change_window(self):
         """Open rate change window"""
         print("💰 Opening Rate Change Window...")
@@ -573,23 +493,8 @@ class AdminFeatures:
     # Helper method to load customers without import issues
     def _load_customers(self):
         """Load customers from CSV file"""
-        if not os.path.exists("customers.csv"):
-            return []
-            
-        customers = []
-        try:
-            with open("customers.csv", mode="r", encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    customers.append({
-                        "Name": row.get("Name", ""),
-                        "Phone": row.get("Phone", ""),
-                        "Place": row.get("Place", ""),
-                        "Site": row.get("Site", "")
-                    })
-        except Exception as e:
-            print(f"Error loading customers: {str(e)}")
-        return customers
+        from .utils.file_operations import load_customers
+        return load_customers()
     
     def view_customers(self):
         """Open view customers window - FULL implementation"""
@@ -601,36 +506,15 @@ class AdminFeatures:
         view_window.title("Customer List")
         view_window.geometry("800x400")
         
-        # Treeview with scrollbar
-        tree_frame = tk.Frame(view_window)
-        tree_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        
-        scroll_y = tk.Scrollbar(tree_frame)
-        scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        tree = ttk.Treeview(tree_frame, columns=("Name", "Phone", "Place", "Site"), yscrollcommand=scroll_y.set)
-        scroll_y.config(command=tree.yview)
-        
-        tree.heading("Name", text="Name", anchor="w")
-        tree.heading("Phone", text="Phone", anchor="w")
-        tree.heading("Place", text="Place", anchor="w")
-        tree.heading("Site", text="Site", anchor="w")
-        
-        tree.column("#0", width=0, stretch=tk.NO)
-        tree.column("Name", width=200, anchor="w")
-        tree.column("Phone", width=150, anchor="w")
-        tree.column("Place", width=150, anchor="w")
-        tree.column("Site", width=150, anchor="w")
-        
-        for customer in customers:
-            tree.insert("", tk.END, values=(
-                customer.get('Name', ''),
-                customer.get('Phone', ''),
-                customer.get('Place', ''),
-                customer.get('Site', '')
-            ))
-        
-        tree.pack(fill=tk.BOTH, expand=True)
+        tree = VirtualGrid(view_window, [
+            ("Name", "Name", 200, "w"),
+            ("Phone", "Phone", 150, "w"),
+            ("Place", "Place", 150, "w"),
+            ("Site", "Site", 150, "w")
+        ], formatter=lambda c: (c.get('Name', ''), c.get('Phone', ''), c.get('Place', ''), c.get('Site', '')),
+           searchable=True)
+        tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        tree.set_items(customers)
         
         # Buttons
         btn_frame = tk.Frame(view_window)
@@ -639,7 +523,7 @@ class AdminFeatures:
         tk.Button(btn_frame, text="Refresh", 
                 command=lambda t=tree: self.refresh_customers_view(t)).pack(side=tk.LEFT, padx=5)
         
-        tk.Button(btn_frame, text="Export to CSV", 
+        tk.Button(btn_frame, text="Export...", 
                 command=self.export_customers_to_csv).pack(side=tk.LEFT, padx=5)
         
         tk.Button(btn_frame, text="Close", 
@@ -647,28 +531,16 @@ class AdminFeatures:
 
     def refresh_customers_view(self, tree):
         """Refresh the customers view"""
-        customers = self._load_customers()
-        
-        # Clear the tree
-        for item in tree.get_children():
-            tree.delete(item)
-        
-        # Add data
-        for customer in customers:
-            tree.insert("", tk.END, values=(
-                customer.get('Name', ''),
-                customer.get('Phone', ''),
-                customer.get('Place', ''),
-                customer.get('Site', '')
-            ))
+        tree.set_items(self._load_customers())
 
     def export_customers_to_csv(self):
-        """Export customers to CSV file"""
-        customers = self._load_customers()
+        """Export customers to CSV, JSON Lines or Excel from the customer directory"""
+        from .utils.exporters import export_customers, FILETYPES
+        from .models.customer_store import CustomerStore
         
         filename = filedialog.asksaveasfilename(
             defaultextension=".csv",
-            filetypes=[("CSV files", "*.csv")],
+            filetypes=FILETYPES,
             title="Save customers as"
         )
         
@@ -676,22 +548,8 @@ class AdminFeatures:
             return
             
         try:
-            with open(filename, mode="w", newline="", encoding='utf-8') as file:
-                writer = csv.writer(file)
-                
-                # Write headers
-                writer.writerow(["Name", "Phone", "Place", "Site"])
-                
-                # Write data
-                for customer in customers:
-                    writer.writerow([
-                        customer.get('Name', ''),
-                        customer.get('Phone', ''),
-                        customer.get('Place', ''),
-                        customer.get('Site', '')
-                    ])
-            
-            messagebox.showinfo("Success", f"Customers exported to {filename}")
+            count = export_customers(filename, CustomerStore.get())
+            messagebox.showinfo("Success", f"{count} customers exported to {filename}")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to export customers: {str(e)}")
     
@@ -712,142 +570,93 @@ class AdminFeatures:
     
     def view_stocks(self):
         """Open stock summary window - FULL implementation"""
+        from .models.cost_layers import CostLayers
+        from .utils.stock_summary import stock_summary, LOW_STOCK_THRESHOLD
+        
         print("📦 Opening Stock Summary...")
         
         view_window = tk.Toplevel(self.app.root)
         view_window.title("Stock Summary")
         view_window.geometry("800x600")
         
-        # Refresh products data first
-        self.app.load_products()
-        
-        # Treeview with scrollbars
-        tree_frame = tk.Frame(view_window)
-        tree_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        
-        scroll_y = tk.Scrollbar(tree_frame)
-        scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        scroll_x = tk.Scrollbar(tree_frame, orient=tk.HORIZONTAL)
-        scroll_x.pack(side=tk.BOTTOM, fill=tk.X)
-        
-        tree = ttk.Treeview(tree_frame, columns=(
-            "Brand", "Product", "Opening", "Purchased", "Sold", "Closing"
-        ), yscrollcommand=scroll_y.set, xscrollcommand=scroll_x.set)
-        
-        scroll_y.config(command=tree.yview)
-        scroll_x.config(command=tree.xview)
-        
-        tree.heading("Brand", text="Brand", anchor="w")
-        tree.heading("Product", text="Product", anchor="w")
-        tree.heading("Opening", text="Opening Stock", anchor="e")
-        tree.heading("Purchased", text="Purchased Stock", anchor="e")
-        tree.heading("Sold", text="Sold Stock", anchor="e")
-        tree.heading("Closing", text="Closing Stock", anchor="e")
-        
-        tree.column("#0", width=0, stretch=tk.NO)
-        tree.column("Brand", width=150, anchor="w")
-        tree.column("Product", width=200, anchor="w")
-        tree.column("Opening", width=100, anchor="e")
-        tree.column("Purchased", width=100, anchor="e")
-        tree.column("Sold", width=100, anchor="e")
-        tree.column("Closing", width=100, anchor="e")
-        
-        # Add debug information
-        print(f"DEBUG: Displaying {len(self.app.products)} products in Stock Summary")
-        
-        for product in self.app.products:
-            brand = product.get("Brand", "")
-            product_name = product.get("Product Name", "")
-            opening = product.get("Opening Stock", "0")
-            purchased = product.get("Purchased Stock", "0")
-            sold = product.get("Sold Stock", "0")
-            closing = product.get("Closing Stock", "0")
-            
-            tree.insert("", tk.END, values=(
-                brand,
-                product_name,
-                opening,
-                purchased,
-                sold,
-                closing
-            ))
-        
-        tree.pack(fill=tk.BOTH, expand=True)
-        
-        # Add summary statistics
-        total_opening = sum(int(p.get("Opening Stock", 0)) for p in self.app.products)
-        total_purchased = sum(int(p.get("Purchased Stock", 0)) for p in self.app.products)
-        total_sold = sum(int(p.get("Sold Stock", 0)) for p in self.app.products)
-        total_closing = sum(int(p.get("Closing Stock", 0)) for p in self.app.products)
+        low_stock = set()
+        tree = VirtualGrid(view_window, [
+            ("Brand", "Brand", 150, "w"),
+            ("Product", "Product", 200, "w"),
+            ("Opening", "Opening Stock", 100, "e"),
+            ("Purchased", "Purchased Stock", 100, "e"),
+            ("Sold", "Sold Stock", 100, "e"),
+            ("Closing", "Closing Stock", 100, "e")
+        ], formatter=lambda p: (p.brand, p.name, p.opening_stock, p.purchased_stock, p.sold_stock, p.closing_stock),
+           tag_func=lambda p: ("low_stock",) if id(p) in low_stock else (),
+           searchable=True)
+        tree.tag_configure("low_stock", foreground="red")
+        tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
         summary_frame = tk.Frame(view_window)
         summary_frame.pack(fill=tk.X, padx=10, pady=5)
         
-        tk.Label(summary_frame, text=f"Total Products: {len(self.app.products)}", 
-                font=("Arial", 10, "bold")).pack(side=tk.LEFT, padx=10)
-        tk.Label(summary_frame, text=f"Total Opening: {total_opening}", 
-                font=("Arial", 10)).pack(side=tk.LEFT, padx=10)
-        tk.Label(summary_frame, text=f"Total Purchased: {total_purchased}", 
-                font=("Arial", 10)).pack(side=tk.LEFT, padx=10)
-        tk.Label(summary_frame, text=f"Total Sold: {total_sold}", 
-                font=("Arial", 10)).pack(side=tk.LEFT, padx=10)
-        tk.Label(summary_frame, text=f"Total Closing: {total_closing}", 
-                font=("Arial", 10, "bold")).pack(side=tk.LEFT, padx=10)
-        
-        # Buttons
-        btn_frame = tk.Frame(view_window)
-        btn_frame.pack(fill=tk.X, pady=5)
-        
         def refresh_stock_view():
-            # Clear the tree
-            for item in tree.get_children():
-                tree.delete(item)
+            # Totals, values and low-stock rows in one vectorized pass
+            summary = stock_summary(self.app.catalog)
+            products = self.app.products
+            low_stock.clear()
+            low_stock.update(id(products[i]) for i in summary["low_stock"])
+            print(f"DEBUG: Displaying {summary['products']} products in Stock Summary")
             
-            # Reload products and refresh the view
-            self.app.load_products()
-            
-            # Repopulate the tree
-            for product in self.app.products:
-                tree.insert("", tk.END, values=(
-                    product.get("Brand", ""),
-                    product.get("Product Name", ""),
-                    product.get("Opening Stock", "0"),
-                    product.get("Purchased Stock", "0"),
-                    product.get("Sold Stock", "0"),
-                    product.get("Closing Stock", "0")
-                ))
+            # Only the visible rows are drawn
+            tree.set_items(products)
             
             # Update summary
-            total_opening = sum(int(p.get("Opening Stock", 0)) for p in self.app.products)
-            total_purchased = sum(int(p.get("Purchased Stock", 0)) for p in self.app.products)
-            total_sold = sum(int(p.get("Sold Stock", 0)) for p in self.app.products)
-            total_closing = sum(int(p.get("Closing Stock", 0)) for p in self.app.products)
-            
             for widget in summary_frame.winfo_children():
                 widget.destroy()
             
-            tk.Label(summary_frame, text=f"Total Products: {len(self.app.products)}", 
+            totals_row = tk.Frame(summary_frame)
+            totals_row.pack(fill=tk.X)
+            values_row = tk.Frame(summary_frame)
+            values_row.pack(fill=tk.X)
+            
+            tk.Label(totals_row, text=f"Total Products: {summary['products']}", 
+                    font=("Arial", 10, "bold")).pack(side=tk.LEFT, padx=10)
+            tk.Label(totals_row, text=f"Total Opening: {summary['opening']}", 
+                    font=("Arial", 10)).pack(side=tk.LEFT, padx=10)
+            tk.Label(totals_row, text=f"Total Purchased: {summary['purchased']}", 
+                    font=("Arial", 10)).pack(side=tk.LEFT, padx=10)
+            tk.Label(totals_row, text=f"Total Sold: {summary['sold']}", 
+                    font=("Arial", 10)).pack(side=tk.LEFT, padx=10)
+            tk.Label(totals_row, text=f"Total Closing: {summary['closing']}", 
                     font=("Arial", 10, "bold")).pack(side=tk.LEFT, padx=10)
-            tk.Label(summary_frame, text=f"Total Opening: {total_opening}", 
+            tk.Label(totals_row, text=f"Low Stock (<= {LOW_STOCK_THRESHOLD}): {len(summary['low_stock'])}", 
+                    font=("Arial", 10, "bold"), fg="red").pack(side=tk.LEFT, padx=10)
+            
+            tk.Label(values_row, text=f"Value @ Purchase: ₹{summary['value_purchase']:.2f}", 
                     font=("Arial", 10)).pack(side=tk.LEFT, padx=10)
-            tk.Label(summary_frame, text=f"Total Purchased: {total_purchased}", 
+            tk.Label(values_row, text=f"@ Wholesale: ₹{summary['value_wholesale']:.2f}", 
                     font=("Arial", 10)).pack(side=tk.LEFT, padx=10)
-            tk.Label(summary_frame, text=f"Total Sold: {total_sold}", 
+            tk.Label(values_row, text=f"@ Retail: ₹{summary['value_retail']:.2f}", 
                     font=("Arial", 10)).pack(side=tk.LEFT, padx=10)
-            tk.Label(summary_frame, text=f"Total Closing: {total_closing}", 
+            tk.Label(values_row, text=f"Stock Value (FIFO): ₹{CostLayers.get().total_value():.2f}", 
                     font=("Arial", 10, "bold")).pack(side=tk.LEFT, padx=10)
         
+        refresh_stock_view()
+        
+        # Buttons
+        btn_frame = tk.Frame(view_window)
+        btn_frame.pack(fill=tk.X, pady=5)
+        
         tk.Button(btn_frame, text="Refresh", command=refresh_stock_view).pack(side=tk.LEFT, padx=5)
-        tk.Button(btn_frame, text="Export to CSV", 
+        tk.Button(btn_frame, text="Export...", 
                 command=self.export_stock_to_csv).pack(side=tk.LEFT, padx=5)
         tk.Button(btn_frame, text="Close", command=view_window.destroy).pack(side=tk.RIGHT, padx=5)
 
     def export_stock_to_csv(self):
-        """Export stock summary to CSV"""
+        """Export stock summary to CSV, JSON Lines or Excel, streamed from the product store"""
+        from .utils.exporters import export_stock, FILETYPES
+        from .models.product import ProductModel
+        
         filename = filedialog.asksaveasfilename(
             defaultextension=".csv",
-            filetypes=[("CSV files", "*.csv")],
+            filetypes=FILETYPES,
             title="Save stock summary as"
         )
         
@@ -855,24 +664,9 @@ class AdminFeatures:
             return
             
         try:
-            with open(filename, mode="w", newline="", encoding='utf-8') as file:
-                writer = csv.writer(file)
-                
-                # Write headers
-                writer.writerow(["Brand", "Product Name", "Opening Stock", "Purchased Stock", 
-                            "Sold Stock", "Closing Stock"])
-                
-                # Write data
-                for product in self.app.products:
-                    writer.writerow([
-                        product.get("Brand", ""),
-                        product.get("Product Name", ""),
-                        product.get("Opening Stock", "0"),
-                        product.get("Purchased Stock", "0"),
-                        product.get("Sold Stock", "0"),
-                        product.get("Closing Stock", "0")
-                    ])
-            
+            ProductModel.save_changes(self.app.catalog)
+            ProductModel.wait_for_queued_writes()
+            export_stock(filename, ProductModel.get_store())
             messagebox.showinfo("Success", f"Stock summary exported to {filename}")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to export stock summary: {str(e)}")
@@ -896,6 +690,17 @@ class AdminFeatures:
         except Exception as e:
             messagebox.showerror("Error", f"Failed to generate report: {str(e)}")
     
+    def rebuild_sales_rollups(self):
+        """Regenerate the daily sales rollups from the raw bills"""
+        if not messagebox.askyesno("Confirm", "Rebuild daily sales totals from all saved bills?"):
+            return
+        try:
+            from .models.bill_index import BillIndex
+            count = BillIndex.get().rebuild_rollups()
+            messagebox.showinfo("Success", f"Sales rollups rebuilt from {count} bills")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to rebuild sales rollups: {str(e)}")
+    
     # UPDATE THESE METHODS in src/admin_features.py:
 
     def rate_change_window(self):
@@ -944,12 +749,7 @@ class AdminFeatures:
         """Generate sales report"""
         print(f"📈 Generating {report_type} report...")
         try:
-            # Try relative import first
-            try:
-                from ..utils.reports import ReportGenerator
-            except ImportError:
-                # Try absolute import
-                from src.utils.reports import ReportGenerator
+            from .utils.reports import ReportGenerator
             
             ReportGenerator.generate_sales_report(self.app, report_type)
         except Exception as e:
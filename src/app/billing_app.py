@@ -1,6 +1,10 @@
 import tkinter as tk
+from tkinter import messagebox
 from datetime import datetime
 
+from .models.catalog import ProductCatalog
+from .models.bill_items import BillItems
+
 class BillingApp:
     def __init__(self, root):
         self.root = root
@@ -31,6 +35,7 @@ class BillingApp:
         self.set_icon()
         
         self.root.withdraw()  # Hide main window initially
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         
         # Company details
         self.company = {
@@ -48,8 +53,8 @@ class BillingApp:
         self.bill_type = tk.StringVar(value="R")
         self.search_var = tk.StringVar()
         self.qty_var = tk.StringVar(value="1")
-        self.products = []
-        self.bill_items = []
+        self.catalog = ProductCatalog()
+        self.bill_items = BillItems()
         self.user_role = None
         self.place_var = tk.StringVar()
         self.site_var = tk.StringVar()
@@ -67,10 +72,12 @@ class BillingApp:
         self.product_ops = ProductOperations(self)
         self.admin_features = AdminFeatures(self)
         
-        # Load data and show login
+        # Finish bill saves interrupted by a crash, then load data and show login
+        self.recover_pending_writes()
         self.load_products()
         self.show_login()
         self.update_date()
+        self.product_ops.check_and_apply_future_rate_changes()
     
     def set_icon(self):
         """Set application icon"""
@@ -84,8 +91,28 @@ class BillingApp:
             except:
                 print("Icon file not found, running without icon")
     
+    def recover_pending_writes(self):
+        """Replay bill saves left in the write journal by the last run"""
+        from .models.persistence_queue import PersistenceQueue
+        try:
+            queue = PersistenceQueue.get()
+            queue.recover()
+            if queue.pending():
+                messagebox.showwarning("Unsaved Bills",
+                                       f"{queue.pending()} bill(s) from the last run could not be saved yet: "
+                                       f"{queue.last_error}\n\nThey are kept and will be retried.")
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not recover unsaved bills: {str(e)}")
+    
     def on_close(self):
-        """Handle window close event"""
+        """Handle window close event, finishing queued bill saves first"""
+        from .models.persistence_queue import PersistenceQueue
+        queue = PersistenceQueue.get()
+        if not queue.flush(timeout=10):
+            if not messagebox.askyesno("Unsaved Bills",
+                                       f"{queue.pending()} bill(s) are still being saved. "
+                                       "They will be saved next time the app starts.\n\nExit anyway?"):
+                return
         self.root.destroy()
     
     def show_login(self):
@@ -103,18 +130,25 @@ class BillingApp:
         from .ui.main_window import MainWindow
         self.main_ui = MainWindow(self.root, self)
     
+    @property
+    def products(self):
+        """Products in catalog order"""
+        return self.catalog.products
+    
+    @products.setter
+    def products(self, products):
+        self.catalog.replace_all(products)
+    
     def load_products(self):
-        """Load products from file"""
+        """Load products from the product store"""
         from .models.product import ProductModel
-        self.products = ProductModel.load_products()
+        self.catalog.replace_all(ProductModel.load_products())
     
     def update_date(self):
-        """Update current date and check for rate changes"""
+        """Update the current date every minute"""
         self.current_date.set(datetime.now().strftime("%d/%m/%Y %I:%M %p"))
         
-        # Check for future rate changes every minute
-        self.product_ops.check_and_apply_future_rate_changes()
-        
+        # Future rate changes run on their own timer (see ProductOperations)
         self.root.after(60000, self.update_date)
     
     # Delegate methods to modules
@@ -130,8 +164,8 @@ class BillingApp:
         """Get current stock for a product"""
         return self.product_ops.get_current_product_stock(brand, product_name)
     
-    def get_current_rate_for_product(self, product_name, current_date=None):
+    def get_current_rate_for_product(self, brand, product_name, current_date=None):
         """Get current rate for a product"""
-        return self.product_ops.get_current_rate_for_product(product_name, current_date)
+        return self.product_ops.get_current_rate_for_product(brand, product_name, current_date)
 
 
@@ -1,12 +1,8 @@
-import csv
-import os
-from datetime import datetime, timedelta
 import webbrowser
 from tkinter import messagebox
 
-from .utils.calculations import update_closing_stock
-from .utils.file_operations import load_customers, save_customer_to_csv
-from .models.product import ProductModel
+from .models.bill import BillModel
+from .models.persistence_queue import PersistenceQueue
 
 class BillingOperations:
     """Operations for billing and receipt generation"""
@@ -24,168 +20,76 @@ class BillingOperations:
         if not self.app.bill_no.get():
             self.generate_and_set_bill_number()
             
-        filename = f"bill_{self.app.bill_no.get()}.csv"
         try:
-            with open(filename, mode="w", newline="", encoding='utf-8') as file:
-                writer = csv.writer(file)
-                writer.writerow(["Bill No", "Date", "Customer", "Phone", "Type", "Place", "Site", "Payment Type", "Include GST"])
-                writer.writerow([
-                    self.app.bill_no.get(),
-                    self.app.current_date.get(),
-                    self.app.customer_name.get(),
-                    self.app.customer_phone.get(),
-                    "Wholesale" if self.app.bill_type.get() == "W" else "Retail",
-                    self.app.place_var.get(),
-                    self.app.site_var.get(),
-                    self.app.payment_type.get(),
-                    "Yes" if self.app.include_gst.get() else "No"
-                ])
-                
-                writer.writerow([])
-                writer.writerow(["S.No", "Brand", "Product", "Qty", "Rate", "Amount"])
-                
-                for i, item in enumerate(self.app.bill_items, 1):
-                    writer.writerow([
-                        i,
-                        item["brand"],
-                        item["name"],
-                        item["qty"],
-                        item["rate"],
-                        item["amount"]
-                    ])
-                
-                total = sum(item["amount"] for item in self.app.bill_items)
-                if self.app.include_gst.get():
-                    total = total * 1.18  # Add 18% GST
-                
-                amount_paid = float(self.app.amount_paid_var.get() or 0)
-                remaining = max(0, total - amount_paid)
-                
-                writer.writerow([])
-                writer.writerow(["Total", "", "", "", "", f"{total:.2f}"])
-                writer.writerow(["Amount Paid", "", "", "", "", f"{amount_paid:.2f}"])
-                writer.writerow(["Remaining Amount", "", "", "", "", f"{remaining:.2f}"])
-            
-            # Save customer details if provided
-            if self.app.customer_name.get() != "Cash Sale" and self.app.customer_phone.get():
-                save_customer_to_csv(
-                    self.app.customer_phone.get(), 
-                    self.app.customer_name.get(),
-                    self.app.place_var.get(),
-                    self.app.site_var.get()
-                )
-            
-            # Save updated products (with sold stock)
-            if ProductModel.save_products(self.app.products):
-                print("DEBUG: Products saved successfully with sold stock updates")
-                # Reload products to ensure consistency
-                self.app.load_products()
-            else:
-                print("DEBUG: Failed to save products with sold stock")
-            
-            messagebox.showinfo("Success", f"Bill saved as {filename}")
+            self.write_current_bill()
+            messagebox.showinfo("Success", f"Bill {self.app.bill_no.get()} saved")
             
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save bill: {str(e)}")
     
-    def generate_and_set_bill_number(self):
-        """Generate automatic bill number"""
-        import os
-        
-        # Simple sequential numbering
-        if not os.path.exists("last_bill.txt"):
-            with open("last_bill.txt", "w") as f:
-                f.write("1")
+    def write_current_bill(self):
+        """Queue the current bill, its customer and stock for background saving"""
+        customer_data = {
+            "name": self.app.customer_name.get(),
+            "phone": self.app.customer_phone.get(),
+            "type": "Wholesale" if self.app.bill_type.get() == "W" else "Retail",
+            "place": self.app.place_var.get(),
+            "site": self.app.site_var.get()
+        }
+        bill = BillModel.build_bill(
+            self.app.bill_no.get(),
+            self.app.current_date.get(),
+            customer_data,
+            self.app.bill_items,
+            self.app.payment_type.get(),
+            self.app.include_gst.get(),
+            self.app.amount_paid_var.get() or 0
+        )
         
-        with open("last_bill.txt", "r") as f:
-            last_number = int(f.read().strip())
+        # Save customer details if provided
+        customer = None
+        if self.app.customer_name.get() != "Cash Sale" and self.app.customer_phone.get():
+            customer = customer_data
         
-        next_number = last_number + 1
+        # Snapshot the sold products (with sold stock) as they are now
+        sold = []
+        for item in self.app.bill_items:
+            product = self.app.catalog.find(item["brand"], item["name"])
+            if product is not None:
+                sold.append(product)
         
-        with open("last_bill.txt", "w") as f:
-            f.write(str(next_number))
-        
-        bill_number = f"{next_number:04d}"  # Format with leading zeros
+        # Journaled before returning, so the bill survives a crash
+        PersistenceQueue.get().submit_bill(bill, customer, [p.to_record() for p in sold])
+        self.app.catalog.mark_saved(sold)  # the queue writes their stock
+        print(f"DEBUG: Bill {bill['bill_no']} queued for saving")
+    
+    def generate_and_set_bill_number(self):
+        """Generate automatic bill number"""
+        bill_number = BillModel.get_next_bill_number()
         self.app.bill_no.set(bill_number)
+        return bill_number
     
     def save_bill_after_receipt(self):
         """Save bill after generating receipt (without showing save dialog)"""
         if not self.app.bill_items:
             return
             
-        filename = f"bill_{self.app.bill_no.get()}.csv"
         try:
-            with open(filename, mode="w", newline="", encoding='utf-8') as file:
-                writer = csv.writer(file)
-                writer.writerow(["Bill No", "Date", "Customer", "Phone", "Type", "Place", "Site", "Payment Type", "Include GST"])
-                writer.writerow([
-                    self.app.bill_no.get(),
-                    self.app.current_date.get(),
-                    self.app.customer_name.get(),
-                    self.app.customer_phone.get(),
-                    "Wholesale" if self.app.bill_type.get() == "W" else "Retail",
-                    self.app.place_var.get(),
-                    self.app.site_var.get(),
-                    self.app.payment_type.get(),
-                    "Yes" if self.app.include_gst.get() else "No"
-                ])
-                
-                writer.writerow([])
-                writer.writerow(["S.No", "Brand", "Product", "Qty", "Rate", "Amount"])
-                
-                for i, item in enumerate(self.app.bill_items, 1):
-                    writer.writerow([
-                        i,
-                        item["brand"],
-                        item["name"],
-                        item["qty"],
-                        item["rate"],
-                        item["amount"]
-                    ])
-                
-                total = sum(item["amount"] for item in self.app.bill_items)
-                if self.app.include_gst.get():
-                    total = total * 1.18  # Add 18% GST
-                
-                writer.writerow([])
-                writer.writerow(["Total", "", "", "", "", f"{total:.2f}"])
-                
-            # Save customer details if provided
-            if self.app.customer_name.get() != "Cash Sale" and self.app.customer_phone.get():
-                save_customer_to_csv(
-                    self.app.customer_phone.get(), 
-                    self.app.customer_name.get(),
-                    self.app.place_var.get(),
-                    self.app.site_var.get()
-                )
-            
-            # Save updated products (with sold stock)
-            if ProductModel.save_products(self.app.products):
-                print("DEBUG: Products saved successfully after billing receipt!")
-                # Reload products to ensure consistency
-                self.app.load_products()
-            else:
-                print("DEBUG: FAILED to save products after billing receipt!")
+            self.write_current_bill()
             
             # Generate new bill number for next bill
             self.generate_and_set_bill_number()
-            self.app.bill_items = []
+            self.app.bill_items.clear()
             
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save bill: {str(e)}")
     
     def get_receipt_text(self):
         """Generate receipt text for display or sharing"""
-        taxable = sum(item['amount'] for item in self.app.bill_items)
+        taxable = self.app.bill_items.subtotal
         
-        if self.app.include_gst.get():
-            cgst = taxable * 0.09
-            sgst = taxable * 0.09
-            total = taxable + cgst + sgst
-        else:
-            cgst = 0
-            sgst = 0
-            total = taxable
+        cgst, sgst = self.app.bill_items.gst(self.app.include_gst.get())
+        total = self.app.bill_items.total(self.app.include_gst.get())
         
         receipt_lines = [
             "RITE ELECTRICALS",
@@ -266,7 +170,8 @@ class BillingOperations:
             receipt_text = self.get_receipt_text()
             
             # Create WhatsApp URL
-            whatsapp_url = f"https://wa.me/91{phone}?text={receipt_text.replace(' ', '%20').replace('\n', '%0A')}"
+            encoded_text = receipt_text.replace(' ', '%20').replace('\n', '%0A')
+            whatsapp_url = f"https://wa.me/91{phone}?text={encoded_text}"
             
             # Open in default browser
             webbrowser.open(whatsapp_url)
@@ -0,0 +1,272 @@
+# src/app/cli.py
+"""
+Maintenance commands for RITE ELECTRICALS Billing System
+
+Usage (from the data directory):
+    python -m src.app.cli migrate-bills [--dir DIR] [--delete] [--workers N]
+    python -m src.app.cli rebuild-index
+    python -m src.app.cli rebuild-rollups
+    python -m src.app.cli rebuild-receivables
+    python -m src.app.cli balance --customer NAME
+    python -m src.app.cli backup-products
+    python -m src.app.cli list-backups
+    python -m src.app.cli restore-products [--at "YYYY-MM-DD HH:MM"]
+    python -m src.app.cli import-backups [--dir DIR] [--delete]
+    python -m src.app.cli stock-period --from YYYY-MM-DD --to YYYY-MM-DD
+    python -m src.app.cli valuation [--bill BILL_NO]
+    python -m src.app.cli price-history --brand BRAND --product NAME [--at YYYY-MM-DD]
+    python -m src.app.cli report {daily,fortnight,monthly,custom} [--from YYYY-MM-DD --to YYYY-MM-DD]
+                                 [--format text|csv|jsonl|xlsx] [--output FILE]
+    python -m src.app.cli export {products,stock,customers} --output FILE [--format csv|jsonl|xlsx]
+"""
+import argparse
+import glob
+import os
+import sys
+from datetime import datetime
+
+from .models.bill_ingest import ingest_bill_files
+from .models.bill_index import BillIndex
+from .models.product import ProductModel
+from .models.product_backup import ProductBackups, parse_time
+from .models.stock_ledger import StockLedger
+from .models.cost_layers import CostLayers
+from .models.price_history import PriceHistory
+from .models.receivables import Receivables
+from .utils.report_engine import SalesReport, REPORT_TYPES
+from .utils import exporters
+
+
+def migrate_bills(directory=".", delete=False, workers=None):
+    """Ingest legacy bill_*.csv files into the sales ledger, parsing them in parallel"""
+    bill_files = sorted(glob.glob(os.path.join(directory, "bill_*.csv")))
+    migrated, skipped, errors = ingest_bill_files(bill_files, workers=workers, delete=delete)
+    print(f"Migrated {migrated} bills, skipped {skipped} already in the ledger, {len(errors)} failed")
+    if migrated:
+        Receivables.get().sync_with_ledger()
+    return migrated, skipped, len(errors)
+
+
+def list_backups():
+    """Print the retained product snapshots, oldest first"""
+    entries = ProductBackups.get().entries()
+    for when, digest, count in entries:
+        print(f"{when:%Y-%m-%d %H:%M:%S}  {count:6d} products  {digest[:12]}")
+    if not entries:
+        print("No product backups")
+    return len(entries)
+
+
+def stock_period(start, end):
+    """Print opening, movements and closing stock per product for a date range"""
+    summary = StockLedger.get().period_summary(start, end)
+    print(f"{'Brand':<15} {'Product':<25} {'Opening':>8} {'Purch':>7} {'Sold':>7} "
+          f"{'Ret':>5} {'Adj':>5} {'Closing':>8}")
+    for (brand, name), row in summary.items():
+        print(f"{brand[:15]:<15} {name[:25]:<25} {row['opening']:>8} {row['purchased']:>7} "
+              f"{row['sold']:>7} {row['returned']:>5} {row['adjusted']:>5} {row['closing']:>8}")
+    return summary
+
+
+def valuation(bill_no=None):
+    """Print FIFO closing stock value per product, or the COGS of one bill"""
+    layers = CostLayers.get()
+    if bill_no:
+        lines = layers.bill_cogs(bill_no)
+        for brand, name, qty, cost in lines:
+            print(f"{brand[:15]:<15} {name[:25]:<25} {qty:>6} {cost:>12.2f}")
+        print(f"COGS for bill {bill_no}: {sum(line[3] for line in lines):.2f}")
+        return lines
+
+    values = layers.valuation()
+    for (brand, name), (qty, value) in sorted(values.items()):
+        print(f"{brand[:15]:<15} {name[:25]:<25} {qty:>8} {value:>12.2f}")
+    print(f"Closing stock value (FIFO): {sum(v for _, v in values.values()):.2f}")
+    return values
+
+
+def price_history(brand, name, at=None):
+    """Print a product's rate versions, or the rates in effect on one day"""
+    history = PriceHistory.get()
+    if at:
+        rates = history.rate_at(brand, name, at)
+        if rates is None:
+            print(f"No rates recorded for {brand} {name} on or before {at}")
+            return None
+        print(f"{brand} {name} on {at}: purchase {rates['purchase_rate']:.2f}, "
+              f"wholesale {rates['wholesale_rate']:.2f}, retail {rates['retail_rate']:.2f}")
+        return rates
+
+    versions = history.versions(brand, name)
+    for day, rates in versions:
+        print(f"{day}  {rates['purchase_rate']:>10.2f} {rates['wholesale_rate']:>10.2f} "
+              f"{rates['retail_rate']:>10.2f}")
+    if not versions:
+        print(f"No price history for {brand} {name}")
+    return versions
+
+
+def customer_balance(customer):
+    """Print a customer's outstanding balance, last payment and open bills"""
+    receivables = Receivables.get()
+    balance = receivables.balance(customer)
+    if balance is None:
+        print(f"No bills or receipts for {customer}")
+        return None
+    print(f"{customer}: {balance['bills']} bills, sales {balance['total_sales']:.2f}, "
+          f"paid {balance['total_paid']:.2f}, outstanding {balance['balance']:.2f}")
+    if balance['last_payment_date']:
+        print(f"Last payment: {balance['last_payment_amount']:.2f} on {balance['last_payment_date']}")
+    for bill_no, day, total, outstanding in receivables.open_bills(customer):
+        print(f"{bill_no:<10} {day:<10} {total:>12.2f} {outstanding:>12.2f}")
+    return balance
+
+
+def sales_report(report_type, start=None, end=None, output_format="text", output=None):
+    """Write a sales report to stdout or a file"""
+    start = datetime.strptime(start, "%Y-%m-%d").date() if start else None
+    end = datetime.strptime(end, "%Y-%m-%d").date() if end else None
+    report = SalesReport.for_type(report_type, start, end)
+
+    if output and output_format != "text":
+        count = exporters.export_report(output, report, output_format) - 1  # less the TOTAL row
+        print(f"Wrote {count} bills to {output}")
+    elif output:
+        with open(output, mode="w", encoding="utf-8") as file:
+            count = report.write_text(file)
+        print(f"Wrote {count} bills to {output}")
+    elif output_format in ("jsonl", "xlsx"):
+        raise ValueError(f"--output is required for {output_format} reports")
+    else:
+        write = report.write_csv if output_format == "csv" else report.write_text
+        count = write(sys.stdout)
+    return count
+
+
+def export_data(what, output, output_format=None):
+    """Stream products, stock or customers to a CSV, JSON Lines or XLSX file"""
+    if what == "customers":
+        from .models.customer_store import CustomerStore
+        count = exporters.export_customers(output, CustomerStore.get(), output_format)
+    elif what == "stock":
+        count = exporters.export_stock(output, ProductModel.get_store(), output_format)
+    else:
+        count = exporters.export_products(output, ProductModel.get_store(), output_format)
+    print(f"Exported {count} {what} rows to {output}")
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src.app.cli",
+                                     description="RITE ELECTRICALS maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = subparsers.add_parser("migrate-bills", help="Import bill_*.csv files into the sales ledger")
+    migrate_parser.add_argument("--dir", default=".", help="Directory containing bill_*.csv files")
+    migrate_parser.add_argument("--delete", action="store_true", help="Delete each bill file after it is imported")
+    migrate_parser.add_argument("--workers", type=int, help="Parser processes (default: one per CPU)")
+
+    subparsers.add_parser("rebuild-index", help="Rebuild the bill-date index from the sales ledger")
+    subparsers.add_parser("rebuild-rollups", help="Regenerate daily sales rollups from the sales ledger")
+    subparsers.add_parser("rebuild-receivables",
+                          help="Rebuild customer balances from the sales ledger and sales receipts")
+    balance_parser = subparsers.add_parser("balance", help="Outstanding balance and open bills of a customer")
+    balance_parser.add_argument("--customer", required=True, help="Customer name")
+
+    subparsers.add_parser("backup-products", help="Snapshot the product catalog now")
+    subparsers.add_parser("list-backups", help="List retained product snapshots")
+    restore_parser = subparsers.add_parser("restore-products", help="Restore the product catalog from a snapshot")
+    restore_parser.add_argument("--at", help="Restore the newest snapshot taken at or before this date/time "
+                                             "(default: the newest snapshot)")
+    import_parser = subparsers.add_parser("import-backups",
+                                          help="Import products_backup_*.csv files as snapshots "
+                                               "(files older than the retention period are dropped)")
+    import_parser.add_argument("--dir", default=".", help="Directory containing products_backup_*.csv files")
+    import_parser.add_argument("--delete", action="store_true", help="Delete each backup file after it is imported")
+
+    period_parser = subparsers.add_parser("stock-period",
+                                          help="Opening and closing stock per product for a date range")
+    period_parser.add_argument("--from", dest="start", required=True, help="First day (YYYY-MM-DD)")
+    period_parser.add_argument("--to", dest="end", required=True, help="Last day (YYYY-MM-DD)")
+
+    valuation_parser = subparsers.add_parser("valuation", help="FIFO value of closing stock, or COGS of a bill")
+    valuation_parser.add_argument("--bill", help="Show cost of goods sold per line of this bill")
+
+    history_parser = subparsers.add_parser("price-history", help="Rate versions of a product, or its rates on a day")
+    history_parser.add_argument("--brand", required=True, help="Product brand")
+    history_parser.add_argument("--product", required=True, help="Product name")
+    history_parser.add_argument("--at", help="Show the rates in effect on this day (YYYY-MM-DD)")
+
+    report_parser = subparsers.add_parser("report", help="Sales report for a period, without the UI")
+    report_parser.add_argument("type", choices=REPORT_TYPES, help="Report period")
+    report_parser.add_argument("--from", dest="start", help="First day of a custom report (YYYY-MM-DD)")
+    report_parser.add_argument("--to", dest="end", help="Last day of a custom report (YYYY-MM-DD)")
+    report_parser.add_argument("--format", choices=("text",) + exporters.FORMATS, default="text",
+                               help="Output format (jsonl and xlsx need --output)")
+    report_parser.add_argument("--output", help="Write to this file instead of stdout")
+
+    export_parser = subparsers.add_parser("export", help="Export products, stock or customers to a file")
+    export_parser.add_argument("what", choices=("products", "stock", "customers"), help="Data to export")
+    export_parser.add_argument("--output", required=True, help="File to write")
+    export_parser.add_argument("--format", choices=exporters.FORMATS,
+                               help="Output format (default: from the file extension)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "migrate-bills":
+        migrated, skipped, failed = migrate_bills(args.dir, args.delete, args.workers)
+        return 1 if failed else 0
+    if args.command == "rebuild-index":
+        count = BillIndex.get().rebuild()
+        print(f"Indexed {count} bills")
+    if args.command == "rebuild-rollups":
+        count = BillIndex.get().rebuild_rollups()
+        print(f"Rolled up {count} bills")
+    if args.command == "rebuild-receivables":
+        count = Receivables.get().rebuild()
+        print(f"Rebuilt receivables from {count} bills")
+    if args.command == "balance":
+        customer_balance(args.customer)
+    if args.command == "backup-products":
+        digest = ProductBackups.get().snapshot_store(ProductModel.get_store())
+        print(f"Product snapshot {digest[:12]}")
+    if args.command == "list-backups":
+        list_backups()
+    if args.command == "restore-products":
+        try:
+            at = parse_time(args.at) if args.at else None
+            when, digest, count = ProductModel.restore_backup(at)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return 1
+        print(f"Restored {count} products from the snapshot taken {when:%Y-%m-%d %H:%M:%S}")
+    if args.command == "import-backups":
+        count = ProductBackups.get().import_legacy(args.dir, args.delete)
+        print(f"Imported {count} backup files")
+    if args.command == "stock-period":
+        stock_period(args.start, args.end)
+    if args.command == "valuation":
+        valuation(args.bill)
+    if args.command == "report":
+        try:
+            sales_report(args.type, args.start, args.end, args.format, args.output)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return 1
+    if args.command == "export":
+        try:
+            export_data(args.what, args.output, args.format)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return 1
+    if args.command == "price-history":
+        try:
+            price_history(args.brand, args.product, args.at)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,8 @@
 """
 Data models
 """
-from .product import ProductModel
+from .product import Product, ProductModel
+from .product_store import ProductStore
+from .catalog import ProductCatalog
 
-__all__ = ['ProductModel']
\ No newline at end of file
+__all__ = ['Product', 'ProductModel', 'ProductStore', 'ProductCatalog']
\ No newline at end of file
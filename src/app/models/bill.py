@@ -1,94 +1,83 @@
-import csv
-import os
-from datetime import datetime
+from .sales_ledger import SalesLedger
+from .bill_index import BillIndex
+from .receivables import Receivables
+from ..utils.sequence import next_bill_number, next_purchase_bill_number
 
 class BillModel:
     """Model for bill data management"""
     
     @staticmethod
     def get_next_bill_number():
-        """Generate next bill number"""
-        if not os.path.exists("last_bill.txt"):
-            with open("last_bill.txt", "w") as f:
-                f.write("1")  # starting bill number
-
-        with open("last_bill.txt", "r") as f:
-            last_number = int(f.read().strip())
-
-        next_number = last_number + 1
-
-        with open("last_bill.txt", "w") as f:
-            f.write(str(next_number))
-
-        return f"{next_number:04d}"  # Format with leading zeros
+        """Generate next bill number, skipping numbers already in the ledger"""
+        ledger = SalesLedger.get()
+        bill_no = next_bill_number()
+        while ledger.has_bill(bill_no):
+            bill_no = next_bill_number()
+        return bill_no
     
     @staticmethod
     def get_purchase_bill_number():
         """Generate purchase bill number"""
-        if not os.path.exists("last_purchase_bill.txt"):
-            with open("last_purchase_bill.txt", "w") as f:
-                f.write("1")
-        
-        with open("last_purchase_bill.txt", "r") as f:
-            last_number = int(f.read().strip())
-        
-        next_number = last_number + 1
+        return next_purchase_bill_number()
+    
+    @staticmethod
+    def build_bill(bill_no, date, customer_data, items, payment_type, include_gst, amount_paid):
+        """Build a bill record with its totals"""
+        total = sum(item.get("amount", 0) for item in items)
+        if include_gst:
+            total = total * 1.18  # Add 18% GST
         
-        with open("last_purchase_bill.txt", "w") as f:
-            f.write(str(next_number))
+        amount_paid_float = float(amount_paid or 0)
+        remaining = max(0, total - amount_paid_float)
         
-        return f"P{next_number:04d}"  # P for Purchase
+        return {
+            "bill_no": bill_no,
+            "date": date,
+            "customer": customer_data.get("name", ""),
+            "phone": customer_data.get("phone", ""),
+            "type": customer_data.get("type", "Retail"),
+            "place": customer_data.get("place", ""),
+            "site": customer_data.get("site", ""),
+            "payment_type": payment_type,
+            "include_gst": bool(include_gst),
+            "items": [{
+                "brand": item.get("brand", ""),
+                "name": item.get("name", ""),
+                "qty": item.get("qty", 0),
+                "rate": item.get("rate", 0),
+                "amount": item.get("amount", 0)
+            } for item in items],
+            "total": round(total, 2),
+            "amount_paid": amount_paid_float,
+            "remaining": round(remaining, 2)
+        }
+    
+    @staticmethod
+    def persist_bill(bill):
+        """Write a built bill to the sales ledger, bill index and customer receivables"""
+        ledger = SalesLedger.get()
+        if not ledger.has_same_bill(bill):  # already written when a save is replayed
+            ledger.append_bill(bill)
+        BillIndex.get().add_bill(bill)
+        Receivables.get().add_bill(bill)
     
     @staticmethod
     def save_bill_details(bill_no, date, customer_data, items, payment_type, include_gst, amount_paid):
-        """Save bill details to CSV file"""
-        filename = f"bill_{bill_no}.csv"
+        """Append bill details to the sales ledger"""
         try:
-            with open(filename, mode="w", newline="", encoding='utf-8') as file:
-                writer = csv.writer(file)
-                writer.writerow(["Bill No", "Date", "Customer", "Phone", "Type", "Place", "Site", "Payment Type", "Include GST"])
-                writer.writerow([
-                    bill_no,
-                    date,
-                    customer_data.get("name", ""),
-                    customer_data.get("phone", ""),
-                    customer_data.get("type", "Retail"),
-                    customer_data.get("place", ""),
-                    customer_data.get("site", ""),
-                    payment_type,
-                    "Yes" if include_gst else "No"
-                ])
-                
-                writer.writerow([])
-                writer.writerow(["S.No", "Brand", "Product", "Qty", "Rate", "Amount"])
-                
-                for i, item in enumerate(items, 1):
-                    writer.writerow([
-                        i,
-                        item.get("brand", ""),
-                        item.get("name", ""),
-                        item.get("qty", 0),
-                        item.get("rate", 0),
-                        item.get("amount", 0)
-                    ])
-                
-                total = sum(item.get("amount", 0) for item in items)
-                if include_gst:
-                    total = total * 1.18  # Add 18% GST
-                
-                amount_paid_float = float(amount_paid or 0)
-                remaining = max(0, total - amount_paid_float)
-                
-                writer.writerow([])
-                writer.writerow(["Total", "", "", "", "", f"{total:.2f}"])
-                writer.writerow(["Amount Paid", "", "", "", "", f"{amount_paid_float:.2f}"])
-                writer.writerow(["Remaining Amount", "", "", "", "", f"{remaining:.2f}"])
-            
+            bill = BillModel.build_bill(bill_no, date, customer_data, items,
+                                        payment_type, include_gst, amount_paid)
+            BillModel.persist_bill(bill)
             return True
         except Exception as e:
             print(f"Failed to save bill: {str(e)}")
             return False
     
+    @staticmethod
+    def get_bill(bill_no):
+        """Get a saved bill from the sales ledger"""
+        return SalesLedger.get().get_bill(bill_no)
+    
     @staticmethod
     def get_receipt_text(bill_no, date, customer_data, items, payment_type, include_gst):
         """Generate receipt text for sharing"""
@@ -0,0 +1,168 @@
+# src/app/models/bill_index.py
+import threading
+from datetime import datetime
+
+from .database import Database
+from .sales_ledger import SalesLedger
+from .sales_rollup import SalesRollup
+
+COLUMNS = [
+    "bill_no", "bill_date", "date", "customer", "type", "place", "site",
+    "payment_type", "include_gst", "total"
+]
+
+
+def bill_date_iso(date_str):
+    """Convert a bill date ("dd/mm/YYYY HH:MM AM") to YYYY-mm-dd, or None"""
+    try:
+        return datetime.strptime(date_str.split()[0], "%d/%m/%Y").date().isoformat()
+    except (ValueError, IndexError, AttributeError):
+        return None
+
+
+class BillIndex:
+    """On-disk index of bill headers ordered by bill date"""
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, db=None, ledger=None):
+        self.db = db or Database.get()
+        self.ledger = ledger or SalesLedger.get()
+        self.rollup = SalesRollup(self.db)
+        self._create_schema()
+        self.sync_with_ledger()
+        if self.count() and not self.db.query("SELECT 1 FROM daily_sales LIMIT 1"):
+            self.rebuild_rollups()
+
+    @classmethod
+    def get(cls):
+        """Get the shared bill index"""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def _create_schema(self):
+        with self.db.transaction() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS bill_index (
+                    bill_no TEXT PRIMARY KEY,
+                    bill_date TEXT,
+                    date TEXT,
+                    customer TEXT,
+                    type TEXT,
+                    place TEXT,
+                    site TEXT,
+                    payment_type TEXT,
+                    include_gst INTEGER NOT NULL DEFAULT 0,
+                    total REAL NOT NULL DEFAULT 0
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_bill_index_date ON bill_index (bill_date, bill_no)")
+
+    @staticmethod
+    def _record(bill):
+        return (
+            bill["bill_no"],
+            bill_date_iso(bill.get("date", "")),
+            bill.get("date", ""),
+            bill.get("customer", ""),
+            bill.get("type", ""),
+            bill.get("place", ""),
+            bill.get("site", ""),
+            bill.get("payment_type", ""),
+            1 if bill.get("include_gst") else 0,
+            float(bill.get("total", 0) or 0)
+        )
+
+    def add_bills(self, bills):
+        """Index (or re-index) bills and update the daily rollups"""
+        return self.add_records([self._record(bill) for bill in bills])
+
+    def add_records(self, records):
+        """Index bills from precomputed _record() tuples"""
+        if not records:
+            return 0
+        placeholders = ", ".join("?" for _ in COLUMNS)
+        with self.db.transaction() as conn:
+            for record in records:
+                # A re-saved bill replaces its previous contribution
+                previous = conn.execute(
+                    "SELECT bill_date, type, payment_type, include_gst, place, site, total "
+                    "FROM bill_index WHERE bill_no = ?", (record[0],)
+                ).fetchone()
+                if previous:
+                    day, bill_type, payment_type, include_gst, place, site, total = previous
+                    SalesRollup.apply(conn, day, bill_type, payment_type, include_gst, place, site, -1, -total)
+
+                conn.execute(
+                    f"INSERT OR REPLACE INTO bill_index ({', '.join(COLUMNS)}) VALUES ({placeholders})",
+                    record
+                )
+                bill_no, day, date, customer, bill_type, place, site, payment_type, include_gst, total = record
+                SalesRollup.apply(conn, day, bill_type, payment_type, include_gst, place, site, 1, total)
+        return len(records)
+
+    def add_bill(self, bill):
+        """Index one saved bill"""
+        return self.add_bills([bill])
+
+    def count(self):
+        """Number of indexed bills"""
+        return self.db.query("SELECT COUNT(*) FROM bill_index")[0][0]
+
+    def sync_with_ledger(self):
+        """Index any ledger bills missing from the index"""
+        if self.count() == self.ledger.bill_count():
+            return 0
+        indexed = {row[0] for row in self.db.query("SELECT bill_no FROM bill_index")}
+        missing = [bill for bill in self.ledger.iter_bills() if bill["bill_no"] not in indexed]
+        added = self.add_bills(missing)
+        print(f"DEBUG: Indexed {added} bills from the sales ledger")
+        return added
+
+    def rebuild(self):
+        """Rebuild the whole index and the daily rollups from the sales ledger"""
+        with self.db.transaction() as conn:
+            conn.execute("DELETE FROM bill_index")
+            conn.execute("DELETE FROM daily_sales")
+        return self.add_bills(self.ledger.iter_bills())
+
+    def rebuild_rollups(self):
+        """Regenerate the daily rollups from the raw bills in the sales ledger"""
+        records = []
+        for bill in self.ledger.iter_bills():
+            record = self._record(bill)
+            records.append((record[1], record[4], record[7], record[8], record[5], record[6], record[9]))
+        days = self.rollup.rebuild(records)
+        print(f"DEBUG: Rebuilt {days} daily rollup rows from {len(records)} bills")
+        return len(records)
+
+    def bills_page(self, start_date, end_date, after=None, limit=1000):
+        """Up to limit bill rows in the range after the (bill_date, bill_no) key "after"
+
+        Returns (rows, key of the last row). Each page is a short query, so
+        reading a long range page by page does not hold up other writers.
+        """
+        params = [start_date.isoformat(), end_date.isoformat()]
+        where = "bill_date BETWEEN ? AND ?"
+        if after is not None:
+            where += " AND (bill_date > ? OR (bill_date = ? AND bill_no > ?))"
+            params += [after[0], after[0], after[1]]
+        rows = self.db.query(
+            "SELECT bill_no, date, customer, type, place, site, payment_type, include_gst, total, bill_date "
+            f"FROM bill_index WHERE {where} ORDER BY bill_date, bill_no LIMIT ?",
+            params + [limit]
+        )
+        if not rows:
+            return [], after
+        return [row[:9] for row in rows], (rows[-1][9], rows[-1][0])
+
+    def bills_between(self, start_date, end_date):
+        """Bill rows dated within [start_date, end_date], in date order"""
+        return self.db.query(
+            "SELECT bill_no, date, customer, type, place, site, payment_type, include_gst, total "
+            "FROM bill_index WHERE bill_date BETWEEN ? AND ? ORDER BY bill_date, bill_no",
+            (start_date.isoformat(), end_date.isoformat())
+        )
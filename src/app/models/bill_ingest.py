@@ -0,0 +1,97 @@
+# src/app/models/bill_ingest.py
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .sales_ledger import SalesLedger, read_bill_csv, encode_bill
+from .bill_index import BillIndex
+
+# Bill files parsed per worker task
+CHUNK_SIZE = 500
+
+# Below this many files, parsing in-process beats starting a pool
+MIN_PARALLEL_FILES = 2000
+
+
+def parse_bill_file(path):
+    """Parse a bill_NNNN.csv into (bill_no, ledger block, index record)"""
+    try:
+        bill = read_bill_csv(path)
+    except IndexError:
+        raise ValueError("not a bill file (no bill details row)")
+    if not bill["bill_no"]:
+        raise ValueError("missing bill number")
+    return bill["bill_no"], encode_bill(bill), BillIndex._record(bill)
+
+
+def parse_bill_chunk(paths):
+    """Parse a chunk of bill files; returns (records, errors)
+
+    Runs in a worker process. Records are compact (the encoded ledger
+    block and the index row), and a malformed file becomes an entry in
+    errors instead of failing the chunk.
+    """
+    records = []
+    errors = []
+    for path in paths:
+        try:
+            records.append((path,) + parse_bill_file(path))
+        except Exception as e:
+            errors.append((path, f"{type(e).__name__}: {e}"))
+    return records, errors
+
+
+def _chunks(paths, size):
+    for start in range(0, len(paths), size):
+        yield paths[start:start + size]
+
+
+def ingest_bill_files(paths, workers=None, delete=False, replace=False, chunk_size=CHUNK_SIZE):
+    """Parse bill files across processes and merge them into the ledger and index
+
+    Bills already in the ledger are skipped unless replace is set. Returns
+    (ingested, skipped, errors) where errors is [(path, message)].
+    """
+    ledger = SalesLedger.get()
+    index = BillIndex.get()
+    paths = list(paths)
+    chunks = list(_chunks(paths, chunk_size))
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers > 1 and len(paths) >= MIN_PARALLEL_FILES:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(parse_bill_chunk, chunks)
+    else:
+        executor = None
+        results = map(parse_bill_chunk, chunks)
+
+    ingested = skipped = 0
+    errors = []
+    try:
+        # Merged in file order as chunks complete
+        for records, chunk_errors in results:
+            errors.extend(chunk_errors)
+            blocks = []
+            index_records = []
+            seen = set()
+            for path, bill_no, block, index_record in records:
+                if not replace and (bill_no in seen or ledger.has_bill(bill_no)):
+                    skipped += 1
+                    continue
+                seen.add(bill_no)
+                blocks.append((bill_no, block))
+                index_records.append(index_record)
+            ledger.append_blocks(blocks)
+            index.add_records(index_records)
+            ingested += len(blocks)
+
+            if delete:
+                for record in records:
+                    os.remove(record[0])
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    for path, message in errors:
+        print(f"Error reading {path}: {message}")
+    return ingested, skipped, errors
@@ -0,0 +1,93 @@
+# src/app/models/bill_items.py
+
+# GST added to a bill when "Include GST" is ticked
+CGST_RATE = 0.09
+SGST_RATE = 0.09
+
+# Events passed to listeners
+ADD = "add"
+UPDATE = "update"
+REMOVE = "remove"
+CLEAR = "clear"
+
+
+class BillItems:
+    """Line items of the bill being entered, with a running subtotal
+
+    Behaves like the list of item dicts it replaces (iteration, len,
+    indexing, del), but every change goes through add/update/remove/clear,
+    which adjust the subtotal by the line's amount and notify listeners as
+    listener(event, index, item). The screen can then patch one row and
+    read the totals without rescanning the bill.
+    """
+
+    def __init__(self, items=None):
+        self._items = []
+        self.subtotal = 0.0
+        self.listeners = []
+        for item in items or []:
+            self.add(item)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def __delitem__(self, index):
+        self.remove(index)
+
+    def _notify(self, event, index, item):
+        for listener in list(self.listeners):
+            listener(event, index, item)
+
+    def add(self, item):
+        """Append a line ({"brand", "name", "qty", "rate", "amount"})"""
+        self._items.append(item)
+        self.subtotal += item["amount"]
+        self._notify(ADD, len(self._items) - 1, item)
+        return item
+
+    append = add
+
+    def update(self, index, **fields):
+        """Change fields of a line; the amount follows qty and rate"""
+        item = self._items[index]
+        old_amount = item["amount"]
+        item.update(fields)
+        if "amount" not in fields and ("qty" in fields or "rate" in fields):
+            item["amount"] = item["qty"] * item["rate"]
+        self.subtotal += item["amount"] - old_amount
+        self._notify(UPDATE, index, item)
+        return item
+
+    def remove(self, index):
+        """Remove a line and return it"""
+        if index < 0:
+            index += len(self._items)
+        item = self._items.pop(index)
+        self.subtotal -= item["amount"]
+        if not self._items:
+            self.subtotal = 0.0  # drop any float drift from the running sum
+        self._notify(REMOVE, index, item)
+        return item
+
+    def clear(self):
+        """Remove every line"""
+        self._items = []
+        self.subtotal = 0.0
+        self._notify(CLEAR, None, None)
+
+    def gst(self, include_gst):
+        """(CGST, SGST) on the current subtotal"""
+        if not include_gst:
+            return 0.0, 0.0
+        return self.subtotal * CGST_RATE, self.subtotal * SGST_RATE
+
+    def total(self, include_gst):
+        """Subtotal plus GST when included"""
+        cgst, sgst = self.gst(include_gst)
+        return self.subtotal + cgst + sgst
@@ -0,0 +1,140 @@
+# src/app/models/catalog.py
+
+
+def normalize(text):
+    """Normalize a brand or product name for lookups"""
+    return (text or "").strip().lower()
+
+
+def product_key(brand, name):
+    """Key identifying a product in the catalog and the product store"""
+    return (normalize(brand), normalize(name))
+
+
+class ProductCatalog:
+    """In-memory product list with hash indexes by (brand, name), name and brand
+
+    The catalog is the source of truth while the app runs. Products added,
+    updated or marked dirty since the last save are tracked so a save
+    writes only those rows.
+    """
+
+    def __init__(self, products=None):
+        self.products = []
+        self._by_key = {}    # (brand, name) normalized -> product
+        self._by_name = {}   # name normalized -> [products]
+        self._by_brand = {}  # brand as shown -> [products]
+        self._dirty = {}     # id(product) -> product changed since the last save
+        self._removed = {}   # product_key -> None for products to delete
+        self.version = 0     # bumped on every change, for caches built from the catalog
+        self.replace_all(products or [])
+
+    def __iter__(self):
+        return iter(self.products)
+
+    def __len__(self):
+        return len(self.products)
+
+    @staticmethod
+    def key_of(product):
+        return product_key(product.brand, product.name)
+
+    def _index(self, product):
+        self._by_key[self.key_of(product)] = product
+        self._by_name.setdefault(normalize(product.name), []).append(product)
+        self._by_brand.setdefault(product.brand, []).append(product)
+
+    def _unindex(self, product):
+        if self._by_key.get(self.key_of(product)) is product:
+            del self._by_key[self.key_of(product)]
+        for index, key in ((self._by_name, normalize(product.name)),
+                           (self._by_brand, product.brand)):
+            bucket = index.get(key, [])
+            bucket[:] = [p for p in bucket if p is not product]
+            if not bucket:
+                index.pop(key, None)
+
+    def replace_all(self, products):
+        """Replace the whole catalog and rebuild the indexes"""
+        self.products = list(products)
+        self._by_key = {}
+        self._by_name = {}
+        self._by_brand = {}
+        self._dirty = {}
+        self._removed = {}
+        self.version += 1
+        for product in self.products:
+            self._index(product)
+
+    def find(self, brand, name):
+        """Find a product by brand and name (case and whitespace insensitive)"""
+        return self._by_key.get((normalize(brand), normalize(name)))
+
+    def find_by_name(self, name):
+        """Find the first product with a name"""
+        bucket = self._by_name.get(normalize(name))
+        return bucket[0] if bucket else None
+
+    def products_for_brand(self, brand):
+        """Products of a brand in catalog order"""
+        return list(self._by_brand.get(brand, []))
+
+    def brands(self):
+        """Sorted unique brands"""
+        return sorted(self._by_brand)
+
+    def add(self, product):
+        """Add a new product"""
+        self.products.append(product)
+        self._index(product)
+        self._removed.pop(self.key_of(product), None)
+        self.mark_dirty(product)
+        return product
+
+    def remove(self, brand, name):
+        """Remove a product by brand and name"""
+        product = self.find(brand, name)
+        if product is None:
+            return None
+        self.products = [p for p in self.products if p is not product]
+        self._unindex(product)
+        self._dirty.pop(id(product), None)
+        self._removed[self.key_of(product)] = None
+        self.version += 1
+        return product
+
+    def update(self, product, **fields):
+        """Update product attributes, re-indexing if the brand or name changes"""
+        renamed = fields.get("brand", product.brand) != product.brand or \
+                  fields.get("name", product.name) != product.name
+        if renamed:
+            self._unindex(product)
+            self._removed[self.key_of(product)] = None
+        for field, value in fields.items():
+            setattr(product, field, value)
+        if renamed:
+            self._index(product)
+            self._removed.pop(self.key_of(product), None)
+        self.mark_dirty(product)
+        return product
+
+    def mark_dirty(self, *products):
+        """Record products changed in place so the next save writes them"""
+        for product in products:
+            self._dirty[id(product)] = product
+        self.version += 1
+
+    def has_changes(self):
+        return bool(self._dirty or self._removed)
+
+    def changes(self):
+        """Products changed and product keys removed since the last save"""
+        return list(self._dirty.values()), list(self._removed)
+
+    def mark_saved(self, products=(), removed=()):
+        """Forget changes that have been written"""
+        self.version += 1  # saved values may have been rounded
+        for product in products:
+            self._dirty.pop(id(product), None)
+        for key in removed:
+            self._removed.pop(key, None)
@@ -0,0 +1,142 @@
+# src/app/models/cost_layers.py
+import threading
+from collections import deque
+
+from .stock_ledger import StockLedger, SALE
+
+
+class CostLayers:
+    """FIFO cost layers per product, fed by the stock ledger
+
+    Stock coming in (purchases, opening stock, returns, positive
+    adjustments) pushes a [qty, unit cost, timestamp] layer; stock going
+    out consumes the oldest layers first. Every layer is pushed and popped
+    once, so consuming a sale line is amortized O(1). Sales that run past
+    the available layers are costed at the product's last known cost and
+    offset against the next stock received.
+
+    New movements appended in ledger order are applied as they are
+    recorded; anything else (a re-saved bill, a backdated purchase) marks
+    the layers stale and they are rebuilt from the ledger in one pass on
+    the next query.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, ledger=None):
+        self.ledger = ledger or StockLedger.get()
+        self.lock = threading.RLock()
+        self._stale = True
+        self._reset()
+        self.ledger.listeners.append(self._on_change)
+
+    @classmethod
+    def get(cls):
+        """Get the shared cost layers"""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def _reset(self):
+        self._layers = {}     # (brand, name) -> deque of [qty, unit cost, ts]
+        self._short = {}      # (brand, name) -> qty sold beyond the layers
+        self._last_cost = {}  # (brand, name) -> unit cost of the latest stock received
+        self._cogs = {}       # ref -> [(brand, name, qty, cost)] for sale lines
+        self._position = ("", 0)  # (ts, id) of the last movement applied
+
+    def rebuild(self):
+        """Rebuild all layers from the stock ledger in one pass"""
+        with self.lock:
+            self._reset()
+            apply = self._apply
+            for movement in self.ledger.iter_movements():
+                apply(*movement)
+            self._stale = False
+        return len(self._layers)
+
+    def _ensure(self):
+        if self._stale:
+            self.rebuild()
+
+    def _on_change(self, inserted, deleted_refs):
+        with self.lock:
+            if self._stale:
+                return
+            inserted = sorted(inserted, key=lambda m: (m[1], m[0]))
+            if deleted_refs or (inserted and (inserted[0][1], inserted[0][0]) < self._position):
+                self._stale = True  # history changed; rebuild on the next query
+                return
+            for movement in inserted:
+                self._apply(*movement)
+
+    def _apply(self, movement_id, ts, brand, name, kind, qty, ref, unit_cost):
+        key = (brand, name)
+        if qty > 0:
+            self._receive(key, qty, unit_cost, ts)
+        else:
+            cost = self._consume(key, -qty)
+            if kind == SALE:
+                self._cogs.setdefault(ref, []).append((brand, name, -qty, cost))
+        self._position = (ts, movement_id)
+
+    def _receive(self, key, qty, unit_cost, ts):
+        if unit_cost is None:
+            unit_cost = self._last_cost.get(key, 0.0)
+        self._last_cost[key] = unit_cost
+
+        short = self._short.get(key, 0)
+        if short:
+            covered = min(short, qty)  # already costed when it was sold
+            self._short[key] = short - covered
+            qty -= covered
+        if qty:
+            self._layers.setdefault(key, deque()).append([qty, unit_cost, ts])
+
+    def _consume(self, key, qty):
+        """Take qty from the oldest layers; returns its cost"""
+        layers = self._layers.get(key)
+        cost = 0.0
+        while qty and layers:
+            head = layers[0]
+            take = min(head[0], qty)
+            cost += take * head[1]
+            head[0] -= take
+            qty -= take
+            if not head[0]:
+                layers.popleft()
+        if qty:
+            cost += qty * self._last_cost.get(key, 0.0)
+            self._short[key] = self._short.get(key, 0) + qty
+        return cost
+
+    def bill_cogs(self, bill_no):
+        """Cost of goods sold per line of a bill as [(brand, name, qty, cost)]"""
+        with self.lock:
+            self._ensure()
+            return list(self._cogs.get(bill_no, []))
+
+    def layers(self, brand, name):
+        """Remaining layers of a product as [(qty, unit cost, ts)], oldest first"""
+        with self.lock:
+            self._ensure()
+            return [tuple(layer) for layer in self._layers.get(self.ledger.recorded_name(brand, name), ())]
+
+    def valuation(self):
+        """Closing stock quantity and FIFO value per product: {(brand, name): (qty, value)}"""
+        with self.lock:
+            self._ensure()
+            result = {}
+            for key, layers in self._layers.items():
+                qty = value = 0
+                for layer_qty, unit_cost, _ in layers:
+                    qty += layer_qty
+                    value += layer_qty * unit_cost
+                if qty:
+                    result[key] = (qty, round(value, 2))
+            return result
+
+    def total_value(self):
+        """FIFO value of all closing stock"""
+        return round(sum(value for _, value in self.valuation().values()), 2)
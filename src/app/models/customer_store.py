@@ -0,0 +1,302 @@
+# src/app/models/customer_store.py
+import csv
+import io
+import os
+import threading
+import time
+
+from ..utils.autocomplete import AutocompleteIndex
+from ..utils.sequence import _FileLock
+from ..utils.validators import validate_phone_number
+
+CUSTOMERS_FILE = "customers.csv"
+FIELDNAMES = ["Name", "Phone", "Place", "Site"]
+
+# Seconds between checks of customers.csv for changes made by other terminals
+CHECK_INTERVAL = 5.0
+
+# Compact when superseded rows outnumber this, and at least the live rows
+COMPACT_MIN_STALE = 500
+
+
+def normalize_phone(phone):
+    """Normalize a phone number to its 10 digits (or whatever digits it has)"""
+    phone = (phone or "").strip()
+    return validate_phone_number(phone) or "".join(filter(str.isdigit, phone)) or phone
+
+
+def normalize_name(name):
+    return (name or "").strip().lower()
+
+
+def _customer(row):
+    return {
+        "Name": row.get("Name", "") or "",
+        "Phone": row.get("Phone", "") or "",
+        "Place": row.get("Place", "") or "",
+        "Site": row.get("Site", "") or ""
+    }
+
+
+class CustomerStore:
+    """Process-wide customer directory indexed by normalized phone and by name
+
+    Upserts are appended to customers.csv as a single row; the file is
+    rewritten without superseded rows by a background compaction. Rows
+    appended by other terminals are picked up from the file's size and
+    mtime, checked at most every CHECK_INTERVAL seconds. Appends and the
+    final swap of a compaction hold a lock shared between terminals, so a
+    row appended anywhere while the file is being compacted is carried over.
+    """
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, path=CUSTOMERS_FILE):
+        self.path = path
+        self.lock = threading.RLock()
+        self._loading = False
+        self._by_phone = {}   # normalized phone -> customer
+        self._by_name = {}    # normalized name -> [customers]
+        # Suggestion indexes weighted by customers using a value and by saves
+        self.names = AutocompleteIndex()
+        self.places = AutocompleteIndex()
+        self.sites = AutocompleteIndex()
+        self._rows = 0        # rows in the file, including superseded ones
+        self._compacting = None
+        self._offset = 0      # bytes of the file already applied
+        self._stat = None     # (inode, mtime, size) after the last read or write
+        self._checked = time.monotonic()
+        self.load()
+
+    @classmethod
+    def get(cls, path=CUSTOMERS_FILE):
+        """Get the shared customer store for a file"""
+        key = os.path.abspath(path)
+        with cls._instances_lock:
+            store = cls._instances.get(key)
+            if store is None:
+                store = cls(path)
+                cls._instances[key] = store
+            return store
+
+    def load(self):
+        """(Re)load the whole file and rebuild the indexes"""
+        with self.lock:
+            self._by_phone = {}
+            self._by_name = {}
+            self._rows = 0
+            self._offset = 0
+            self._loading = True
+            try:
+                self._read_tail()
+            finally:
+                self._loading = False
+            customers = list(self._by_phone.values())
+            self.names.rebuild(c["Name"] for c in customers)
+            self.places.rebuild(c["Place"] for c in customers)
+            self.sites.rebuild(c["Site"] for c in customers)
+
+    def _read_tail(self):
+        """Apply complete rows written after the last read offset"""
+        if not os.path.exists(self.path):
+            self._stat = None
+            return 0
+        with open(self.path, mode="rb") as file:
+            file.seek(self._offset)
+            data = file.read()
+            stat = os.fstat(file.fileno())
+        end = data.rfind(b"\n") + 1  # ignore a row still being written
+        rows = list(csv.reader(io.StringIO(data[:end].decode("utf-8-sig"), newline="")))
+        if self._offset == 0 and rows and rows[0][:2] == FIELDNAMES[:2]:
+            rows = rows[1:]
+        for values in rows:
+            if values:
+                self._apply(_customer(dict(zip(FIELDNAMES, values))))
+        self._offset += end
+        self._stat = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        return len(rows)
+
+    def _apply(self, customer):
+        key = normalize_phone(customer["Phone"]) or f"#{self._rows}"
+        existing = self._by_phone.get(key)
+        if existing is None:
+            self._by_phone[key] = customer
+        else:
+            self._unindex(existing)
+            existing.update(customer)
+            customer = existing
+        self._index(customer)
+        self._rows += 1
+
+    def refresh(self, force=False):
+        """Pick up changes made by other terminals, checking the file at most every CHECK_INTERVAL"""
+        now = time.monotonic()
+        if not force and now - self._checked < CHECK_INTERVAL:
+            return False
+        with self.lock:
+            self._checked = now
+            try:
+                stat = os.stat(self.path)
+            except OSError:
+                return False
+            if (stat.st_ino, stat.st_mtime_ns, stat.st_size) == self._stat:
+                return False
+            if self._stat is None or stat.st_ino != self._stat[0] or stat.st_size < self._offset:
+                self.load()  # created or rewritten (compacted) by another terminal
+            else:
+                self._read_tail()
+            return True
+
+    def _index(self, customer):
+        self._by_name.setdefault(normalize_name(customer["Name"]), []).append(customer)
+        if self._loading:
+            return  # suggestion indexes are rebuilt in bulk after loading
+        self.names.add(customer["Name"])
+        self.places.add(customer["Place"])
+        self.sites.add(customer["Site"])
+
+    def _unindex(self, customer):
+        if not self._loading:
+            self.names.discard(customer["Name"])
+            self.places.discard(customer["Place"])
+            self.sites.discard(customer["Site"])
+        key = normalize_name(customer["Name"])
+        bucket = [c for c in self._by_name.get(key, []) if c is not customer]
+        if bucket:
+            self._by_name[key] = bucket
+        else:
+            self._by_name.pop(key, None)
+
+    def all(self):
+        """All customers in first-seen order"""
+        self.refresh()
+        with self.lock:
+            return list(self._by_phone.values())
+
+    def __len__(self):
+        return len(self._by_phone)
+
+    def find_by_phone(self, phone):
+        """Customer with a phone number, or None"""
+        self.refresh()
+        return self._by_phone.get(normalize_phone(phone))
+
+    def find_by_name(self, name):
+        """First customer with a name (case-insensitive), or None"""
+        self.refresh()
+        bucket = self._by_name.get(normalize_name(name))
+        return bucket[0] if bucket else None
+
+    def upsert(self, phone, name, place="", site=""):
+        """Add or update a customer by phone; returns False if nothing changed"""
+        key = normalize_phone(phone)
+        if not key:
+            return False
+        row = {"Name": name, "Phone": phone, "Place": place, "Site": site}
+
+        with self.lock:
+            self.refresh(force=True)
+            existing = self._by_phone.get(key)
+            self._record_use(row)
+            if existing == row:
+                return False
+
+            self._append(row)
+            self._apply(dict(row))
+
+            stale = self._rows - len(self._by_phone)
+            if stale >= COMPACT_MIN_STALE and stale >= len(self._by_phone):
+                self.compact_in_background()
+        return True
+
+    def _record_use(self, row):
+        """Rank values that are saved often above rarely used ones"""
+        self.names.add(row["Name"])
+        self.places.add(row["Place"])
+        self.sites.add(row["Site"])
+
+    def _append(self, row):
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=FIELDNAMES)
+        writer.writerow(row)
+        data = buffer.getvalue().encode("utf-8")
+        with _FileLock(f"{self.path}.lock"):
+            with open(self.path, mode="ab") as file:
+                # Checked under the lock, so only the first terminal to append writes the header
+                if os.fstat(file.fileno()).st_size == 0:
+                    data = (",".join(FIELDNAMES) + "\r\n").encode("utf-8") + data
+                file.write(data)
+                end = file.tell()
+                stat = os.fstat(file.fileno())
+        if end == self._offset + len(data):
+            self._offset = end
+            self._stat = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        # Otherwise another terminal appended too; the next refresh re-reads from _offset
+
+    def compact(self):
+        """Rewrite the file with one row per customer"""
+        with self.lock:
+            self.refresh(force=True)
+            if self._stat is None:
+                return
+            snapshot = [dict(c) for c in self._by_phone.values()]
+            snapshot_inode = self._stat[0]
+            snapshot_offset = self._offset
+
+        temp_path = f"{self.path}.tmp"
+        try:
+            with open(temp_path, mode="w", newline="", encoding="utf-8") as file:
+                writer = csv.DictWriter(file, fieldnames=FIELDNAMES)
+                writer.writeheader()
+                writer.writerows(snapshot)
+
+            # No terminal can append while the lock is held; carry over every
+            # row appended (here or by another terminal) since the snapshot
+            with self.lock, _FileLock(f"{self.path}.lock"):
+                try:
+                    inode = os.stat(self.path).st_ino
+                except OSError:
+                    inode = None
+                if inode != snapshot_inode:
+                    self.load()  # another terminal compacted it first
+                    return
+
+                self._read_tail()
+                with open(self.path, mode="rb") as file:
+                    file.seek(snapshot_offset)
+                    tail = file.read(self._offset - snapshot_offset)
+                with open(temp_path, mode="ab") as file:
+                    file.write(tail)
+                    file.flush()
+                    os.fsync(file.fileno())
+                os.replace(temp_path, self.path)
+
+                carried = sum(1 for values in csv.reader(io.StringIO(tail.decode("utf-8"), newline="")) if values)
+                self._rows = len(snapshot) + carried
+                stat = os.stat(self.path)
+                self._offset = stat.st_size
+                self._stat = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        print(f"DEBUG: Compacted {self.path} to {len(snapshot)} customers")
+
+    def compact_in_background(self):
+        """Start a compaction thread unless one is already running"""
+        with self.lock:
+            if self._compacting is not None and self._compacting.is_alive():
+                return self._compacting
+            thread = threading.Thread(target=self._run_compaction, name="customer-compaction", daemon=True)
+            self._compacting = thread
+            thread.start()
+            return thread
+
+    def _run_compaction(self):
+        try:
+            self.compact()
+        except Exception as e:
+            print(f"Error compacting customers: {e}")
+        finally:
+            with self.lock:
+                self._compacting = None
@@ -0,0 +1,51 @@
+# src/app/models/database.py
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+DB_FILE = "inventory.db"
+
+
+class Database:
+    """Shared embedded SQLite database (WAL mode)"""
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, path=DB_FILE):
+        self.path = path
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+
+    @classmethod
+    def get(cls, path=DB_FILE):
+        """Get the shared database for a file, opening it on first use"""
+        key = os.path.abspath(path)
+        with cls._instances_lock:
+            db = cls._instances.get(key)
+            if db is None:
+                db = cls(path)
+                cls._instances[key] = db
+            return db
+
+    @contextmanager
+    def transaction(self):
+        """Run statements in a single transaction (commit or rollback)"""
+        with self.lock:
+            with self.conn:
+                yield self.conn
+
+    def query(self, sql, params=()):
+        """Run a read query and return all rows"""
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def close(self):
+        """Close the connection"""
+        with self.lock:
+            self.conn.close()
+        with Database._instances_lock:
+            Database._instances.pop(os.path.abspath(self.path), None)
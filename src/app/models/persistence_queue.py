@@ -0,0 +1,253 @@
+# src/app/models/persistence_queue.py
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+JOURNAL_FILE = "pending_writes.jsonl"
+FAILED_FILE = "failed_writes.jsonl"
+
+# Seconds to wait before retrying a write that failed
+RETRY_DELAY = 5.0
+
+# Errors that may clear up on their own (a busy database, a full or missing
+# disk); writes failing with these are retried until they succeed
+TRANSIENT_ERRORS = (OSError, sqlite3.OperationalError)
+
+# Attempts before a write failing with any other error is moved to FAILED_FILE
+MAX_ATTEMPTS = 3
+
+
+class PersistenceQueue:
+    """Background writer for saved bills, backed by a durable intent journal
+
+    The UI thread journals a bill (with its customer and the stock of the
+    products it sold) and returns; a worker thread then writes it to the
+    sales ledger, bill index, stock ledger, customer store and product
+    store. Intents
+    still in the journal at startup are replayed by recover(); any that
+    fail stay journaled and queued for the worker to retry. A write that
+    keeps failing with a non-transient error is moved to FAILED_FILE so
+    the bills queued behind it are still written.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, path=JOURNAL_FILE, failed_path=FAILED_FILE):
+        self.path = path
+        self.failed_path = failed_path
+        self.cond = threading.Condition(threading.RLock())
+        self._queue = deque()
+        self._next_id = 1
+        self._attempts = {}  # intent id -> failed attempts with a non-transient error
+        self._worker = None
+        self.last_error = None
+        self.failed = 0      # writes given up on and moved to failed_path
+
+    @classmethod
+    def get(cls):
+        """Get the shared persistence queue"""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def _journal(self, entry):
+        with open(self.path, mode="a", encoding="utf-8") as file:
+            file.write(json.dumps(entry) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+
+    def _read_journal(self):
+        """Unfinished intents in the journal and the highest id it uses"""
+        intents = {}
+        max_id = 0
+        if not os.path.exists(self.path):
+            return [], max_id
+        with open(self.path, mode="r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # torn final line
+                if "done" in entry:
+                    intents.pop(entry["done"], None)
+                    max_id = max(max_id, entry["done"])
+                else:
+                    intents[entry["id"]] = entry
+                    max_id = max(max_id, entry["id"])
+        return list(intents.values()), max_id
+
+    def _rewrite_journal(self, intents):
+        """Replace the journal with just these intents"""
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, mode="w", encoding="utf-8") as file:
+            for intent in intents:
+                file.write(json.dumps(intent) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, self.path)
+
+    def recover(self):
+        """Replay intents left in the journal by a previous run
+
+        Returns the number replayed. Intents that fail are kept in the
+        journal and queued, so the worker retries them; the journal is only
+        removed once every intent in it has been written.
+        """
+        with self.cond:
+            intents, max_id = self._read_journal()
+            # Ids continue after every journaled entry, so a new "done" marker
+            # can never match an intent that has not been replayed
+            self._next_id = max(self._next_id, max_id + 1)
+
+            failed = []
+            for intent in intents:
+                try:
+                    self._apply(intent)
+                except Exception as e:
+                    print(f"Error replaying {intent.get('kind')} {intent.get('id')}: {e}")
+                    self._record_failure(intent, e)
+                    failed.append(intent)
+
+            if failed:
+                self._rewrite_journal(failed)
+                self._queue.extend(failed)
+                self._start_worker()
+                self.cond.notify_all()
+            elif os.path.exists(self.path):
+                os.remove(self.path)
+
+        replayed = len(intents) - len(failed)
+        if intents:
+            print(f"DEBUG: Replayed {replayed} pending writes from {self.path}, {len(failed)} left to retry")
+        return replayed
+
+    def submit_bill(self, bill, customer=None, products=None):
+        """Journal a bill and queue it for writing; returns immediately"""
+        with self.cond:
+            intent = {
+                "id": self._next_id,
+                "kind": "bill",
+                "at": time.time(),  # when the product snapshot was taken
+                "bill": bill,
+                "customer": customer,
+                "products": [list(record) for record in products or []]
+            }
+            self._journal(intent)
+            self._next_id += 1
+            self._queue.append(intent)
+            self._start_worker()
+            self.cond.notify_all()
+        return intent["id"]
+
+    def pending(self):
+        """Number of journaled writes not yet completed"""
+        with self.cond:
+            return len(self._queue)
+
+    def flush(self, timeout=None):
+        """Wait until queued writes are done; returns False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.cond:
+            while self._queue:
+                if self._worker is None or not self._worker.is_alive():
+                    self._start_worker()
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.cond.wait(remaining if remaining is not None else 0.5)
+            return True
+
+    def _start_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="persistence-worker", daemon=True)
+            self._worker.start()
+
+    def _record_failure(self, intent, error):
+        """Note a failed write; returns True once it should be given up on"""
+        self.last_error = str(error)
+        if isinstance(error, TRANSIENT_ERRORS):
+            return False
+        attempts = self._attempts.get(intent["id"], 0) + 1
+        self._attempts[intent["id"]] = attempts
+        return attempts >= MAX_ATTEMPTS
+
+    def _move_to_failed(self, intent, error):
+        """Keep a write that cannot be done in the failed writes file"""
+        entry = {
+            "failed_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "error": f"{type(error).__name__}: {error}",
+            "intent": intent
+        }
+        with open(self.failed_path, mode="a", encoding="utf-8") as file:
+            file.write(json.dumps(entry) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+        self.failed += 1
+        print(f"Error: gave up writing {intent.get('kind')} {intent.get('id')} after "
+              f"{self._attempts.get(intent['id'])} attempts ({error}); moved to {self.failed_path}")
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while not self._queue:
+                    self.cond.wait()
+                intent = self._queue[0]
+
+            try:
+                self._apply(intent)
+                error = None
+            except Exception as e:
+                error = e
+                print(f"Error writing {intent.get('kind')} {intent.get('id')}: {e}")
+
+            with self.cond:
+                done = error is None
+                if not done and self._record_failure(intent, error):
+                    try:
+                        self._move_to_failed(intent, error)
+                        done = True
+                    except OSError as e:
+                        print(f"Error saving failed write {intent.get('id')}: {e}")
+                if done:
+                    self.last_error = None
+                    self._attempts.pop(intent["id"], None)
+                    self._queue.popleft()
+                    if self._queue:
+                        self._journal({"done": intent["id"]})
+                    elif os.path.exists(self.path):
+                        os.remove(self.path)  # everything written; start a fresh journal
+                    self.cond.notify_all()
+                    continue
+
+            time.sleep(RETRY_DELAY)
+
+    @staticmethod
+    def _apply(intent):
+        """Perform a journaled write (safe to repeat)"""
+        from .bill import BillModel
+        from .customer_store import CustomerStore
+        from .product import ProductModel
+        from .stock_ledger import StockLedger
+
+        if intent["kind"] == "bill":
+            BillModel.persist_bill(intent["bill"])
+            StockLedger.get().record_bill(intent["bill"])
+            customer = intent.get("customer")
+            if customer:
+                CustomerStore.get().upsert(customer["phone"], customer["name"],
+                                           customer.get("place", ""), customer.get("site", ""))
+            if intent.get("products"):
+                records = [tuple(r) for r in intent["products"]]
+                if "at" in intent:
+                    # Products saved directly since the bill have newer stock
+                    ProductModel.get_store().upsert_records_older_than(records, intent["at"])
+                else:
+                    ProductModel.get_store().upsert_records(records)
+        else:
+            raise ValueError(f"Unknown journal entry: {intent['kind']}")
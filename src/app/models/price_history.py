@@ -0,0 +1,192 @@
+# src/app/models/price_history.py
+import threading
+from bisect import bisect_right
+from datetime import date, datetime
+
+from .database import Database
+from .catalog import product_key
+
+RATE_FIELDS = ("purchase_rate", "wholesale_rate", "retail_rate", "margin1", "margin2")
+
+
+def as_day(value=None):
+    """Normalize a date, datetime or date string to YYYY-MM-DD"""
+    if value is None:
+        return datetime.now().strftime("%Y-%m-%d")
+    if isinstance(value, (date, datetime)):
+        return value.strftime("%Y-%m-%d")
+    text = str(value).strip()
+    for fmt in ("%Y-%m-%d", "%d/%m/%Y %I:%M %p", "%Y-%m-%d %H:%M:%S", "%d/%m/%Y"):
+        try:
+            return datetime.strptime(text, fmt).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognized date: {value}")
+
+
+class PriceHistory:
+    """Effective-dated rates per product, with as-of-date lookups
+
+    Every version of a product's purchase, wholesale and retail rates and
+    margins is a row in price_history keyed by its effective day, including
+    changes scheduled for the future. An in-memory index holds each
+    product's effective days in sorted order, so "rates of X on day T" is a
+    binary search. Products are matched by product_key and recorded under
+    the first spelling seen, as in the stock ledger.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, db=None):
+        self.db = db or Database.get()
+        self.lock = threading.RLock()
+        self._index = None  # product_key -> ([effective days], [rate dicts])
+        self._names = {}    # product_key -> (brand, name) as recorded
+        self._create_schema()
+
+    @classmethod
+    def get(cls):
+        """Get the shared price history"""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def _create_schema(self):
+        with self.db.transaction() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS price_history (
+                    brand TEXT NOT NULL,
+                    product_name TEXT NOT NULL,
+                    effective_date TEXT NOT NULL,
+                    purchase_rate REAL NOT NULL,
+                    wholesale_rate REAL NOT NULL,
+                    retail_rate REAL NOT NULL,
+                    margin1 REAL NOT NULL DEFAULT 0,
+                    margin2 REAL NOT NULL DEFAULT 0,
+                    recorded_at TEXT NOT NULL,
+                    PRIMARY KEY (brand, product_name, effective_date)
+                )
+            """)
+
+    def _load(self):
+        if self._index is not None:
+            return self._index
+        index = {}
+        latest = {}     # (product_key, day) -> row, the latest recorded for that day
+        respelled = {}  # product_key -> spellings recorded besides the first
+        for row in self.db.query(
+                f"SELECT brand, product_name, effective_date, {', '.join(RATE_FIELDS)}, recorded_at "
+                "FROM price_history ORDER BY effective_date, recorded_at"):
+            brand, name, day = row[:3]
+            key = product_key(brand, name)
+            if self._names.setdefault(key, (brand, name)) != (brand, name):
+                respelled.setdefault(key, set()).add((brand, name))
+            days, versions = index.setdefault(key, ([], []))
+            version = dict(zip(RATE_FIELDS, row[3:-1]))
+            if days and days[-1] == day:
+                versions[-1] = version  # the same day under another spelling; the later one wins
+            else:
+                days.append(day)
+                versions.append(version)
+            latest[(key, day)] = row
+        if respelled:
+            spellings = {self._names[key] for key in respelled}.union(*respelled.values())
+            self._merge_spellings(spellings, [row for (key, _), row in latest.items() if key in respelled])
+            print(f"DEBUG: Merged price history of {len(respelled)} products recorded under another spelling")
+        self._index = index
+        return index
+
+    def _merge_spellings(self, spellings, rows):
+        """Replace the rows of these spellings with rows under the first spelling of each product"""
+        with self.db.transaction() as conn:
+            conn.executemany("DELETE FROM price_history WHERE brand = ? AND product_name = ?", spellings)
+            conn.executemany(
+                f"INSERT INTO price_history (brand, product_name, effective_date, "
+                f"{', '.join(RATE_FIELDS)}, recorded_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [self._names[product_key(row[0], row[1])] + tuple(row[2:]) for row in rows]
+            )
+
+    def record(self, brand, name, effective_date, rates):
+        """Record the rates a product takes from effective_date on
+
+        rates is a dict with RATE_FIELDS. Recording the same day again
+        replaces that version; a version identical to the one already in
+        effect that day is skipped.
+        """
+        day = as_day(effective_date)
+        version = {field: round(float(rates.get(field) or 0), 2) for field in RATE_FIELDS}
+        key = product_key(brand, name)
+        with self.lock:
+            days, versions = self._load().setdefault(key, ([], []))
+            position = bisect_right(days, day)
+            if position and versions[position - 1] == version:
+                return False
+            brand, name = self._names.setdefault(key, (brand, name))
+            with self.db.transaction() as conn:
+                conn.execute(
+                    f"INSERT OR REPLACE INTO price_history (brand, product_name, effective_date, "
+                    f"{', '.join(RATE_FIELDS)}, recorded_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (brand, name, day, *(version[f] for f in RATE_FIELDS),
+                     datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+                )
+            if position and days[position - 1] == day:
+                versions[position - 1] = version
+            else:
+                days.insert(position, day)
+                versions.insert(position, version)
+        return True
+
+    def record_products(self, products):
+        """Record the current rates of products as of their purchase date"""
+        count = 0
+        for product in products:
+            try:
+                day = as_day(product.purchase_date or None)
+            except ValueError:
+                day = as_day()
+            rates = {field: getattr(product, field) for field in RATE_FIELDS}
+            if self.record(product.brand, product.name, day, rates):
+                count += 1
+        return count
+
+    def ensure_baseline(self, products):
+        """Give products without any history a version for their current rates"""
+        with self.lock:
+            index = self._load()
+            missing = [p for p in products if product_key(p.brand, p.name) not in index]
+        count = self.record_products(missing)
+        if count:
+            print(f"DEBUG: Recorded price history for {count} products")
+        return count
+
+    def rate_at(self, brand, name, when=None):
+        """Rates of a product in effect on a day (default today), or None"""
+        day = as_day(when)
+        with self.lock:
+            entry = self._load().get(product_key(brand, name))
+            if not entry:
+                return None
+            position = bisect_right(entry[0], day)
+            return dict(entry[1][position - 1]) if position else None
+
+    def versions(self, brand, name):
+        """All versions of a product as [(effective day, rates)], oldest first"""
+        with self.lock:
+            days, versions = self._load().get(product_key(brand, name), ([], []))
+            return [(day, dict(rates)) for day, rates in zip(days, versions)]
+
+    def reprice_items(self, items, when, field="purchase_rate"):
+        """Value bill items at one rate field as of a day
+
+        Returns [(item, rate, amount)]; items with no history are valued at
+        their billed rate.
+        """
+        day = as_day(when)
+        priced = []
+        for item in items:
+            rates = self.rate_at(item.get("brand", ""), item.get("name", ""), day)
+            rate = rates[field] if rates else float(item.get("rate", 0) or 0)
+            priced.append((item, rate, round(rate * float(item.get("qty", 0) or 0), 2)))
+        return priced
@@ -1,93 +1,211 @@
 # src/models/product.py
-import csv
 import os
 from datetime import datetime
 
+from .product_store import ProductStore, row_to_record, record_to_row
+from .persistence_queue import PersistenceQueue
+from .product_backup import ProductBackups
+from .stock_ledger import StockLedger
+from .price_history import PriceHistory
+from ..utils.calculations import calculate_retail_rate, update_closing_stock
+
+
+class Product:
+    """Product record with parsed rates and stock counts"""
+    
+    __slots__ = (
+        "brand", "name", "purchase_date", "purchase_rate", "margin1",
+        "wholesale_rate", "margin2", "retail_rate", "opening_stock",
+        "purchased_stock", "sold_stock", "modified_date"
+    )
+    
+    def __init__(self, brand="", name="", purchase_date="", purchase_rate=0.0, margin1=0.0,
+                 wholesale_rate=0.0, margin2=0.0, retail_rate=0.0, opening_stock=0,
+                 purchased_stock=0, sold_stock=0, modified_date=""):
+        self.brand = brand
+        self.name = name
+        self.purchase_date = purchase_date or ""
+        self.purchase_rate = float(purchase_rate)
+        self.margin1 = float(margin1)
+        self.wholesale_rate = float(wholesale_rate)
+        self.margin2 = float(margin2)
+        self.retail_rate = float(retail_rate)
+        self.opening_stock = int(opening_stock)
+        self.purchased_stock = int(purchased_stock)
+        self.sold_stock = int(sold_stock)
+        self.modified_date = modified_date or ""
+    
+    def __repr__(self):
+        return f"Product({self.brand!r}, {self.name!r}, closing={self.closing_stock})"
+    
+    @property
+    def closing_stock(self):
+        """Closing stock derived from opening, purchased and sold"""
+        return update_closing_stock(self.opening_stock, self.purchased_stock, self.sold_stock)
+    
+    def recalculate_rates(self):
+        """Recompute wholesale and retail rates from the purchase rate and margins"""
+        self.wholesale_rate = round(self.purchase_rate * (1 + self.margin1 / 100), 2)
+        self.retail_rate = calculate_retail_rate(self.wholesale_rate, self.margin2)
+    
+    def rate_for(self, bill_type):
+        """Wholesale rate for "W" bills, retail rate otherwise"""
+        return self.wholesale_rate if bill_type == "W" else self.retail_rate
+    
+    @classmethod
+    def from_record(cls, record):
+        """Build a product from a stored tuple"""
+        return cls(*record)
+    
+    def to_record(self):
+        """Stored tuple for this product (ProductStore COLUMNS order)"""
+        return (
+            self.brand, self.name, self.purchase_date,
+            round(self.purchase_rate, 2), round(self.margin1, 2),
+            round(self.wholesale_rate, 2), round(self.margin2, 2),
+            round(self.retail_rate, 2), int(self.opening_stock),
+            int(self.purchased_stock), int(self.sold_stock), self.modified_date
+        )
+    
+    def apply_record(self, record):
+        """Take the values of a stored tuple (as written by the store)"""
+        for field, value in zip(self.__slots__, record):
+            setattr(self, field, value)
+    
+    @classmethod
+    def from_row(cls, row):
+        """Build a product from a CSV-style row of strings"""
+        return cls.from_record(row_to_record(row))
+    
+    def to_row(self):
+        """CSV-style row of strings for export and display"""
+        return record_to_row(self.to_record())
+
+
 class ProductModel:
     """Product data model and operations"""
     
+    _store = None
+    
+    @staticmethod
+    def get_store():
+        """Get the product store, importing products.csv on first use"""
+        if ProductModel._store is None:
+            store = ProductStore()
+            if store.is_empty() and os.path.exists("products.csv"):
+                count = store.import_csv("products.csv")
+                print(f"DEBUG: Imported {count} products from products.csv")
+            ProductModel._store = store
+        return ProductModel._store
+    
     @staticmethod
     def load_products():
-        """Load products from CSV file"""
+        """Load products from the product store"""
         products = []
-        if os.path.exists("products.csv"):
-            try:
-                with open("products.csv", mode="r", newline='', encoding='utf-8') as file:
-                    reader = csv.DictReader(file)
-                    for row in reader:
-                        # Ensure all required fields exist with proper defaults
-                        required_fields = {
-                            'Margin1 (%)': '0',
-                            'Margin2 (%)': '0', 
-                            'Opening Stock': '0',
-                            'Purchased Stock': '0',
-                            'Sold Stock': '0',
-                            'Purchase Rate': '0',
-                            'Purchase Date': datetime.now().strftime("%Y-%m-%d"),
-                            'Modified Date': datetime.now().strftime("%Y-%m-%d")
-                        }
-                        
-                        for field, default in required_fields.items():
-                            if field not in row or not row[field].strip():
-                                row[field] = default
-                        
-                        # Calculate rates and closing stock
-                        from ..utils.calculations import calculate_retail_rate, update_closing_stock
-                        
-                        try:
-                            purchase_rate = float(row.get('Purchase Rate', 0))
-                            margin1 = float(row.get('Margin1 (%)', 0))
-                            wholesale_rate = round(purchase_rate * (1 + margin1 / 100), 2)
-                            row['Wholesale Rate'] = f"{wholesale_rate:.2f}"
-                            
-                            margin2 = float(row.get('Margin2 (%)', 0))
-                            retail_rate = calculate_retail_rate(wholesale_rate, margin2)
-                            row['Retail Rate'] = f"{retail_rate:.2f}"
-                            
-                            opening = int(row.get('Opening Stock', 0))
-                            purchased = int(row.get('Purchased Stock', 0))
-                            sold = int(row.get('Sold Stock', 0))
-                            row['Closing Stock'] = str(update_closing_stock(opening, purchased, sold))
-                        except ValueError:
-                            continue
-                        
-                        products.append(row)
+        try:
+            ProductModel.wait_for_queued_writes()
+            today = datetime.now().strftime("%Y-%m-%d")
+            for record in ProductModel.get_store().load_records():
+                product = Product.from_record(record)
                 
-                print(f"DEBUG: Successfully loaded {len(products)} products")
-            except Exception as e:
-                print(f"Failed to load products: {str(e)}")
-        else:
-            print("DEBUG: products.csv file does not exist")
+                # Ensure dates exist and rates follow the margins
+                product.purchase_date = product.purchase_date or today
+                product.modified_date = product.modified_date or today
+                product.recalculate_rates()
+                
+                products.append(product)
+            
+            # Products that predate the stock ledger start from their current stock
+            StockLedger.get().ensure_baseline(products)
+            PriceHistory.get().ensure_baseline(products)
+            
+            print(f"DEBUG: Successfully loaded {len(products)} products")
+        except Exception as e:
+            print(f"Failed to load products: {str(e)}")
         
         return products
     
     @staticmethod
-    def save_products(products):
-        """Save products to CSV file"""
-        if not products:
+    def save_products(catalog):
+        """Save a catalog, writing only the products changed or removed since its last save"""
+        if not len(catalog):
             print("DEBUG: No products to save")
             return False
-            
-        fieldnames = [
-            "Brand", "Product Name", "Purchase Date", "Purchase Rate", 
-            "Margin1 (%)", "Wholesale Rate", "Margin2 (%)", "Retail Rate",
-            "Opening Stock", "Purchased Stock", "Sold Stock", "Closing Stock", "Modified Date"
-        ]
+        return ProductModel.save_changes(catalog)
+    
+    @staticmethod
+    def save_changes(catalog, movements=()):
+        """Save only the products changed in the catalog since its last save
+        
+        movements are (kind, brand, name, qty, ref, unit_cost) stock
+        movements recorded in the same transaction as the products.
+        """
+        products, removed = catalog.changes()
+        if not products and not removed and not movements:
+            return True
         
         try:
-            # Create backup of existing file
-            if os.path.exists("products.csv"):
-                backup_name = f"products_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-                os.rename("products.csv", backup_name)
-                print(f"DEBUG: Created backup: {backup_name}")
-                
-            with open("products.csv", mode="w", newline="", encoding='utf-8') as file:
-                writer = csv.DictWriter(file, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(products)
+            ProductModel.wait_for_queued_writes()
+            ledger = StockLedger.get()
+            inserted = []
+            
+            def record_movements(conn):
+                inserted.extend(ledger.insert(conn, movements))
             
-            print("DEBUG: Products saved successfully to CSV")
+            committed = ProductModel.get_store().commit([p.to_record() for p in products], removed,
+                                                        also=record_movements)
+            ledger.notify(inserted)
+            
+            # Keep the in-memory products identical to what was stored
+            for product in products:
+                record = committed.get(catalog.key_of(product))
+                if record is not None:
+                    product.apply_record(record)
+            catalog.mark_saved(products, removed)
+            PriceHistory.get().record_products(products)  # a new version if the rates changed
+            print(f"DEBUG: Products saved successfully ({len(products)} changed, {len(removed)} removed)")
+            ProductModel.backup()
             return True
         except Exception as e:
             print(f"DEBUG: Save products error: {str(e)}")
-            return False
\ No newline at end of file
+            return False
+    
+    @staticmethod
+    def backup():
+        """Snapshot the saved products in the background (rate-limited)"""
+        ProductBackups.get().snapshot_in_background(ProductModel.get_store())
+    
+    @staticmethod
+    def restore_backup(at=None):
+        """Replace the stored products with the snapshot taken at or before a time"""
+        backups = ProductBackups.get()
+        entry = backups.find(at)
+        if entry is None:
+            raise ValueError("No product backup at or before that time")
+        ProductModel.wait_for_queued_writes()
+        store = ProductModel.get_store()
+        backups.snapshot_store(store)  # the current state can be restored too
+        changed, removed = store.sync_records(backups.load(entry[1]))
+        print(f"DEBUG: Restored products from {entry[0]} ({changed} changed, {removed} removed)")
+        return entry
+    
+    @staticmethod
+    def wait_for_queued_writes(timeout=10):
+        """Let queued bill writes finish before products are read or saved"""
+        queue = PersistenceQueue.get()
+        if queue.last_error:
+            # Retrying a failed write; it will not overwrite products saved meanwhile
+            print(f"DEBUG: Not waiting for queued writes ({queue.pending()} pending, retrying)")
+            return
+        if not queue.flush(timeout):
+            print("DEBUG: Queued writes still pending; continuing without them")
+    
+    @staticmethod
+    def import_csv(filename="products.csv"):
+        """Import products from a CSV file into the store"""
+        return ProductModel.get_store().import_csv(filename)
+    
+    @staticmethod
+    def export_csv(filename="products.csv"):
+        """Export all products from the store to a CSV file"""
+        return ProductModel.get_store().export_csv(filename)
@@ -0,0 +1,223 @@
+# src/app/models/product_backup.py
+import csv
+import glob
+import gzip
+import hashlib
+import io
+import os
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+
+from .product_store import FIELDNAMES, record_to_row, row_to_record
+
+BACKUP_DIR = "backups"
+MANIFEST_FILE = "manifest.csv"
+MANIFEST_FIELDS = ["Timestamp", "Hash", "Products"]
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Minimum seconds between automatic snapshots taken after product saves
+SNAPSHOT_INTERVAL = 600
+
+# Retention: every snapshot's hour is kept for HOURLY_DAYS, then one per day
+# for DAILY_DAYS; the newest snapshot is always kept
+HOURLY_DAYS = 1
+DAILY_DAYS = 30
+
+LEGACY_PATTERN = re.compile(r"products_backup_(\d{8}_\d{6})\.csv$")
+
+
+def parse_time(text):
+    """Parse a restore point ("2026-10-18", "2026-10-18 14:30" or full timestamp)"""
+    for fmt in (TIMESTAMP_FORMAT, "%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            parsed = datetime.strptime(text.strip(), fmt)
+        except ValueError:
+            continue
+        if fmt == "%Y-%m-%d":
+            parsed = parsed.replace(hour=23, minute=59, second=59)
+        return parsed
+    raise ValueError(f"Invalid date/time: {text}")
+
+
+class ProductBackups:
+    """Compressed, content-addressed snapshots of the product catalog
+
+    Each distinct catalog state is stored once as objects/<sha256>.csv.gz;
+    manifest.csv lists when each state was captured. Old entries are pruned
+    by the retention policy and unreferenced objects are deleted.
+    """
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, directory=BACKUP_DIR):
+        self.directory = directory
+        self.objects_dir = os.path.join(directory, "objects")
+        self.manifest_path = os.path.join(directory, MANIFEST_FILE)
+        self.lock = threading.RLock()
+        self._last_snapshot = 0.0
+        self._worker = None
+
+    @classmethod
+    def get(cls, directory=BACKUP_DIR):
+        """Get the shared backup set for a directory"""
+        key = os.path.abspath(directory)
+        with cls._instances_lock:
+            backups = cls._instances.get(key)
+            if backups is None:
+                backups = cls(directory)
+                cls._instances[key] = backups
+            return backups
+
+    def entries(self):
+        """Manifest entries as (datetime, hash, product count), oldest first"""
+        if not os.path.exists(self.manifest_path):
+            return []
+        entries = []
+        with open(self.manifest_path, mode="r", newline="", encoding="utf-8") as file:
+            for row in csv.DictReader(file):
+                try:
+                    entries.append((datetime.strptime(row["Timestamp"], TIMESTAMP_FORMAT),
+                                    row["Hash"], int(row["Products"])))
+                except (KeyError, ValueError):
+                    continue
+        entries.sort(key=lambda e: e[0])
+        return entries
+
+    def _write_manifest(self, entries):
+        temp_path = f"{self.manifest_path}.tmp"
+        with open(temp_path, mode="w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(MANIFEST_FIELDS)
+            for when, digest, count in entries:
+                writer.writerow([when.strftime(TIMESTAMP_FORMAT), digest, count])
+        os.replace(temp_path, self.manifest_path)
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, f"{digest}.csv.gz")
+
+    @staticmethod
+    def _encode(records):
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=FIELDNAMES, lineterminator="\n")
+        writer.writeheader()
+        for record in sorted(records, key=lambda r: (r[0], r[1])):
+            writer.writerow(record_to_row(record))
+        return buffer.getvalue().encode("utf-8")
+
+    def snapshot(self, records, when=None):
+        """Store the catalog state if it differs from the newest snapshot; returns its hash"""
+        records = list(records)
+        data = self._encode(records)
+        digest = hashlib.sha256(data).hexdigest()
+        when = (when or datetime.now()).replace(microsecond=0)
+
+        with self.lock:
+            os.makedirs(self.objects_dir, exist_ok=True)
+            entries = self.entries()
+            if entries and entries[-1][1] == digest and entries[-1][0] <= when:
+                return digest  # unchanged since the last snapshot
+
+            path = self._object_path(digest)
+            if not os.path.exists(path):
+                temp_path = f"{path}.tmp"
+                with gzip.open(temp_path, mode="wb") as file:
+                    file.write(data)
+                os.replace(temp_path, path)
+
+            entries.append((when, digest, len(records)))
+            entries.sort(key=lambda e: e[0])
+            self._write_manifest(self._retained(entries, datetime.now()))
+            self._remove_unreferenced()
+        return digest
+
+    @staticmethod
+    def _retained(entries, now):
+        """Apply the retention policy to entries sorted oldest first"""
+        if not entries:
+            return []
+        kept = {}
+        for when, digest, count in entries:
+            age = now - when
+            if age < timedelta(days=HOURLY_DAYS):
+                bucket = when.strftime("%Y%m%d%H")
+            elif age < timedelta(days=DAILY_DAYS):
+                bucket = when.strftime("%Y%m%d")
+            else:
+                continue
+            kept[bucket] = (when, digest, count)  # latest snapshot in the bucket wins
+        retained = sorted(kept.values(), key=lambda e: e[0])
+        if not retained or retained[-1] != entries[-1]:
+            retained.append(entries[-1])
+        return retained
+
+    def prune(self, now=None):
+        """Re-apply the retention policy; returns the number of entries dropped"""
+        with self.lock:
+            entries = self.entries()
+            retained = self._retained(entries, now or datetime.now())
+            if len(retained) != len(entries):
+                self._write_manifest(retained)
+            self._remove_unreferenced()
+        return len(entries) - len(retained)
+
+    def _remove_unreferenced(self):
+        referenced = {digest for _, digest, _ in self.entries()}
+        for path in glob.glob(os.path.join(self.objects_dir, "*.csv.gz")):
+            if os.path.basename(path)[:-len(".csv.gz")] not in referenced:
+                os.remove(path)
+
+    def load(self, digest):
+        """Records stored in a snapshot"""
+        with gzip.open(self._object_path(digest), mode="rt", encoding="utf-8", newline="") as file:
+            return [row_to_record(row) for row in csv.DictReader(file)]
+
+    def find(self, at=None):
+        """Newest manifest entry taken at or before a time (default: newest)"""
+        entries = self.entries()
+        if at is not None:
+            entries = [e for e in entries if e[0] <= at]
+        return entries[-1] if entries else None
+
+    def snapshot_store(self, store):
+        """Snapshot the committed products of a ProductStore"""
+        return self.snapshot(store.snapshot_records())
+
+    def snapshot_in_background(self, store, force=False):
+        """Snapshot a store on a worker thread, at most every SNAPSHOT_INTERVAL seconds"""
+        now = time.monotonic()
+        with self.lock:
+            if not force and now - self._last_snapshot < SNAPSHOT_INTERVAL:
+                return None
+            if self._worker is not None and self._worker.is_alive():
+                return self._worker
+            self._last_snapshot = now
+            self._worker = threading.Thread(target=self._run_snapshot, args=(store,),
+                                            name="product-backup", daemon=True)
+            self._worker.start()
+            return self._worker
+
+    def _run_snapshot(self, store):
+        try:
+            self.snapshot_store(store)
+        except Exception as e:
+            print(f"Error backing up products: {e}")
+
+    def import_legacy(self, directory=".", delete=False):
+        """Import products_backup_YYYYmmdd_HHMMSS.csv files as snapshots"""
+        imported = 0
+        for path in sorted(glob.glob(os.path.join(directory, "products_backup_*.csv"))):
+            match = LEGACY_PATTERN.search(os.path.basename(path))
+            if not match:
+                continue
+            when = datetime.strptime(match.group(1), "%Y%m%d_%H%M%S")
+            with open(path, mode="r", newline="", encoding="utf-8") as file:
+                records = [row_to_record(row) for row in csv.DictReader(file)
+                           if row.get("Brand") or row.get("Product Name")]
+            self.snapshot(records, when)
+            imported += 1
+            if delete:
+                os.remove(path)
+        return imported
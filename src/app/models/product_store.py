@@ -0,0 +1,305 @@
+# src/app/models/product_store.py
+import csv
+import os
+import threading
+import time
+
+from .database import Database
+from .catalog import product_key
+
+FIELDNAMES = [
+    "Brand", "Product Name", "Purchase Date", "Purchase Rate",
+    "Margin1 (%)", "Wholesale Rate", "Margin2 (%)", "Retail Rate",
+    "Opening Stock", "Purchased Stock", "Sold Stock", "Closing Stock", "Modified Date"
+]
+
+# Stored columns in the same order as row tuples
+COLUMNS = [
+    "brand", "product_name", "purchase_date", "purchase_rate", "margin1",
+    "wholesale_rate", "margin2", "retail_rate", "opening_stock",
+    "purchased_stock", "sold_stock", "modified_date"
+]
+
+
+def _to_float(value):
+    try:
+        return float(value or 0)
+    except (ValueError, TypeError):
+        return 0.0
+
+
+def _to_int(value):
+    try:
+        return int(float(value or 0))
+    except (ValueError, TypeError):
+        return 0
+
+
+def row_to_record(row):
+    """Convert a CSV-style product row to a typed tuple for storage"""
+    return (
+        row.get("Brand", ""),
+        row.get("Product Name", ""),
+        row.get("Purchase Date", ""),
+        _to_float(row.get("Purchase Rate")),
+        _to_float(row.get("Margin1 (%)")),
+        _to_float(row.get("Wholesale Rate")),
+        _to_float(row.get("Margin2 (%)")),
+        _to_float(row.get("Retail Rate")),
+        _to_int(row.get("Opening Stock")),
+        _to_int(row.get("Purchased Stock")),
+        _to_int(row.get("Sold Stock")),
+        row.get("Modified Date", "")
+    )
+
+
+def record_to_row(record):
+    """Convert a stored tuple back to a CSV-style product row"""
+    (brand, name, purchase_date, purchase_rate, margin1, wholesale_rate,
+     margin2, retail_rate, opening, purchased, sold, modified_date) = record
+    return {
+        "Brand": brand,
+        "Product Name": name,
+        "Purchase Date": purchase_date or "",
+        "Purchase Rate": f"{purchase_rate:.2f}",
+        "Margin1 (%)": f"{margin1:.2f}",
+        "Wholesale Rate": f"{wholesale_rate:.2f}",
+        "Margin2 (%)": f"{margin2:.2f}",
+        "Retail Rate": f"{retail_rate:.2f}",
+        "Opening Stock": str(opening),
+        "Purchased Stock": str(purchased),
+        "Sold Stock": str(sold),
+        "Closing Stock": str(opening + purchased - sold),
+        "Modified Date": modified_date or ""
+    }
+
+
+class ProductStore:
+    """Product catalog stored as one keyed row per (Brand, Product Name)
+
+    Products are matched by product_key (brand and name ignoring case and
+    surrounding spaces), the same key the catalog uses, so saving "ACME"
+    updates the row stored as "Acme " instead of adding a second product.
+    """
+
+    def __init__(self, db=None):
+        self.db = db or Database.get()
+        # Saves come from the UI thread and the persistence worker
+        self.lock = threading.RLock()
+        # Last committed record per product_key, used to write only changed rows
+        self._committed = None
+        self._keys = {}        # product_key -> (brand, product_name) as stored
+        self._duplicates = {}  # product_key -> other stored spellings, merged on the next write
+        self._create_schema()
+
+    def _create_schema(self):
+        with self.db.transaction() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS products (
+                    brand TEXT NOT NULL,
+                    product_name TEXT NOT NULL,
+                    purchase_date TEXT,
+                    purchase_rate REAL NOT NULL DEFAULT 0,
+                    margin1 REAL NOT NULL DEFAULT 0,
+                    wholesale_rate REAL NOT NULL DEFAULT 0,
+                    margin2 REAL NOT NULL DEFAULT 0,
+                    retail_rate REAL NOT NULL DEFAULT 0,
+                    opening_stock INTEGER NOT NULL DEFAULT 0,
+                    purchased_stock INTEGER NOT NULL DEFAULT 0,
+                    sold_stock INTEGER NOT NULL DEFAULT 0,
+                    modified_date TEXT,
+                    updated_at REAL NOT NULL DEFAULT 0,
+                    PRIMARY KEY (brand, product_name)
+                )
+            """)
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(products)")]
+            if "updated_at" not in columns:
+                # Stores created before rows recorded when they were written
+                conn.execute("ALTER TABLE products ADD COLUMN updated_at REAL NOT NULL DEFAULT 0")
+
+    def is_empty(self):
+        """Check whether the store has no products"""
+        return not self.db.query("SELECT 1 FROM products LIMIT 1")
+
+    def load_records(self):
+        """Load all products as typed tuples in COLUMNS order"""
+        with self.lock:
+            records = [tuple(r) for r in self.db.query(f"SELECT {', '.join(COLUMNS)} FROM products ORDER BY rowid")]
+            self._committed = {}
+            self._keys = {}
+            self._duplicates = {}
+            for record in records:
+                key = product_key(record[0], record[1])
+                if key in self._keys:
+                    self._duplicates.setdefault(key, []).append((record[0], record[1]))
+                    continue
+                self._keys[key] = (record[0], record[1])
+                self._committed[key] = record
+            if self._duplicates:
+                print(f"DEBUG: {len(self._duplicates)} products are stored under more than one spelling")
+            return records
+
+    def _ensure_loaded(self):
+        if self._committed is None:
+            self.load_records()
+
+    def snapshot_records(self):
+        """All stored products as tuples, read without touching the change tracking"""
+        return [tuple(r) for r in self.db.query(f"SELECT {', '.join(COLUMNS)} FROM products ORDER BY rowid")]
+
+    def iter_records(self, page_size=5000):
+        """Yield stored products in insertion order, reading a page at a time"""
+        last = 0
+        while True:
+            rows = self.db.query(
+                f"SELECT rowid, {', '.join(COLUMNS)} FROM products WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                (last, page_size)
+            )
+            for row in rows:
+                yield tuple(row[1:])
+            if len(rows) < page_size:
+                return
+            last = rows[-1][0]
+
+    def load_rows(self):
+        """Load all products as CSV-style rows"""
+        return [record_to_row(r) for r in self.load_records()]
+
+    def upsert_records(self, records):
+        """Insert or update the given records only"""
+        records = list(records)
+        if not records:
+            return 0
+        self.commit(records)
+        return len(records)
+
+    def upsert_records_older_than(self, records, as_of):
+        """Insert or update records unless the stored row was written after as_of
+
+        Used to replay a snapshot taken at as_of (a time.time() value)
+        without overwriting products saved since. Returns the number written.
+        """
+        with self.lock:
+            self._ensure_loaded()
+            current = []
+            for record in records:
+                stored = self._keys.get(product_key(record[0], record[1]))
+                if stored is not None:
+                    rows = self.db.query(
+                        "SELECT updated_at FROM products WHERE brand = ? AND product_name = ?", stored
+                    )
+                    if rows and rows[0][0] > as_of:
+                        print(f"DEBUG: Skipped stale snapshot of {record[0]} {record[1]}")
+                        continue
+                current.append(record)
+            return self.upsert_records(current)
+
+    def upsert_rows(self, rows):
+        """Insert or update the given CSV-style rows only"""
+        return self.upsert_records(row_to_record(row) for row in rows)
+
+    def delete_keys(self, keys):
+        """Delete products by (brand, product name) key, matched as product_key"""
+        keys = list(keys)
+        if not keys:
+            return 0
+        self.commit([], keys)
+        return len(keys)
+
+    def commit(self, records, removed_keys=(), also=None):
+        """Write changed records and delete removed keys in one transaction
+
+        Keys are matched by product_key. A record whose brand or name is
+        spelled differently from the stored row renames that row. also, if
+        given, is called with the connection to make other writes in the
+        same transaction. Returns the committed records by product_key.
+        """
+        columns = COLUMNS + ["updated_at"]
+        placeholders = ", ".join("?" for _ in columns)
+        updates = ", ".join(f"{c} = excluded.{c}" for c in columns[2:])
+        with self.lock:
+            self._ensure_loaded()
+            written = {}
+            for record in records:
+                written[product_key(record[0], record[1])] = record
+            removed = {product_key(*key) for key in removed_keys} - set(written)
+
+            deletes = []
+            renames = []
+            for key in removed:
+                if key in self._keys:
+                    deletes.append(self._keys[key])
+                deletes.extend(self._duplicates.get(key, []))
+            for key, record in written.items():
+                deletes.extend(self._duplicates.get(key, []))
+                stored = self._keys.get(key)
+                if stored is not None and stored != (record[0], record[1]):
+                    renames.append((record[0], record[1]) + stored)
+
+            with self.db.transaction() as conn:
+                conn.executemany("DELETE FROM products WHERE brand = ? AND product_name = ?", deletes)
+                conn.executemany(
+                    "UPDATE products SET brand = ?, product_name = ? WHERE brand = ? AND product_name = ?",
+                    renames
+                )
+                now = time.time()
+                conn.executemany(
+                    f"INSERT INTO products ({', '.join(columns)}) VALUES ({placeholders}) "
+                    f"ON CONFLICT (brand, product_name) DO UPDATE SET {updates}",
+                    [tuple(record) + (now,) for record in written.values()]
+                )
+                if also is not None:
+                    also(conn)
+
+            for key in removed:
+                self._committed.pop(key, None)
+                self._keys.pop(key, None)
+                self._duplicates.pop(key, None)
+            for key, record in written.items():
+                self._duplicates.pop(key, None)
+                self._keys[key] = (record[0], record[1])
+                self._committed[key] = record
+        return written
+
+    def sync_records(self, records):
+        """Make the store match records, writing only changed, new and removed products
+
+        This compares every product, so it is for replacing the whole
+        catalog (restoring a backup); saves from the app write only the
+        catalog's changes through commit().
+        """
+        with self.lock:
+            self._ensure_loaded()
+
+            changed = []
+            seen = set()
+            for record in records:
+                key = product_key(record[0], record[1])
+                seen.add(key)
+                if self._committed.get(key) != record or key in self._duplicates:
+                    changed.append(record)
+
+            removed = [key for key in self._committed if key not in seen]
+            self.commit(changed, removed)
+        return len(changed), len(removed)
+
+    def sync_rows(self, rows):
+        """Make the store match CSV-style rows"""
+        return self.sync_records([row_to_record(row) for row in rows])
+
+    def import_csv(self, path="products.csv"):
+        """Import products from a CSV file (rows are upserted by key)"""
+        if not os.path.exists(path):
+            return 0
+        with open(path, mode="r", newline="", encoding="utf-8") as file:
+            rows = [row for row in csv.DictReader(file) if row.get("Brand") or row.get("Product Name")]
+        return self.upsert_rows(rows)
+
+    def export_csv(self, path="products.csv"):
+        """Export all products to a CSV file"""
+        rows = self.load_rows()
+        with open(path, mode="w", newline="", encoding="utf-8") as file:
+            writer = csv.DictWriter(file, fieldnames=FIELDNAMES)
+            writer.writeheader()
+            writer.writerows(rows)
+        return len(rows)
@@ -0,0 +1,214 @@
+# src/app/models/rate_schedule.py
+import csv
+import heapq
+import os
+import threading
+from datetime import datetime
+
+from .catalog import product_key
+from ..utils.validators import safe_float_convert
+
+FUTURE_RATES_FILE = "future_rate_changes.csv"
+FIELDNAMES = [
+    'Brand', 'Product Name', 'New Purchase Rate', 'Effective Date',
+    'Margin1 (%)', 'Wholesale Rate', 'Margin2 (%)',
+    'Retail Rate', 'Modified Date'
+]
+
+
+class RateChange:
+    """A scheduled rate change for one product, parsed once"""
+
+    __slots__ = ("brand", "product_name", "key", "effective_date", "row", "rates")
+
+    def __init__(self, row):
+        self.row = dict(row)
+        self.brand = self.row.get('Brand') or ''  # blank in files written before brands were kept
+        self.product_name = self.row.get('Product Name', '')
+        self.key = product_key(self.brand, self.product_name)
+        self.effective_date = datetime.strptime(self.row.get('Effective Date', ''), "%Y-%m-%d").date()
+        self.rates = {
+            'purchase_rate': safe_float_convert(self.row.get('New Purchase Rate')),
+            'wholesale_rate': safe_float_convert(self.row.get('Wholesale Rate')),
+            'retail_rate': safe_float_convert(self.row.get('Retail Rate')),
+            'margin1': safe_float_convert(self.row.get('Margin1 (%)')),
+            'margin2': safe_float_convert(self.row.get('Margin2 (%)'))
+        }
+
+
+class RateSchedule:
+    """Pending future rate changes in a min-heap on effective date
+
+    future_rate_changes.csv is read once. Changes are kept in a heap for
+    "what is due next" and in a per-product index (one pending change per
+    product and effective date) for rate lookups; a change replaced or
+    applied is dropped from the index and skipped when it reaches the top
+    of the heap. Changes popped off the heap once due are held in a short
+    list until they are applied and removed. The file is only rewritten
+    when the schedule changes.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, path=FUTURE_RATES_FILE):
+        self.path = path
+        self.lock = threading.RLock()
+        self._heap = []       # (effective date, seq, change) not yet due
+        self._due = []        # changes popped off the heap as due, not yet applied
+        self._by_product = {}  # product_key -> {effective date: pending change}
+        self._seq = 0
+        self.listeners = []   # called with no arguments when the schedule changes
+        self._load()
+
+    @classmethod
+    def get(cls):
+        """Get the shared rate schedule"""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def _load(self):
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return
+        try:
+            with open(self.path, mode="r", encoding='utf-8') as file:
+                for row in csv.DictReader(file):
+                    if not row.get('Product Name'):
+                        continue
+                    try:
+                        self._add(RateChange(row))
+                    except ValueError:
+                        continue  # missing or malformed effective date
+        except Exception as e:
+            print(f"Error reading future rate changes: {e}")
+        print(f"DEBUG: Loaded {len(self)} future rate changes")
+
+    def _add(self, change):
+        self._by_product.setdefault(change.key, {})[change.effective_date] = change
+        self._seq += 1
+        heapq.heappush(self._heap, (change.effective_date, self._seq, change))
+
+    def _is_pending(self, change):
+        return self._by_product.get(change.key, {}).get(change.effective_date) is change
+
+    def _top(self):
+        """Earliest pending change still in the heap, discarding replaced ones"""
+        while self._heap:
+            change = self._heap[0][2]
+            if self._is_pending(change):
+                return change
+            heapq.heappop(self._heap)
+        return None
+
+    def _advance(self, day):
+        """Move changes effective on or before day from the heap to the due list"""
+        change = self._top()
+        while change is not None and change.effective_date <= day:
+            heapq.heappop(self._heap)
+            self._due.append(change)
+            change = self._top()
+        self._due = [change for change in self._due if self._is_pending(change)]
+
+    def _compact(self):
+        """Drop replaced and removed changes once they outnumber the pending ones"""
+        if len(self._heap) > 2 * len(self) + 64:
+            self._heap = [entry for entry in self._heap if self._is_pending(entry[2])]
+            heapq.heapify(self._heap)
+
+    def _save(self):
+        pending = sorted((c for changes in self._by_product.values() for c in changes.values()),
+                         key=lambda c: c.effective_date)
+        if not pending:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            return
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, mode="w", newline="", encoding='utf-8') as file:
+            writer = csv.DictWriter(file, fieldnames=FIELDNAMES, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(change.row for change in pending)
+        os.replace(tmp_path, self.path)
+
+    def _notify(self):
+        for listener in list(self.listeners):
+            try:
+                listener()
+            except Exception as e:
+                print(f"Error notifying rate schedule listener: {e}")
+
+    def schedule(self, row):
+        """Add a change (a future_rate_changes.csv row), replacing one for the same product and date"""
+        change = RateChange(row)
+        with self.lock:
+            self._add(change)
+            self._compact()
+            self._save()
+        self._notify()
+        return change
+
+    def next_due(self, after=None):
+        """Effective date of the earliest pending change (after the given date, if any), or None"""
+        with self.lock:
+            if after is None:
+                held = [change.effective_date for change in self._due if self._is_pending(change)]
+                change = self._top()
+                return min(held + ([change.effective_date] if change else []), default=None)
+            self._advance(after)
+            change = self._top()
+            # Held changes are only later than after if an earlier call looked further ahead
+            later = [c.effective_date for c in self._due if c.effective_date > after]
+            if change is not None:
+                later.append(change.effective_date)
+            return min(later, default=None)
+
+    def due(self, today=None):
+        """Changes effective on or before today, earliest first (left in the schedule)"""
+        today = today or datetime.now().date()
+        with self.lock:
+            self._advance(today)
+            due = [change for change in self._due if change.effective_date <= today]
+        return sorted(due, key=lambda change: change.effective_date)
+
+    def remove(self, changes):
+        """Drop changes that have been applied; returns how many were still pending"""
+        removed = 0
+        with self.lock:
+            for change in changes:
+                pending = self._by_product.get(change.key, {})
+                if pending.get(change.effective_date) is not change:
+                    continue  # already replaced or removed
+                del pending[change.effective_date]
+                if not pending:
+                    del self._by_product[change.key]
+                removed += 1
+            if removed:
+                self._due = [change for change in self._due if self._is_pending(change)]
+                self._compact()
+                self._save()
+        return removed
+
+    def _changes_for(self, brand, product_name):
+        changes = self._by_product.get(product_key(brand, product_name))
+        if changes is None:
+            changes = self._by_product.get(product_key('', product_name), {})  # scheduled without a brand
+        return changes
+
+    def pending_changes(self, brand, product_name):
+        """Pending changes for a product, earliest first"""
+        with self.lock:
+            changes = self._changes_for(brand, product_name)
+            return [changes[day] for day in sorted(changes)]
+
+    def rates_on(self, brand, product_name, current_date):
+        """Rates from the latest pending change effective by current_date, else None"""
+        with self.lock:
+            changes = self._changes_for(brand, product_name)
+            effective = [day for day in changes if day <= current_date]
+            if effective:
+                return dict(changes[max(effective)].rates)
+            return None
+
+    def __len__(self):
+        return sum(len(changes) for changes in self._by_product.values())
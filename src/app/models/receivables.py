@@ -0,0 +1,368 @@
+# src/app/models/receivables.py
+import csv
+import os
+import threading
+from datetime import datetime
+
+from .database import Database
+from .sales_ledger import SalesLedger
+from .bill_index import bill_date_iso
+
+RECEIPTS_FILE = "sales_receipts.csv"
+RECEIPT_FIELDNAMES = ['Date', 'Customer', 'Amount Received', 'Cash', 'Cheque',
+                      'Bank Transfer', 'Total Sales', 'Initial Paid',
+                      'Total Paid', 'Remaining']
+
+# Amounts below this are treated as settled
+EPSILON = 0.005
+
+
+def _amount(value):
+    try:
+        return round(float(value or 0), 2)
+    except (ValueError, TypeError):
+        return 0.0
+
+
+class Receivables:
+    """Customer receivables: what each customer owes, kept up to date per bill and receipt
+
+    Every bill adds its Remaining Amount to the customer's running balance
+    and every sales receipt takes its payment off it. Receipts are applied
+    to the customer's open bills oldest first (FIFO); money received with
+    no bill open is held as credit and applied to the next bill. Balances
+    live in one row per customer and open bills in a partial index, so a
+    customer's outstanding amount, last payment and oldest unpaid bill are
+    a primary-key lookup and one indexed row, whatever the number of bills.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, db=None, ledger=None):
+        self.db = db or Database.get()
+        self.ledger = ledger or SalesLedger.get()
+        self._create_schema()
+        if not self.db.query("SELECT 1 FROM receivable_payments LIMIT 1"):
+            self.import_receipts()
+        if not self.db.query("SELECT 1 FROM customer_balances LIMIT 1"):
+            if self.ledger.bill_count() or self.db.query("SELECT 1 FROM receivable_payments LIMIT 1"):
+                self.rebuild()
+        else:
+            self.sync_with_ledger()
+
+    @classmethod
+    def get(cls):
+        """Get the shared receivables ledger"""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def _create_schema(self):
+        with self.db.transaction() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS receivable_bills (
+                    bill_no TEXT PRIMARY KEY,
+                    customer TEXT NOT NULL,
+                    bill_date TEXT NOT NULL DEFAULT '',
+                    total REAL NOT NULL DEFAULT 0,
+                    paid REAL NOT NULL DEFAULT 0,
+                    remaining REAL NOT NULL DEFAULT 0,
+                    applied REAL NOT NULL DEFAULT 0,
+                    outstanding REAL NOT NULL DEFAULT 0
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_receivable_bills_open "
+                "ON receivable_bills (customer, bill_date, bill_no) WHERE outstanding > 0.005"
+            )
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS customer_balances (
+                    customer TEXT PRIMARY KEY,
+                    bills INTEGER NOT NULL DEFAULT 0,
+                    total_sales REAL NOT NULL DEFAULT 0,
+                    initial_paid REAL NOT NULL DEFAULT 0,
+                    received REAL NOT NULL DEFAULT 0,
+                    outstanding REAL NOT NULL DEFAULT 0,
+                    credit REAL NOT NULL DEFAULT 0,
+                    last_payment_date TEXT NOT NULL DEFAULT '',
+                    last_payment_amount REAL NOT NULL DEFAULT 0
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS receivable_payments (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    customer TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    amount REAL NOT NULL,
+                    cash REAL NOT NULL DEFAULT 0,
+                    cheque REAL NOT NULL DEFAULT 0,
+                    bank_transfer REAL NOT NULL DEFAULT 0,
+                    recorded_at TEXT NOT NULL
+                )
+            """)
+
+    @staticmethod
+    def _adjust(conn, customer, bills=0, total_sales=0.0, initial_paid=0.0,
+                received=0.0, outstanding=0.0, credit=0.0):
+        """Add to (or with negative values, take from) a customer's running totals"""
+        conn.execute(
+            "INSERT INTO customer_balances (customer, bills, total_sales, initial_paid, received, outstanding, credit) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (customer) DO UPDATE SET "
+            "bills = bills + excluded.bills, "
+            "total_sales = ROUND(total_sales + excluded.total_sales, 2), "
+            "initial_paid = ROUND(initial_paid + excluded.initial_paid, 2), "
+            "received = ROUND(received + excluded.received, 2), "
+            "outstanding = ROUND(outstanding + excluded.outstanding, 2), "
+            "credit = ROUND(credit + excluded.credit, 2)",
+            (customer, bills, total_sales, initial_paid, received, outstanding, credit)
+        )
+
+    @staticmethod
+    def _settle(conn, customer):
+        """Apply a customer's unapplied credit to their open bills, oldest first"""
+        row = conn.execute("SELECT credit FROM customer_balances WHERE customer = ?", (customer,)).fetchone()
+        credit = row[0] if row else 0.0
+        if credit < EPSILON:
+            return 0.0
+
+        applied_total = 0.0
+        cursor = conn.execute(
+            "SELECT bill_no, outstanding FROM receivable_bills "
+            "WHERE customer = ? AND outstanding > 0.005 ORDER BY bill_date, bill_no",
+            (customer,)
+        )
+        payments = []
+        for bill_no, outstanding in cursor:
+            applied = round(min(credit, outstanding), 2)
+            payments.append((applied, applied, bill_no))
+            applied_total += applied
+            credit = round(credit - applied, 2)
+            if credit < EPSILON:
+                break
+        conn.executemany(
+            "UPDATE receivable_bills SET applied = ROUND(applied + ?, 2), "
+            "outstanding = ROUND(outstanding - ?, 2) WHERE bill_no = ?",
+            payments
+        )
+        if applied_total:
+            Receivables._adjust(conn, customer, outstanding=-applied_total, credit=-applied_total)
+        return applied_total
+
+    @staticmethod
+    def _record(bill):
+        return (
+            bill["bill_no"],
+            (bill.get("customer") or "").strip(),
+            bill_date_iso(bill.get("date", "")) or "",
+            _amount(bill.get("total")),
+            _amount(bill.get("amount_paid")),
+            _amount(bill.get("remaining"))
+        )
+
+    def _apply_bill(self, conn, record):
+        """Add a bill (or replace its previous version) inside a transaction"""
+        bill_no, customer, day, total, paid, remaining = record
+        previous = conn.execute(
+            "SELECT customer, bill_date, total, paid, remaining, applied, outstanding "
+            "FROM receivable_bills WHERE bill_no = ?", (bill_no,)
+        ).fetchone()
+        if previous:
+            if tuple(previous[:5]) == (customer, day, total, paid, remaining):
+                return False  # a replayed save
+            # Receipts applied to the old version go back to the customer as credit
+            old_customer, _, old_total, old_paid, _, old_applied, old_outstanding = previous
+            self._adjust(conn, old_customer, bills=-1, total_sales=-old_total, initial_paid=-old_paid,
+                         outstanding=-old_outstanding, credit=old_applied)
+            conn.execute("DELETE FROM receivable_bills WHERE bill_no = ?", (bill_no,))
+            if old_customer != customer:
+                self._settle(conn, old_customer)
+
+        conn.execute(
+            "INSERT INTO receivable_bills (bill_no, customer, bill_date, total, paid, remaining, applied, outstanding) "
+            "VALUES (?, ?, ?, ?, ?, ?, 0, ?)",
+            (bill_no, customer, day, total, paid, remaining, remaining)
+        )
+        self._adjust(conn, customer, bills=1, total_sales=total, initial_paid=paid, outstanding=remaining)
+        self._settle(conn, customer)
+        return True
+
+    def add_bills(self, bills):
+        """Add saved bills to their customers' balances (a re-saved bill replaces its old amounts)"""
+        count = 0
+        with self.db.transaction() as conn:
+            for bill in bills:
+                if self._apply_bill(conn, self._record(bill)):
+                    count += 1
+        return count
+
+    def add_bill(self, bill):
+        """Add one saved bill"""
+        return self.add_bills([bill])
+
+    def record_payment(self, customer, amount, date=None, cash=0.0, cheque=0.0, bank_transfer=0.0,
+                       receipts_path=RECEIPTS_FILE):
+        """Record a sales receipt and apply it to the customer's oldest open bills
+
+        The receipt row is appended to sales_receipts.csv (unless
+        receipts_path is None) inside the same transaction, so if it cannot
+        be written the payment is rolled back too. Returns the customer's
+        balance afterwards (see balance()).
+        """
+        customer = (customer or "").strip()
+        amount = _amount(amount)
+        if not customer:
+            raise ValueError("A receipt needs a customer")
+        if amount <= 0:
+            raise ValueError("Amount received must be positive")
+        day = date or datetime.now().strftime("%Y-%m-%d")
+
+        with self.db.transaction() as conn:
+            conn.execute(
+                "INSERT INTO receivable_payments (customer, date, amount, cash, cheque, bank_transfer, recorded_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (customer, day, amount, _amount(cash), _amount(cheque), _amount(bank_transfer),
+                 datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+            )
+            self._apply_payment(conn, customer, day, amount)
+            balance = self.balance(customer)
+            if receipts_path:
+                self._append_receipt(receipts_path, {
+                    'Date': day,
+                    'Customer': customer,
+                    'Amount Received': f"{amount:.2f}",
+                    'Cash': f"{_amount(cash):.2f}",
+                    'Cheque': f"{_amount(cheque):.2f}",
+                    'Bank Transfer': f"{_amount(bank_transfer):.2f}",
+                    'Total Sales': f"{balance['total_sales']:.2f}",
+                    'Initial Paid': f"{balance['initial_paid']:.2f}",
+                    'Total Paid': f"{balance['total_paid']:.2f}",
+                    'Remaining': f"{balance['balance']:.2f}"
+                })
+        return balance
+
+    @staticmethod
+    def _append_receipt(path, row):
+        file_exists = os.path.exists(path) and os.path.getsize(path) > 0
+        with open(path, mode="a", newline="", encoding='utf-8') as file:
+            writer = csv.DictWriter(file, fieldnames=RECEIPT_FIELDNAMES)
+            if not file_exists:
+                writer.writeheader()
+            writer.writerow(row)
+            file.flush()
+            os.fsync(file.fileno())
+
+    def _apply_payment(self, conn, customer, day, amount):
+        self._adjust(conn, customer, received=amount, credit=amount)
+        conn.execute(
+            "UPDATE customer_balances SET last_payment_date = ?, last_payment_amount = ? "
+            "WHERE customer = ? AND last_payment_date <= ?",
+            (day, amount, customer, day)
+        )
+        self._settle(conn, customer)
+
+    def balance(self, customer):
+        """A customer's receivable summary, or None if they have no bills or receipts
+
+        Keys: bills, total_sales, initial_paid, received, total_paid,
+        outstanding, credit, balance (outstanding less credit),
+        last_payment_date, last_payment_amount, and the oldest unpaid bill
+        as oldest_bill_no, oldest_bill_date, oldest_bill_outstanding.
+        """
+        customer = (customer or "").strip()
+        with self.db.lock:
+            row = self.db.query(
+                "SELECT bills, total_sales, initial_paid, received, outstanding, credit, "
+                "last_payment_date, last_payment_amount FROM customer_balances WHERE customer = ?",
+                (customer,)
+            )
+            oldest = self.db.query(
+                "SELECT bill_no, bill_date, outstanding FROM receivable_bills "
+                "WHERE customer = ? AND outstanding > 0.005 ORDER BY bill_date, bill_no LIMIT 1",
+                (customer,)
+            )
+        if not row:
+            return None
+        bills, total_sales, initial_paid, received, outstanding, credit, last_date, last_amount = row[0]
+        oldest_bill_no, oldest_date, oldest_outstanding = oldest[0] if oldest else ("", "", 0.0)
+        return {
+            "bills": bills,
+            "total_sales": total_sales,
+            "initial_paid": initial_paid,
+            "received": received,
+            "total_paid": round(initial_paid + received, 2),
+            "outstanding": outstanding,
+            "credit": credit,
+            "balance": round(outstanding - credit, 2),
+            "last_payment_date": last_date,
+            "last_payment_amount": last_amount,
+            "oldest_bill_no": oldest_bill_no,
+            "oldest_bill_date": oldest_date,
+            "oldest_bill_outstanding": oldest_outstanding
+        }
+
+    def open_bills(self, customer):
+        """A customer's unpaid bills as [(bill_no, bill_date, total, outstanding)], oldest first"""
+        return self.db.query(
+            "SELECT bill_no, bill_date, total, outstanding FROM receivable_bills "
+            "WHERE customer = ? AND outstanding > 0.005 ORDER BY bill_date, bill_no",
+            ((customer or "").strip(),)
+        )
+
+    def import_receipts(self, path=RECEIPTS_FILE):
+        """Load payments from sales_receipts.csv into the payments table"""
+        if not os.path.exists(path):
+            return 0
+        rows = []
+        try:
+            with open(path, mode="r", newline="", encoding='utf-8') as file:
+                for row in csv.DictReader(file):
+                    customer = (row.get('Customer') or "").strip()
+                    amount = _amount(row.get('Amount Received'))
+                    if customer and amount > 0:
+                        rows.append((customer, row.get('Date') or "", amount, _amount(row.get('Cash')),
+                                     _amount(row.get('Cheque')), _amount(row.get('Bank Transfer')),
+                                     datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+        except Exception as e:
+            print(f"Error reading sales receipts: {e}")
+            return 0
+        with self.db.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO receivable_payments (customer, date, amount, cash, cheque, bank_transfer, recorded_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+        print(f"DEBUG: Imported {len(rows)} sales receipts")
+        return len(rows)
+
+    def sync_with_ledger(self):
+        """Add any ledger bills missing from the receivables (e.g. after migrate-bills)"""
+        count = self.db.query("SELECT COUNT(*) FROM receivable_bills")[0][0]
+        if count == self.ledger.bill_count():
+            return 0
+        known = {row[0] for row in self.db.query("SELECT bill_no FROM receivable_bills")}
+        missing = [bill for bill in self.ledger.iter_bills() if bill["bill_no"] not in known]
+        added = self.add_bills(sorted(missing, key=lambda bill: bill_date_iso(bill.get("date", "")) or ""))
+        print(f"DEBUG: Added {added} bills to customer receivables")
+        return added
+
+    def rebuild(self):
+        """Rebuild every balance from the sales ledger and recorded payments
+
+        Bills are added oldest first, then each customer's payments are
+        applied in date order, so receipts settle the oldest bills first.
+        """
+        records = sorted((self._record(bill) for bill in self.ledger.iter_bills()),
+                         key=lambda record: (record[2], record[0]))
+        payments = self.db.query("SELECT customer, date, amount FROM receivable_payments ORDER BY date, id")
+        with self.db.transaction() as conn:
+            conn.execute("DELETE FROM receivable_bills")
+            conn.execute("DELETE FROM customer_balances")
+            for record in records:
+                self._apply_bill(conn, record)
+            for customer, day, amount in payments:
+                self._apply_payment(conn, customer, day, amount)
+        print(f"DEBUG: Rebuilt receivables from {len(records)} bills and {len(payments)} receipts")
+        return len(records)
@@ -0,0 +1,334 @@
+# src/app/models/sales_ledger.py
+import csv
+import io
+import os
+import threading
+import time
+
+LEDGER_FILE = "sales_ledger.dat"
+INDEX_FILE = "sales_ledger.idx"
+
+# Record types
+HEADER = "H"   # H,bill_no,date,customer,phone,type,place,site,payment_type,include_gst,total,amount_paid,remaining,item_count
+ITEM = "L"     # L,bill_no,sno,brand,product,qty,rate,amount
+
+# fsync after this many bills or this many seconds, whichever comes first
+FSYNC_BATCH = 20
+FSYNC_INTERVAL = 2.0
+
+
+def _clean(value):
+    """Keep every record on a single line"""
+    return str(value).replace("\r", " ").replace("\n", " ")
+
+
+def _to_float(value):
+    try:
+        return float(value or 0)
+    except (ValueError, TypeError):
+        return 0.0
+
+
+def encode_bill(bill):
+    """Encode a bill dict as a header record followed by its line-item records"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    items = bill.get("items", [])
+    writer.writerow([_clean(v) for v in (
+        HEADER,
+        bill["bill_no"],
+        bill.get("date", ""),
+        bill.get("customer", ""),
+        bill.get("phone", ""),
+        bill.get("type", "Retail"),
+        bill.get("place", ""),
+        bill.get("site", ""),
+        bill.get("payment_type", "Cash"),
+        "Yes" if bill.get("include_gst") else "No",
+        f"{_to_float(bill.get('total')):.2f}",
+        f"{_to_float(bill.get('amount_paid')):.2f}",
+        f"{_to_float(bill.get('remaining')):.2f}",
+        len(items)
+    )])
+    for i, item in enumerate(items, 1):
+        writer.writerow([_clean(v) for v in (
+            ITEM,
+            bill["bill_no"],
+            i,
+            item.get("brand", ""),
+            item.get("name", ""),
+            item.get("qty", 0),
+            item.get("rate", 0),
+            item.get("amount", 0)
+        )])
+    return buffer.getvalue().encode("utf-8")
+
+
+def parse_header(fields):
+    """Parse a header record into a bill dict (without items)"""
+    return {
+        "bill_no": fields[1],
+        "date": fields[2],
+        "customer": fields[3],
+        "phone": fields[4],
+        "type": fields[5],
+        "place": fields[6],
+        "site": fields[7],
+        "payment_type": fields[8],
+        "include_gst": fields[9] == "Yes",
+        "total": _to_float(fields[10]),
+        "amount_paid": _to_float(fields[11]),
+        "remaining": _to_float(fields[12]),
+        "item_count": int(fields[13])
+    }
+
+
+def decode_bill(data):
+    """Decode one bill block (header + line items)"""
+    rows = list(csv.reader(io.StringIO(data.decode("utf-8"))))
+    if not rows or rows[0][0] != HEADER:
+        raise ValueError("Ledger block does not start with a bill header")
+    bill = parse_header(rows[0])
+    bill["items"] = [{
+        "brand": row[3],
+        "name": row[4],
+        "qty": _to_float(row[5]),
+        "rate": _to_float(row[6]),
+        "amount": _to_float(row[7])
+    } for row in rows[1:] if row and row[0] == ITEM]
+    return bill
+
+
+def read_bill_csv(path):
+    """Read a legacy bill_NNNN.csv file into a bill dict"""
+    with open(path, mode="r", newline="", encoding="utf-8") as file:
+        rows = list(csv.reader(file))
+
+    info = rows[1]
+    bill = {
+        "bill_no": info[0],
+        "date": info[1],
+        "customer": info[2] if len(info) > 2 else "",
+        "phone": info[3] if len(info) > 3 else "",
+        "type": info[4] if len(info) > 4 else "Retail",
+        "place": info[5] if len(info) > 5 else "",
+        "site": info[6] if len(info) > 6 else "",
+        "payment_type": info[7] if len(info) > 7 else "Cash",
+        "include_gst": (info[8] if len(info) > 8 else "No").lower() == "yes",
+        "items": [],
+        "total": 0.0,
+        "amount_paid": 0.0,
+        "remaining": 0.0
+    }
+
+    in_items = False
+    for row in rows[2:]:
+        if not row or not any(row):
+            in_items = False
+            continue
+        if row[0] == "S.No":
+            in_items = True
+        elif row[0] == "Total":
+            bill["total"] = _to_float(row[-1])
+        elif row[0] == "Amount Paid":
+            bill["amount_paid"] = _to_float(row[-1])
+        elif row[0] == "Remaining Amount":
+            bill["remaining"] = _to_float(row[-1])
+        elif in_items and len(row) >= 6:
+            bill["items"].append({
+                "brand": row[1],
+                "name": row[2],
+                "qty": _to_float(row[3]),
+                "rate": _to_float(row[4]),
+                "amount": _to_float(row[5])
+            })
+    return bill
+
+
+class SalesLedger:
+    """Append-only sales ledger with an offset index keyed by bill number"""
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, path=LEDGER_FILE, index_path=INDEX_FILE):
+        self.path = path
+        self.index_path = index_path
+        self.lock = threading.RLock()
+        self.offsets = {}  # bill_no -> (offset, length), latest version wins
+        self._indexed_end = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o644)
+        self._load_index()
+
+    @classmethod
+    def get(cls, path=LEDGER_FILE, index_path=INDEX_FILE):
+        """Get the shared ledger for a file, opening it on first use"""
+        key = os.path.abspath(path)
+        with cls._instances_lock:
+            ledger = cls._instances.get(key)
+            if ledger is None:
+                ledger = cls(path, index_path)
+                cls._instances[key] = ledger
+            return ledger
+
+    def _load_index(self):
+        size = os.path.getsize(self.path)
+        if os.path.exists(self.index_path):
+            with open(self.index_path, mode="r", encoding="utf-8") as file:
+                for line in file:
+                    parts = line.strip().split(",")
+                    if len(parts) != 3:
+                        continue
+                    offset, length = int(parts[1]), int(parts[2])
+                    if offset + length > size:
+                        continue  # bill lost before it was synced
+                    self.offsets[parts[0]] = (offset, length)
+                    self._indexed_end = max(self._indexed_end, offset + length)
+        self.refresh()
+
+        # Terminate a torn write so the next bill starts on its own line
+        if size:
+            with open(self.path, mode="rb") as file:
+                file.seek(-1, os.SEEK_END)
+                if file.read(1) != b"\n":
+                    os.write(self._fd, b"\n")
+
+    def refresh(self):
+        """Index bills appended after the last indexed offset (crash or another terminal)"""
+        with self.lock:
+            size = os.path.getsize(self.path)
+            if size <= self._indexed_end:
+                return 0
+
+            with open(self.path, mode="rb") as file:
+                file.seek(self._indexed_end)
+                parts = file.read(size - self._indexed_end).split(b"\n")
+            # The last part has no newline: either empty or a torn write
+            lines = [part + b"\n" for part in parts[:-1]]
+
+            found = []
+            offset = self._indexed_end
+            i = 0
+            while i < len(lines):
+                line = lines[i]
+                if line.startswith(HEADER.encode() + b","):
+                    try:
+                        fields = next(csv.reader([line.decode("utf-8")]))
+                        item_count = int(fields[13])
+                    except (ValueError, IndexError, StopIteration):
+                        item_count = None
+                    if item_count is not None:
+                        block = lines[i + 1:i + 1 + item_count]
+                        if len(block) == item_count and all(l.startswith(ITEM.encode() + b",") for l in block):
+                            length = len(line) + sum(len(l) for l in block)
+                            found.append((fields[1], offset, length))
+                            offset += length
+                            i += 1 + item_count
+                            continue
+                # Skip records that are not part of a complete bill block
+                offset += len(line)
+                i += 1
+
+            with open(self.index_path, mode="a", encoding="utf-8") as index_file:
+                for bill_no, offset, length in found:
+                    self.offsets[bill_no] = (offset, length)
+                    index_file.write(f"{bill_no},{offset},{length}\n")
+            self._indexed_end = max(self._indexed_end, offset)
+            return len(found)
+
+    def append_bill(self, bill):
+        """Append a bill as one sequential write and index its offset"""
+        data = encode_bill(bill)
+        with self.lock:
+            written = 0
+            while written < len(data):
+                written += os.write(self._fd, data[written:])
+            end = os.lseek(self._fd, 0, os.SEEK_CUR)
+            offset = end - len(data)
+
+            self.offsets[bill["bill_no"]] = (offset, len(data))
+            self._indexed_end = max(self._indexed_end, end)
+            with open(self.index_path, mode="a", encoding="utf-8") as index_file:
+                index_file.write(f"{bill['bill_no']},{offset},{len(data)}\n")
+
+            self._unsynced += 1
+            if self._unsynced >= FSYNC_BATCH or time.monotonic() - self._last_sync >= FSYNC_INTERVAL:
+                self.sync()
+        return offset
+
+    def append_blocks(self, blocks):
+        """Append many encoded bills [(bill_no, encode_bill(bill))] in one write and one fsync"""
+        if not blocks:
+            return 0
+        data = b"".join(block for _, block in blocks)
+        with self.lock:
+            written = 0
+            while written < len(data):
+                written += os.write(self._fd, data[written:])
+            offset = os.lseek(self._fd, 0, os.SEEK_CUR) - len(data)
+
+            index_lines = []
+            for bill_no, block in blocks:
+                self.offsets[bill_no] = (offset, len(block))
+                index_lines.append(f"{bill_no},{offset},{len(block)}\n")
+                offset += len(block)
+            self._indexed_end = max(self._indexed_end, offset)
+            with open(self.index_path, mode="a", encoding="utf-8") as index_file:
+                index_file.write("".join(index_lines))
+
+            self._unsynced += len(blocks)
+            self.sync()
+        return len(blocks)
+
+    def sync(self):
+        """Flush appended bills to disk"""
+        with self.lock:
+            if self._unsynced:
+                os.fsync(self._fd)
+                self._unsynced = 0
+            self._last_sync = time.monotonic()
+
+    def has_bill(self, bill_no):
+        """Check whether a bill number is in the ledger"""
+        return bill_no in self.offsets
+
+    def has_same_bill(self, bill):
+        """Check whether the latest saved version of a bill is identical to it"""
+        location = self.offsets.get(bill["bill_no"])
+        return location is not None and self._read(*location) == encode_bill(bill)
+
+    def bill_count(self):
+        """Number of distinct bills in the ledger"""
+        return len(self.offsets)
+
+    def _read(self, offset, length):
+        with open(self.path, mode="rb") as file:
+            file.seek(offset)
+            return file.read(length)
+
+    def get_bill(self, bill_no):
+        """Read one bill by seeking to its indexed offset"""
+        location = self.offsets.get(bill_no)
+        if location is None and self.refresh():
+            location = self.offsets.get(bill_no)
+        if location is None:
+            return None
+        return decode_bill(self._read(*location))
+
+    def iter_bills(self):
+        """Yield the latest version of every bill in ledger order"""
+        locations = sorted(self.offsets.values())
+        with open(self.path, mode="rb") as file:
+            for offset, length in locations:
+                file.seek(offset)
+                yield decode_bill(file.read(length))
+
+    def close(self):
+        """Sync and close the ledger"""
+        with self.lock:
+            self.sync()
+            os.close(self._fd)
+        with SalesLedger._instances_lock:
+            SalesLedger._instances.pop(os.path.abspath(self.path), None)
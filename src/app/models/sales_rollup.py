@@ -0,0 +1,81 @@
+# src/app/models/sales_rollup.py
+from .database import Database
+
+# Dimensions of a daily rollup row, in key order
+DIMENSIONS = ["bill_type", "payment_type", "include_gst", "place", "site"]
+
+
+class SalesRollup:
+    """Per-day sales totals by bill type, payment type, GST flag, place and site"""
+
+    def __init__(self, db=None):
+        self.db = db or Database.get()
+        self._create_schema()
+
+    def _create_schema(self):
+        with self.db.transaction() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS daily_sales (
+                    day TEXT NOT NULL,
+                    bill_type TEXT NOT NULL DEFAULT '',
+                    payment_type TEXT NOT NULL DEFAULT '',
+                    include_gst INTEGER NOT NULL DEFAULT 0,
+                    place TEXT NOT NULL DEFAULT '',
+                    site TEXT NOT NULL DEFAULT '',
+                    bill_count INTEGER NOT NULL DEFAULT 0,
+                    total REAL NOT NULL DEFAULT 0,
+                    PRIMARY KEY (day, bill_type, payment_type, include_gst, place, site)
+                )
+            """)
+
+    @staticmethod
+    def apply(conn, day, bill_type, payment_type, include_gst, place, site, bill_count, total):
+        """Add (or with negative values, remove) a bill's contribution inside a transaction"""
+        if not day:
+            return
+        conn.execute(
+            "INSERT INTO daily_sales (day, bill_type, payment_type, include_gst, place, site, bill_count, total) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (day, bill_type, payment_type, include_gst, place, site) DO UPDATE SET "
+            "bill_count = bill_count + excluded.bill_count, total = total + excluded.total",
+            (day, bill_type or "", payment_type or "", include_gst, place or "", site or "", bill_count, total)
+        )
+
+    def rebuild(self, bill_records):
+        """Regenerate all rollups from (day, type, payment, gst, place, site, total) records"""
+        totals = {}
+        for day, bill_type, payment_type, include_gst, place, site, total in bill_records:
+            if not day:
+                continue
+            key = (day, bill_type or "", payment_type or "", include_gst, place or "", site or "")
+            count, amount = totals.get(key, (0, 0.0))
+            totals[key] = (count + 1, amount + total)
+
+        with self.db.transaction() as conn:
+            conn.execute("DELETE FROM daily_sales")
+            conn.executemany(
+                "INSERT INTO daily_sales (day, bill_type, payment_type, include_gst, place, site, bill_count, total) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [key + value for key, value in totals.items()]
+            )
+        return len(totals)
+
+    def totals_between(self, start_date, end_date):
+        """Total bills and sales for days within [start_date, end_date]"""
+        bills, total = self.db.query(
+            "SELECT COALESCE(SUM(bill_count), 0), COALESCE(SUM(total), 0) FROM daily_sales "
+            "WHERE day BETWEEN ? AND ?",
+            (start_date.isoformat(), end_date.isoformat())
+        )[0]
+        return int(bills), round(total, 2)
+
+    def breakdown_between(self, start_date, end_date, dimension):
+        """Bills and sales per value of one dimension for days within [start_date, end_date]"""
+        if dimension not in DIMENSIONS:
+            raise ValueError(f"Unknown rollup dimension: {dimension}")
+        return self.db.query(
+            f"SELECT {dimension}, SUM(bill_count), SUM(total) FROM daily_sales "
+            f"WHERE day BETWEEN ? AND ? GROUP BY {dimension} HAVING SUM(bill_count) > 0 "
+            f"ORDER BY {dimension}",
+            (start_date.isoformat(), end_date.isoformat())
+        )
@@ -0,0 +1,300 @@
+# src/app/models/stock_ledger.py
+import threading
+from datetime import date, datetime, timedelta
+
+from .database import Database
+from .catalog import product_key
+
+# Movement kinds; quantities are stored signed (+ into stock, - out of stock)
+OPENING = "opening"
+SALE = "sale"
+PURCHASE = "purchase"
+RETURN = "return"
+ADJUSTMENT = "adjustment"
+KINDS = (OPENING, SALE, PURCHASE, RETURN, ADJUSTMENT)
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def movement_time(value=None):
+    """Normalize a bill/purchase date or datetime to a sortable timestamp"""
+    if isinstance(value, datetime):
+        return value.strftime(TIMESTAMP_FORMAT)
+    if isinstance(value, date):
+        return f"{value.isoformat()} 00:00:00"
+    for fmt in ("%d/%m/%Y %I:%M %p", TIMESTAMP_FORMAT, "%Y-%m-%d", "%d/%m/%Y"):
+        try:
+            return datetime.strptime((value or "").strip(), fmt).strftime(TIMESTAMP_FORMAT)
+        except ValueError:
+            continue
+    return datetime.now().strftime(TIMESTAMP_FORMAT)
+
+
+class StockLedger:
+    """Append-only stock movements with incrementally maintained balances
+
+    Every sale, purchase, return and adjustment is one row in
+    stock_movements. stock_balances holds running totals per product and is
+    updated in the same transaction as the movements it summarizes, so
+    current stock is a single-row read and any period's opening and closing
+    stock is one grouped pass over the movements.
+
+    Products are matched by product_key, like the catalog and the product
+    store: movements for "acme" and "Acme " are recorded under the one
+    spelling the ledger first saw for that product.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, db=None):
+        self.db = db or Database.get()
+        self.lock = threading.RLock()
+        # Called as listener(inserted, deleted_refs) after each committed change;
+        # inserted rows are (id, ts, brand, name, kind, qty, ref, unit_cost)
+        self.listeners = []
+        self._names = {}  # product_key -> (brand, name) as recorded
+        self._create_schema()
+        self._load_names()
+
+    @classmethod
+    def get(cls):
+        """Get the shared stock ledger"""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def _create_schema(self):
+        with self.db.transaction() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS stock_movements (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    ts TEXT NOT NULL,
+                    brand TEXT NOT NULL,
+                    product_name TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    qty INTEGER NOT NULL,
+                    ref TEXT NOT NULL DEFAULT '',
+                    unit_cost REAL
+                )
+            """)
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(stock_movements)")]
+            if "unit_cost" not in columns:
+                conn.execute("ALTER TABLE stock_movements ADD COLUMN unit_cost REAL")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_stock_movements_ts ON stock_movements (ts)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_stock_movements_ref ON stock_movements (ref, kind)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS stock_balances (
+                    brand TEXT NOT NULL,
+                    product_name TEXT NOT NULL,
+                    opening INTEGER NOT NULL DEFAULT 0,
+                    purchased INTEGER NOT NULL DEFAULT 0,
+                    sold INTEGER NOT NULL DEFAULT 0,
+                    returned INTEGER NOT NULL DEFAULT 0,
+                    adjusted INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (brand, product_name)
+                )
+            """)
+
+    def _load_names(self):
+        """Index recorded spellings, merging products recorded under more than one"""
+        respelled = []
+        for brand, name in self.db.query("SELECT brand, product_name FROM stock_balances ORDER BY rowid"):
+            recorded = self._names.setdefault(product_key(brand, name), (brand, name))
+            if recorded != (brand, name):
+                respelled.append(((brand, name), recorded))
+        if not respelled:
+            return
+        with self.db.transaction() as conn:
+            for old, recorded in respelled:
+                conn.execute("UPDATE stock_movements SET brand = ?, product_name = ? "
+                             "WHERE brand = ? AND product_name = ?", recorded + old)
+                totals = conn.execute(
+                    "SELECT opening, purchased, sold, returned, adjusted FROM stock_balances "
+                    "WHERE brand = ? AND product_name = ?", old
+                ).fetchone()
+                conn.execute("""
+                    UPDATE stock_balances SET opening = opening + ?, purchased = purchased + ?,
+                        sold = sold + ?, returned = returned + ?, adjusted = adjusted + ?
+                    WHERE brand = ? AND product_name = ?
+                """, tuple(totals) + recorded)
+                conn.execute("DELETE FROM stock_balances WHERE brand = ? AND product_name = ?", old)
+        print(f"DEBUG: Merged stock movements of {len(respelled)} products recorded under another spelling")
+
+    def recorded_name(self, brand, name):
+        """(brand, name) the ledger records this product under"""
+        with self.lock:
+            return self._names.get(product_key(brand, name), (brand, name))
+
+    def _claim_name(self, brand, name):
+        with self.lock:
+            return self._names.setdefault(product_key(brand, name), (brand, name))
+
+    @staticmethod
+    def _apply_balance(conn, brand, name, kind, qty):
+        """Add a movement's quantity to the product's running totals"""
+        column = {
+            OPENING: "opening", SALE: "sold", PURCHASE: "purchased",
+            RETURN: "returned", ADJUSTMENT: "adjusted"
+        }[kind]
+        amount = -qty if kind == SALE else qty  # sold is kept as a positive count
+        conn.execute(
+            f"INSERT INTO stock_balances (brand, product_name, {column}) VALUES (?, ?, ?) "
+            f"ON CONFLICT (brand, product_name) DO UPDATE SET {column} = {column} + excluded.{column}",
+            (brand, name, amount)
+        )
+
+    def _insert(self, conn, movements):
+        inserted = []
+        for ts, brand, name, kind, qty, ref, unit_cost in movements:
+            if kind not in KINDS:
+                raise ValueError(f"Unknown stock movement: {kind}")
+            if not qty:
+                continue
+            brand, name = self._claim_name(brand, name)
+            cursor = conn.execute(
+                "INSERT INTO stock_movements (ts, brand, product_name, kind, qty, ref, unit_cost) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (ts, brand, name, kind, qty, ref, unit_cost)
+            )
+            self._apply_balance(conn, brand, name, kind, qty)
+            inserted.append((cursor.lastrowid, ts, brand, name, kind, qty, ref, unit_cost))
+        return inserted
+
+    def notify(self, inserted, deleted_refs=()):
+        """Pass committed changes to the listeners"""
+        for listener in list(self.listeners):
+            try:
+                listener(inserted, list(deleted_refs))
+            except Exception as e:
+                print(f"Error updating stock listener: {e}")
+
+    def _delete_ref(self, conn, ref, kind):
+        """Remove a document's movements (and their effect on the balances)"""
+        rows = conn.execute(
+            "SELECT brand, product_name, qty FROM stock_movements WHERE ref = ? AND kind = ?", (ref, kind)
+        ).fetchall()
+        for brand, name, qty in rows:
+            self._apply_balance(conn, brand, name, kind, -qty)
+        conn.execute("DELETE FROM stock_movements WHERE ref = ? AND kind = ?", (ref, kind))
+        return len(rows)
+
+    def record(self, kind, brand, name, qty, ref="", when=None, unit_cost=None):
+        """Append one signed movement (unit_cost for stock coming in)"""
+        with self.db.transaction() as conn:
+            inserted = self.insert(conn, [(kind, brand, name, qty, ref, unit_cost)], when)
+        self.notify(inserted)
+
+    def insert(self, conn, movements, when=None):
+        """Append (kind, brand, name, qty, ref, unit_cost) movements in the caller's transaction
+
+        Returns the inserted rows; pass them to notify() once that
+        transaction has committed.
+        """
+        ts = movement_time(when)
+        return self._insert(conn, [(ts, brand, name, kind, int(qty), ref, unit_cost)
+                                   for kind, brand, name, qty, ref, unit_cost in movements])
+
+    def record_document(self, kind, ref, lines, when=None):
+        """Record a bill's or purchase's line items, replacing any earlier version
+
+        lines are (brand, name, qty) or (brand, name, qty, unit_cost) with
+        positive quantities. Recording the same document again (a re-saved
+        bill or a replayed write) replaces its movements instead of counting
+        them twice.
+        """
+        sign = -1 if kind == SALE else 1
+        ts = movement_time(when)
+        with self.db.transaction() as conn:
+            deleted = self._delete_ref(conn, ref, kind)
+            inserted = self._insert(conn, [
+                (ts, line[0], line[1], kind, sign * int(line[2]), ref, line[3] if len(line) > 3 else None)
+                for line in lines
+            ])
+        self.notify(inserted, [(ref, kind)] if deleted else [])
+
+    def record_bill(self, bill):
+        """Record the sale movements of a saved bill"""
+        lines = [(item["brand"], item["name"], item.get("qty", 0)) for item in bill.get("items", [])]
+        self.record_document(SALE, bill["bill_no"], lines, bill.get("date"))
+
+    def ensure_baseline(self, products):
+        """Give products without movements an opening movement for their current closing stock"""
+        known = {product_key(r[0], r[1]) for r in self.db.query("SELECT brand, product_name FROM stock_balances")}
+        ts = movement_time()
+        baseline = [(ts, p.brand, p.name, OPENING, int(p.closing_stock), "baseline", p.purchase_rate)
+                    for p in products if product_key(p.brand, p.name) not in known]
+        if baseline:
+            with self.db.transaction() as conn:
+                inserted = self._insert(conn, baseline)
+                # Zero-stock products still get a balance row so they count as known
+                conn.executemany(
+                    "INSERT OR IGNORE INTO stock_balances (brand, product_name) VALUES (?, ?)",
+                    [self._claim_name(b[1], b[2]) for b in baseline]
+                )
+            self.notify(inserted)
+            print(f"DEBUG: Recorded opening stock for {len(baseline)} products")
+        return len(baseline)
+
+    def balance(self, brand, name):
+        """Current (opening, purchased, sold, returned, adjusted, closing) of a product"""
+        rows = self.db.query(
+            "SELECT opening, purchased, sold, returned, adjusted FROM stock_balances "
+            "WHERE brand = ? AND product_name = ?", self.recorded_name(brand, name)
+        )
+        if not rows:
+            return None
+        opening, purchased, sold, returned, adjusted = rows[0]
+        return opening, purchased, sold, returned, adjusted, opening + purchased - sold + returned + adjusted
+
+    def on_hand(self, brand, name):
+        """Current closing stock of a product from the balances"""
+        balance = self.balance(brand, name)
+        return balance[-1] if balance else 0
+
+    def period_summary(self, start, end):
+        """Opening, movements and closing stock per product for dates start..end (inclusive)
+
+        Returns {(brand, name): {"opening", "purchased", "sold", "returned",
+        "adjusted", "closing"}} computed in one pass over the movements.
+        """
+        start_ts = movement_time(start)[:10]
+        end_ts = (datetime.strptime(movement_time(end)[:10], "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+        rows = self.db.query("""
+            SELECT brand, product_name,
+                SUM(CASE WHEN ts < :start THEN qty ELSE 0 END),
+                SUM(CASE WHEN ts >= :start AND kind = 'purchase' THEN qty ELSE 0 END),
+                SUM(CASE WHEN ts >= :start AND kind = 'sale' THEN -qty ELSE 0 END),
+                SUM(CASE WHEN ts >= :start AND kind = 'return' THEN qty ELSE 0 END),
+                SUM(CASE WHEN ts >= :start AND kind IN ('adjustment', 'opening') THEN qty ELSE 0 END)
+            FROM stock_movements
+            WHERE ts < :end
+            GROUP BY brand, product_name
+            ORDER BY brand, product_name
+        """, {"start": start_ts, "end": end_ts})
+
+        summary = {}
+        for brand, name, opening, purchased, sold, returned, adjusted in rows:
+            summary[(brand, name)] = {
+                "opening": opening,
+                "purchased": purchased,
+                "sold": sold,
+                "returned": returned,
+                "adjusted": adjusted,
+                "closing": opening + purchased - sold + returned + adjusted
+            }
+        return summary
+
+    def iter_movements(self):
+        """All movements as (id, ts, brand, name, kind, qty, ref, unit_cost) in ledger order"""
+        return self.db.query(
+            "SELECT id, ts, brand, product_name, kind, qty, ref, unit_cost FROM stock_movements ORDER BY ts, id"
+        )
+
+    def movements(self, brand, name):
+        """All movements of a product, oldest first"""
+        return self.db.query(
+            "SELECT ts, kind, qty, ref FROM stock_movements WHERE brand = ? AND product_name = ? ORDER BY ts, id",
+            self.recorded_name(brand, name)
+        )
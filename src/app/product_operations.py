@@ -1,6 +1,4 @@
-import csv
-import os
-from datetime import datetime
+from datetime import datetime, time
 from tkinter import messagebox
 from tkcalendar import DateEntry
 import tkinter as tk
@@ -9,153 +7,132 @@ from tkinter import ttk
 from .utils.calculations import calculate_retail_rate
 from .utils.validators import safe_float_convert
 from .models.product import ProductModel
+from .models.rate_schedule import RateSchedule
+from .models.price_history import PriceHistory
+
+# Longest wait (seconds) before re-checking the rate schedule
+MAX_RATE_TIMER_WAIT = 3600
 
 class ProductOperations:
     """Operations for product management"""
     
     def __init__(self, app):
         self.app = app
+        self._rate_timer = None
     
     def get_current_product_stock(self, brand, product_name):
         """Get current stock values for a specific product"""
-        for product in self.app.products:
-            if product['Brand'].strip().lower() == brand.strip().lower() and \
-            product['Product Name'].strip().lower() == product_name.strip().lower():
-                return {
-                    'opening_stock': int(product.get('Opening Stock', 0)),
-                    'purchased_stock': int(product.get('Purchased Stock', 0)),
-                    'sold_stock': int(product.get('Sold Stock', 0)),
-                    'closing_stock': int(product.get('Closing Stock', 0))
-                }
+        product = self.app.catalog.find(brand, product_name)
+        if product:
+            return {
+                'opening_stock': product.opening_stock,
+                'purchased_stock': product.purchased_stock,
+                'sold_stock': product.sold_stock,
+                'closing_stock': product.closing_stock
+            }
         return None
     
-    def get_current_rate_for_product(self, product_name, current_date=None):
+    def get_current_rate_for_product(self, brand, product_name, current_date=None):
         """Get the current rate for a product considering future rate changes"""
         if current_date is None:
             current_date = datetime.now().date()
         
-        # Check if there are any future rate changes for this product
-        future_rate = None
-        if os.path.exists("future_rate_changes.csv"):
-            try:
-                with open("future_rate_changes.csv", mode="r", encoding='utf-8') as file:
-                    reader = csv.DictReader(file)
-                    for row in reader:
-                        if row.get('Product Name') == product_name:
-                            effective_date_str = row.get('Effective Date', '')
-                            if effective_date_str:
-                                try:
-                                    effective_date = datetime.strptime(effective_date_str, "%Y-%m-%d").date()
-                                    if current_date >= effective_date:
-                                        future_rate = {
-                                            'purchase_rate': float(row.get('New Purchase Rate', 0)),
-                                            'wholesale_rate': float(row.get('Wholesale Rate', 0)),
-                                            'retail_rate': float(row.get('Retail Rate', 0)),
-                                            'margin1': float(row.get('Margin1 (%)', 0)),
-                                            'margin2': float(row.get('Margin2 (%)', 0))
-                                        }
-                                        break
-                                except ValueError:
-                                    continue
-            except Exception as e:
-                print(f"Error reading future rate changes: {e}")
-        
-        # If found an applicable future rate, use it
+        # A scheduled change that is effective by current_date wins
+        future_rate = RateSchedule.get().rates_on(brand, product_name, current_date)
         if future_rate:
             return future_rate
         
+        # Then the version in effect on that date from the price history
+        product = self.app.catalog.find(brand, product_name)
+        if product:
+            rates = PriceHistory.get().rate_at(product.brand, product.name, current_date)
+            if rates:
+                return rates
+        
         # Otherwise, use the current rate from products
-        for product in self.app.products:
-            if product['Product Name'] == product_name:
-                return {
-                    'purchase_rate': float(product.get('Purchase Rate', 0)),
-                    'wholesale_rate': float(product.get('Wholesale Rate', 0)),
-                    'retail_rate': float(product.get('Retail Rate', 0)),
-                    'margin1': float(product.get('Margin1 (%)', 0)),
-                    'margin2': float(product.get('Margin2 (%)', 0))
-                }
+        if product:
+            return {
+                'purchase_rate': product.purchase_rate,
+                'wholesale_rate': product.wholesale_rate,
+                'retail_rate': product.retail_rate,
+                'margin1': product.margin1,
+                'margin2': product.margin2
+            }
         
         return None
     
     def check_and_apply_future_rate_changes(self):
-        """Check and apply any future rate changes that have become effective"""
-        if not os.path.exists("future_rate_changes.csv"):
-            return
+        """Apply future rate changes that have become effective, then wait for the next one"""
+        schedule = RateSchedule.get()
+        if self.on_rate_schedule_changed not in schedule.listeners:
+            schedule.listeners.append(self.on_rate_schedule_changed)
         
         try:
-            today = datetime.now().date()
-            future_changes = []
-            changes_to_apply = []
-            
-            if os.path.getsize("future_rate_changes.csv") == 0:
-                return
-                
-            with open("future_rate_changes.csv", mode="r", encoding='utf-8') as file:
-                first_line = file.readline().strip()
-                if not first_line:
-                    return
-                file.seek(0)
-                
-                reader = csv.DictReader(file)
-                if reader.fieldnames is None:
-                    return
-                    
-                future_changes = list(reader)
-            
-            # Find changes that should be applied today
-            remaining_changes = []
-            for change in future_changes:
-                effective_date_str = change.get('Effective Date', '')
-                if not effective_date_str:
-                    continue
-                    
-                try:
-                    effective_date = datetime.strptime(effective_date_str, "%Y-%m-%d").date()
-                    if today >= effective_date:
-                        changes_to_apply.append(change)
-                    else:
-                        remaining_changes.append(change)
-                except ValueError:
-                    continue
+            # Changes stay in the schedule until the products are saved with them
+            due = schedule.due()
             
             # Apply the changes to products
-            for change in changes_to_apply:
-                product_name = change.get('Product Name', '')
-                if not product_name:
+            applied = []
+            for change in due:
+                if change.brand:
+                    p = self.app.catalog.find(change.brand, change.product_name)
+                else:
+                    # Scheduled before brands were kept; only the name is known
+                    p = self.app.catalog.find_by_name(change.product_name)
+                if not p:
+                    print(f"Rate change for '{change.brand} {change.product_name}' due {change.effective_date} "
+                          f"has no matching product; kept in the schedule")
                     continue
-                    
-                for p in self.app.products:
-                    if p['Product Name'] == product_name:
-                        p.update({
-                            'Purchase Rate': change.get('New Purchase Rate', p['Purchase Rate']),
-                            'Purchase Date': change.get('Effective Date', p['Purchase Date']),
-                            'Margin1 (%)': change.get('Margin1 (%)', p['Margin1 (%)']),
-                            'Wholesale Rate': change.get('Wholesale Rate', p['Wholesale Rate']),
-                            'Margin2 (%)': change.get('Margin2 (%)', p['Margin2 (%)']),
-                            'Retail Rate': change.get('Retail Rate', p['Retail Rate']),
-                            'Modified Date': datetime.now().strftime("%Y-%m-%d")
-                        })
-                        break
+                row = change.row
+                p.purchase_rate = safe_float_convert(row.get('New Purchase Rate'), p.purchase_rate)
+                p.purchase_date = row.get('Effective Date') or p.purchase_date
+                p.margin1 = safe_float_convert(row.get('Margin1 (%)'), p.margin1)
+                p.wholesale_rate = safe_float_convert(row.get('Wholesale Rate'), p.wholesale_rate)
+                p.margin2 = safe_float_convert(row.get('Margin2 (%)'), p.margin2)
+                p.retail_rate = safe_float_convert(row.get('Retail Rate'), p.retail_rate)
+                p.modified_date = datetime.now().strftime("%Y-%m-%d")
+                self.app.catalog.mark_dirty(p)
+                applied.append(change)
             
-            # Save updated products and future changes
-            if changes_to_apply:
-                ProductModel.save_products(self.app.products)
-                
-                # Update future changes file
-                if remaining_changes:
-                    with open("future_rate_changes.csv", mode="w", newline="", encoding='utf-8') as file:
-                        fieldnames = [
-                            'Product Name', 'New Purchase Rate', 'Effective Date', 
-                            'Margin1 (%)', 'Wholesale Rate', 'Margin2 (%)', 
-                            'Retail Rate', 'Modified Date'
-                        ]
-                        writer = csv.DictWriter(file, fieldnames=fieldnames)
-                        writer.writeheader()
-                        writer.writerows(remaining_changes)
+            # Save updated products, then drop the applied changes
+            if applied:
+                if ProductModel.save_changes(self.app.catalog):
+                    schedule.remove(applied)
+                    print(f"DEBUG: Applied {len(applied)} future rate changes")
                 else:
-                    os.remove("future_rate_changes.csv")
-                    
-                self.app.load_products()
+                    print(f"Error saving {len(applied)} future rate changes; kept in the schedule")
                     
         except Exception as e:
-            print(f"Error applying future rate changes: {e}")
\ No newline at end of file
+            print(f"Error applying future rate changes: {e}")
+        
+        self.schedule_rate_change_timer()
+    
+    def schedule_rate_change_timer(self):
+        """Arm a timer for when the next scheduled rate change becomes effective"""
+        if self._rate_timer is not None:
+            self.app.root.after_cancel(self._rate_timer)
+            self._rate_timer = None
+        
+        schedule = RateSchedule.get()
+        today = datetime.now().date()
+        next_due = schedule.next_due(after=today)
+        if next_due is None:
+            if not schedule.due(today):
+                return
+            wait = MAX_RATE_TIMER_WAIT  # only changes that could not be applied; retry later
+        else:
+            wait = (datetime.combine(next_due, time.min) - datetime.now()).total_seconds()
+        # Re-check at least hourly so a suspended or re-clocked machine catches up
+        delay_ms = int(min(max(wait, 0), MAX_RATE_TIMER_WAIT) * 1000)
+        self._rate_timer = self.app.root.after(delay_ms, self._on_rate_timer)
+    
+    def _on_rate_timer(self):
+        self._rate_timer = None
+        self.check_and_apply_future_rate_changes()
+    
+    def on_rate_schedule_changed(self):
+        """A change was scheduled; it may be due already, or the next one due may be earlier now"""
+        if RateSchedule.get().due():
+            self.check_and_apply_future_rate_changes()
+        else:
+            self.schedule_rate_change_timer()
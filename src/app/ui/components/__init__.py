@@ -3,5 +3,6 @@
 UI Components
 """
 from .styled_widgets import StyledButton
+from .virtual_grid import VirtualGrid
 
-__all__ = ['StyledButton']
\ No newline at end of file
+__all__ = ['StyledButton', 'VirtualGrid']
\ No newline at end of file
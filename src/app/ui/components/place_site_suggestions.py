@@ -1,33 +1,63 @@
 # src/app/ui/components/place_site_suggestions.py
+import csv
+import os
 
-def get_place_suggestions(customers, current_text=""):
+from ...models.customer_store import CustomerStore
+from ...utils.autocomplete import AutocompleteIndex
+
+PURCHASES_FILE = "purchases.csv"
+
+_suppliers = None
+
+
+def _customer_suggestions(field, current_text):
+    store = CustomerStore.get()
+    store.refresh()
+    return getattr(store, field).suggest(current_text)
+
+
+def get_customer_suggestions(current_text=""):
+    """Get customer name suggestions"""
+    return _customer_suggestions("names", current_text)
+
+
+def get_place_suggestions(current_text=""):
     """Get place suggestions from customers"""
-    places = sorted(set(c.get('Place', '') for c in customers if c.get('Place', '')))
-    places = [p for p in places if p]  # Remove empty strings
-    
-    if current_text:
-        filtered = [p for p in places if current_text.lower() in p.lower()]
-        return filtered
-    return places
-
-def get_site_suggestions(customers, current_text=""):
+    return _customer_suggestions("places", current_text)
+
+
+def get_site_suggestions(current_text=""):
     """Get site suggestions from customers"""
-    sites = sorted(set(c.get('Site', '') for c in customers if c.get('Site', '')))
-    sites = [s for s in sites if s]  # Remove empty strings
-    
-    if current_text:
-        filtered = [s for s in sites if current_text.lower() in s.lower()]
-        return filtered
-    return sites
-
-def get_supplier_suggestions(purchases, current_text=""):
-    """Get supplier suggestions from purchases"""
-    if not purchases:
-        return []
-    
-    suppliers = sorted(set(p.get('Supplier', '') for p in purchases if p.get('Supplier', '')))
-    
-    if current_text:
-        filtered = [s for s in suppliers if current_text.lower() in s.lower()]
-        return filtered
-    return suppliers
\ No newline at end of file
+    return _customer_suggestions("sites", current_text)
+
+
+def supplier_index():
+    """Supplier names from purchases.csv, weighted by number of purchases"""
+    global _suppliers
+    if _suppliers is None:
+        index = AutocompleteIndex()
+        if os.path.exists(PURCHASES_FILE):
+            try:
+                with open(PURCHASES_FILE, mode="r", newline="", encoding="utf-8") as file:
+                    for row in csv.DictReader(file):
+                        index.add(row.get("Supplier", ""))
+            except Exception as e:
+                print(f"Error loading suppliers: {e}")
+        _suppliers = index
+    return _suppliers
+
+
+def add_supplier(name):
+    """Count a purchase from a supplier"""
+    supplier_index().add(name)
+
+
+def get_supplier_suggestions(current_text=""):
+    """Get supplier suggestions from purchases, then from customers"""
+    suggestions = supplier_index().suggest(current_text)
+    if len(suggestions) < supplier_index().top_k:
+        known = {s.lower() for s in suggestions}
+        for name in get_customer_suggestions(current_text):
+            if name.lower() not in known:
+                suggestions.append(name)
+    return suggestions[:supplier_index().top_k]
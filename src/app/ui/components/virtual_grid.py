@@ -0,0 +1,264 @@
+# src/app/ui/components/virtual_grid.py
+import tkinter as tk
+from tkinter import ttk
+
+HEADING_HEIGHT = 24
+DEFAULT_ROW_HEIGHT = 20
+
+
+def _sort_key(value):
+    """Order numbers numerically and everything else case-insensitively"""
+    if isinstance(value, (int, float)):
+        return (0, value, "")
+    text = str(value)
+    try:
+        return (0, float(text.replace(",", "")), "")
+    except ValueError:
+        return (1, 0, text.lower())
+
+
+class VirtualGrid(tk.Frame):
+    """Treeview that only materializes the rows currently in view
+
+    Rows come from a backing list of items (any objects) and a formatter
+    that turns an item into a tuple of column values. Only as many
+    Treeview rows as fit in the window exist; scrolling rewrites their
+    values, so opening, scrolling, sorting (click a heading) and filtering
+    a grid of 50k rows costs about as much as one of 30.
+    """
+
+    def __init__(self, master, columns, formatter=None, tag_func=None, searchable=False, **kwargs):
+        super().__init__(master, **kwargs)
+        self.columns = [c[0] for c in columns]
+        self.formatter = formatter or (lambda item: item)
+        self.tag_func = tag_func
+        self._headings = {c[0]: c[1] for c in columns}
+
+        self._items = []
+        self._values = {}        # item index -> formatted values (cache)
+        self._view = []          # item indexes after filtering and sorting
+        self._offset = 0         # first view position shown
+        self._rows = 1           # Treeview rows that fit in the window
+        self._selected = set()   # selected item indexes
+        self._sort = None        # (column, descending)
+        self._filter = ""
+        self._rendering = False
+
+        if searchable:
+            search_frame = tk.Frame(self)
+            search_frame.pack(fill=tk.X, pady=(0, 5))
+            tk.Label(search_frame, text="Search:").pack(side=tk.LEFT)
+            self.search_var = tk.StringVar()
+            search_entry = tk.Entry(search_frame, textvariable=self.search_var, width=30)
+            search_entry.pack(side=tk.LEFT, padx=5)
+            self.search_var.trace_add("write", lambda *args: self.set_filter(self.search_var.get()))
+
+        body = tk.Frame(self)
+        body.pack(fill=tk.BOTH, expand=True)
+
+        self.scroll_y = tk.Scrollbar(body, command=self.yview)
+        self.scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
+        scroll_x = tk.Scrollbar(body, orient=tk.HORIZONTAL)
+        scroll_x.pack(side=tk.BOTTOM, fill=tk.X)
+
+        self.tree = ttk.Treeview(body, columns=self.columns, show="headings",
+                                 xscrollcommand=scroll_x.set)
+        scroll_x.config(command=self.tree.xview)
+        for name, heading, width, anchor in columns:
+            self.tree.heading(name, text=heading, anchor=anchor,
+                              command=lambda c=name: self.sort_by(c))
+            self.tree.column(name, width=width, anchor=anchor)
+        self.tree.pack(fill=tk.BOTH, expand=True)
+
+        try:
+            self.row_height = int(ttk.Style().lookup("Treeview", "rowheight") or DEFAULT_ROW_HEIGHT)
+        except (tk.TclError, ValueError):
+            self.row_height = DEFAULT_ROW_HEIGHT
+
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.tree.bind("<MouseWheel>", self._on_wheel)
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(3))
+        self.tree.bind("<Up>", lambda e: self._on_key(-1))
+        self.tree.bind("<Down>", lambda e: self._on_key(1))
+        self.tree.bind("<Prior>", lambda e: self.scroll(-self._rows) or "break")
+        self.tree.bind("<Next>", lambda e: self.scroll(self._rows) or "break")
+        self.tree.bind("<Home>", lambda e: self.scroll_to(0) or "break")
+        self.tree.bind("<End>", lambda e: self.scroll_to(len(self._view)) or "break")
+
+    # Data
+
+    def set_items(self, items):
+        """Replace the backing items (keeps the sort and filter)"""
+        self._items = items if isinstance(items, list) else list(items)
+        self._values = {}
+        self._selected = set()
+        self._rebuild_view()
+
+    def append_items(self, items):
+        """Add items at the end, keeping the scroll position, sort and filter"""
+        start = len(self._items)
+        self._items.extend(items)
+        if self._filter or self._sort:
+            self._rebuild_view()
+        else:
+            self._view.extend(range(start, len(self._items)))
+            self._render()
+
+    def refresh(self):
+        """Re-read items that were changed in place"""
+        self._values = {}
+        self._selected = {i for i in self._selected if i < len(self._items)}
+        self._rebuild_view()
+
+    def values(self, index):
+        values = self._values.get(index)
+        if values is None:
+            values = tuple(self.formatter(self._items[index]))
+            self._values[index] = values
+        return values
+
+    def __len__(self):
+        return len(self._view)
+
+    def visible_items(self):
+        """Items after filtering and sorting"""
+        return [self._items[i] for i in self._view]
+
+    def iter_values(self):
+        """Column values of every row after filtering and sorting"""
+        for i in self._view:
+            yield self.values(i)
+
+    def headings(self):
+        return [self._headings[c] for c in self.columns]
+
+    def selection(self):
+        """Selected items"""
+        return [self._items[i] for i in sorted(self._selected)]
+
+    def selected_values(self):
+        """Column values of the selected rows"""
+        return [self.values(i) for i in sorted(self._selected)]
+
+    def tag_configure(self, tag, **options):
+        self.tree.tag_configure(tag, **options)
+
+    # Filtering and sorting
+
+    def set_filter(self, text):
+        """Show rows where any column contains text (case-insensitive)"""
+        self._filter = (text or "").strip().lower()
+        self._rebuild_view()
+
+    def sort_by(self, column, descending=None):
+        """Sort by a column; clicking the same heading again reverses the order"""
+        if descending is None:
+            descending = bool(self._sort and self._sort[0] == column and not self._sort[1])
+        self._sort = (column, descending)
+        for name in self.columns:
+            arrow = (" ▼" if descending else " ▲") if name == column else ""
+            self.tree.heading(name, text=self._headings[name] + arrow)
+        self._rebuild_view()
+
+    def _rebuild_view(self):
+        view = range(len(self._items))
+        if self._filter:
+            needle = self._filter
+            view = [i for i in view
+                    if any(needle in str(v).lower() for v in self.values(i))]
+        if self._sort:
+            position = self.columns.index(self._sort[0])
+            view = sorted(view, key=lambda i: _sort_key(self.values(i)[position]),
+                          reverse=self._sort[1])
+        self._view = list(view)
+        self._offset = min(self._offset, max(0, len(self._view) - self._rows))
+        self._render()
+
+    # Scrolling
+
+    def _on_resize(self, event):
+        rows = max(1, (event.height - HEADING_HEIGHT) // self.row_height)
+        if rows != self._rows:
+            self._rows = rows
+            self._offset = min(self._offset, max(0, len(self._view) - self._rows))
+            self._render()
+
+    def scroll(self, rows):
+        self.scroll_to(self._offset + rows)
+
+    def scroll_to(self, offset):
+        offset = max(0, min(int(offset), len(self._view) - self._rows))
+        if offset != self._offset:
+            self._offset = offset
+            self._render()
+
+    def yview(self, *args):
+        """Scrollbar callback ("moveto", fraction) or ("scroll", n, "units"/"pages")"""
+        if not args:
+            return
+        if args[0] == "moveto":
+            self.scroll_to(round(float(args[1]) * len(self._view)))
+        elif args[0] == "scroll":
+            step = int(args[1]) * (self._rows if args[2] == "pages" else 1)
+            self.scroll(step)
+
+    def _on_wheel(self, event):
+        self.scroll(-3 if event.delta > 0 else 3)
+        return "break"
+
+    def _on_key(self, step):
+        """Move the selection with the arrow keys, scrolling at the edges"""
+        focus = self.tree.focus()
+        rows = self.tree.get_children()
+        if not focus or focus not in rows:
+            return None
+        position = rows.index(focus) + step
+        if 0 <= position < len(rows):
+            return None  # the Treeview moves within the window itself
+        self.scroll(step)
+        rows = self.tree.get_children()
+        if rows:
+            target = rows[0] if step < 0 else rows[-1]
+            self.tree.focus(target)
+            self.tree.selection_set(target)
+        return "break"
+
+    # Rendering
+
+    def _render(self):
+        self._rendering = True
+        try:
+            count = max(0, min(self._rows, len(self._view) - self._offset))
+            existing = list(self.tree.get_children())
+            for iid in existing[count:]:
+                self.tree.delete(iid)
+            for _ in range(len(existing), count):
+                self.tree.insert("", tk.END)
+
+            selected = []
+            for position, iid in enumerate(self.tree.get_children()):
+                index = self._view[self._offset + position]
+                tags = self.tag_func(self._items[index]) if self.tag_func else ()
+                self.tree.item(iid, values=self.values(index), tags=tags or ())
+                if index in self._selected:
+                    selected.append(iid)
+            self.tree.selection_set(selected)
+
+            total = len(self._view)
+            if total:
+                self.scroll_y.set(self._offset / total, min(1.0, (self._offset + count) / total))
+            else:
+                self.scroll_y.set(0, 1)
+        finally:
+            self._rendering = False
+
+    def _on_select(self, event):
+        if self._rendering:
+            return
+        rows = self.tree.get_children()
+        shown = {self._view[self._offset + position] for position in range(len(rows))}
+        chosen = {self._view[self._offset + rows.index(iid)] for iid in self.tree.selection()}
+        # Keep selections made in rows that are scrolled out of view
+        self._selected = (self._selected - shown) | chosen
@@ -15,7 +15,7 @@ class Dialogs:
     @staticmethod
     def get_brands(app):
         """Get unique brands from products"""
-        return sorted(set(p.get("Brand", "") for p in app.products))
+        return app.catalog.brands()
     
     @staticmethod
     def create_rate_change_window(app):
@@ -42,7 +42,7 @@ class Dialogs:
         
         def update_products(*args):
             selected_brand = brand_combo.get()
-            products = [p.get('Product Name', '') for p in app.products if p.get('Brand', '') == selected_brand]
+            products = [p.name for p in app.catalog.products_for_brand(selected_brand)]
             product_combo['values'] = products
             if products:
                 product_combo.set(products[0])
@@ -135,22 +135,22 @@ class Dialogs:
             if not selected_product:
                 return
                 
-            product = next((p for p in app.products if p.get('Product Name', '') == selected_product), None)
+            product = app.catalog.find(brand_combo.get(), selected_product)
             if product:
-                current_rate_label.config(text=product.get('Purchase Rate', '0'))
-                current_date_label.config(text=product.get('Purchase Date', 'Not set'))
+                current_rate_label.config(text=f"{product.purchase_rate:.2f}")
+                current_date_label.config(text=product.purchase_date or 'Not set')
                 
                 purchase_entry.delete(0, tk.END)
-                purchase_entry.insert(0, product.get('Purchase Rate', '0'))
+                purchase_entry.insert(0, f"{product.purchase_rate:.2f}")
                 
                 margin1_entry.delete(0, tk.END)
-                margin1_entry.insert(0, product.get('Margin1 (%)', '0'))
+                margin1_entry.insert(0, f"{product.margin1:.2f}")
                 
                 margin2_entry.delete(0, tk.END)
-                margin2_entry.insert(0, product.get('Margin2 (%)', '0'))
+                margin2_entry.insert(0, f"{product.margin2:.2f}")
                 
-                wholesale_rate_var.set(product.get('Wholesale Rate', '0'))
-                retail_rate_var.set(product.get('Retail Rate', '0'))
+                wholesale_rate_var.set(f"{product.wholesale_rate:.2f}")
+                retail_rate_var.set(f"{product.retail_rate:.2f}")
                 
                 tomorrow = datetime.now() + timedelta(days=1)
                 date_entry.set_date(tomorrow)
@@ -164,6 +164,9 @@ class Dialogs:
             if not selected_product:
                 messagebox.showerror("Error", "Please select a product")
                 return
+            if not app.catalog.find(brand_combo.get(), selected_product):
+                messagebox.showerror("Error", f"Product {selected_product} not found for brand {brand_combo.get()}")
+                return
                 
             try:
                 new_purchase_rate = float(purchase_entry.get())
@@ -196,14 +199,16 @@ class Dialogs:
                         wholesale_rate, 
                         margin2, 
                         retail_rate, 
-                        modified_date
+                        modified_date,
+                        brand=brand_combo.get()
                     )
                     messagebox.showinfo("Success", 
                         f"Future rate change scheduled!\n"
                         f"New rate: ₹{new_purchase_rate:.2f} will be effective from {effective_date}")
                 else:
                     # Immediate rate change
-                    Dialogs.update_product_rate_immediate(app,
+                    if not Dialogs.update_product_rate_immediate(app,
+                        brand_combo.get(),
                         selected_product,
                         new_purchase_rate,
                         effective_date,
@@ -212,7 +217,8 @@ class Dialogs:
                         margin2,
                         retail_rate,
                         modified_date
-                    )
+                    ):
+                        return
                     messagebox.showinfo("Success", "Product rates updated successfully!")
                 
                 rate_window.destroy()
@@ -230,75 +236,70 @@ class Dialogs:
     
     @staticmethod
     def save_future_rate_change(product_name, new_purchase_rate, effective_date,
-                               margin1, wholesale_rate, margin2, retail_rate, modified_date):
-        """Save future rate changes to a separate file"""
-        future_changes = []
+                               margin1, wholesale_rate, margin2, retail_rate, modified_date, brand=""):
+        """Schedule a future rate change and record it in the product's price history"""
+        from ..models.rate_schedule import RateSchedule
+        from ..models.price_history import PriceHistory
         
-        # Load existing future changes
-        if os.path.exists("future_rate_changes.csv"):
-            try:
-                with open("future_rate_changes.csv", mode="r", encoding='utf-8') as file:
-                    reader = csv.DictReader(file)
-                    future_changes = list(reader)
-            except Exception as e:
-                print(f"Error loading future rate changes: {e}")
-        
-        # Remove any existing future changes for this product
-        future_changes = [fc for fc in future_changes if fc.get('Product Name', '') != product_name]
-        
-        # Add the new future change
-        future_changes.append({
-            'Product Name': product_name,
-            'New Purchase Rate': f"{new_purchase_rate:.2f}",
-            'Effective Date': effective_date,
-            'Margin1 (%)': f"{margin1:.2f}",
-            'Wholesale Rate': f"{wholesale_rate:.2f}",
-            'Margin2 (%)': f"{margin2:.2f}",
-            'Retail Rate': f"{retail_rate:.2f}",
-            'Modified Date': modified_date
-        })
-        
-        # Save future changes
         try:
-            with open("future_rate_changes.csv", mode="w", newline="", encoding='utf-8') as file:
-                fieldnames = ['Product Name', 'New Purchase Rate', 'Effective Date', 
-                            'Margin1 (%)', 'Wholesale Rate', 'Margin2 (%)', 
-                            'Retail Rate', 'Modified Date']
-                writer = csv.DictWriter(file, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(future_changes)
+            RateSchedule.get().schedule({
+                'Brand': brand,
+                'Product Name': product_name,
+                'New Purchase Rate': f"{new_purchase_rate:.2f}",
+                'Effective Date': effective_date,
+                'Margin1 (%)': f"{margin1:.2f}",
+                'Wholesale Rate': f"{wholesale_rate:.2f}",
+                'Margin2 (%)': f"{margin2:.2f}",
+                'Retail Rate': f"{retail_rate:.2f}",
+                'Modified Date': modified_date
+            })
+            if brand:
+                PriceHistory.get().record(brand, product_name, effective_date, {
+                    'purchase_rate': new_purchase_rate,
+                    'wholesale_rate': wholesale_rate,
+                    'retail_rate': retail_rate,
+                    'margin1': margin1,
+                    'margin2': margin2
+                })
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save future rate change: {str(e)}")
     
     @staticmethod
-    def update_product_rate_immediate(app, product_name, new_purchase_rate, effective_date,
+    def update_product_rate_immediate(app, brand, product_name, new_purchase_rate, effective_date,
                                     margin1, wholesale_rate, margin2, retail_rate, modified_date):
-        """Update product rate immediately"""
+        """Update product rate immediately; returns True once saved"""
         from ..models.product import ProductModel
         
-        for p in app.products:
-            if p.get('Product Name', '') == product_name:
-                p.update({
-                    'Purchase Rate': f"{new_purchase_rate:.2f}",
-                    'Purchase Date': effective_date,
-                    'Margin1 (%)': f"{margin1:.2f}",
-                    'Wholesale Rate': f"{wholesale_rate:.2f}",
-                    'Margin2 (%)': f"{margin2:.2f}",
-                    'Retail Rate': f"{retail_rate:.2f}",
-                    'Modified Date': modified_date
-                })
-                break
-        
-        # Save to CSV
+        p = app.catalog.find(brand, product_name)
+        if not p:
+            messagebox.showerror("Error", f"Product {brand} {product_name} not found")
+            return False
+        app.catalog.update(
+            p,
+            purchase_rate=new_purchase_rate,
+            purchase_date=effective_date,
+            margin1=margin1,
+            wholesale_rate=wholesale_rate,
+            margin2=margin2,
+            retail_rate=retail_rate,
+            modified_date=modified_date
+        )
+        
+        # Save the changed product
         try:
-            ProductModel.save_products(app.products)
+            if ProductModel.save_changes(app.catalog):
+                return True
+            messagebox.showerror("Error", "Failed to save products")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save products: {str(e)}")
+        return False
     
     @staticmethod
     def create_purchase_entry_window(app):
         """Create purchase entry window"""
-        from ..utils.file_operations import load_customers, get_purchase_bill_number
+        from ..utils.file_operations import get_purchase_bill_number
+        from ..models.customer import CustomerModel
+        from .components.place_site_suggestions import get_supplier_suggestions, add_supplier
         
         purchase_window = tk.Toplevel(app.root)
         purchase_window.title("Purchase Entry")
@@ -314,8 +315,9 @@ class Dialogs:
         supplier_name_combo.grid(row=0, column=1, sticky="w", padx=5)
         
         # Load supplier suggestions
-        customers = load_customers()
-        supplier_name_combo['values'] = [c.get('Name', '') for c in customers if c.get('Name')]
+        supplier_name_combo['values'] = get_supplier_suggestions()
+        supplier_name_combo.bind("<KeyRelease>", lambda e: supplier_name_combo.configure(
+            values=get_supplier_suggestions(supplier_name_combo.get())))
         
         # Supplier phone
         tk.Label(details_frame, text="Phone No:").grid(row=1, column=0, sticky="w")
@@ -503,7 +505,7 @@ class Dialogs:
         
         def update_purchase_product_list():
             selected_brand = purchase_brand_combo.get()
-            products = [p.get('Product Name', '') for p in app.products if p.get('Brand', '') == selected_brand]
+            products = [p.name for p in app.catalog.products_for_brand(selected_brand)]
             purchase_product_combo['values'] = products
             if products:
                 purchase_product_combo.set(products[0])
@@ -512,21 +514,19 @@ class Dialogs:
         
         # Auto-fill supplier details
         def auto_fill_supplier(event):
-            selected_name = supplier_name_combo.get()
-            for customer in customers:
-                if customer.get('Name', '') == selected_name:
-                    supplier_phone_entry.delete(0, tk.END)
-                    supplier_phone_entry.insert(0, customer.get('Phone', ''))
-                    purchase_place_combo.set(customer.get('Place', ''))
-                    purchase_site_combo.set(customer.get('Site', ''))
-                    break
+            customer = CustomerModel.get_customer_by_name(supplier_name_combo.get())
+            if customer:
+                supplier_phone_entry.delete(0, tk.END)
+                supplier_phone_entry.insert(0, customer.get('Phone', ''))
+                purchase_place_combo.set(customer.get('Place', ''))
+                purchase_site_combo.set(customer.get('Site', ''))
         
         supplier_name_combo.bind("<<ComboboxSelected>>", auto_fill_supplier)
         
         # Save button
         def save_purchase():
-            from ..utils.calculations import update_closing_stock
             from ..models.product import ProductModel
+            from ..models.stock_ledger import StockLedger, PURCHASE
             
             supplier_name = supplier_name_combo.get()
             supplier_phone = supplier_phone_entry.get()
@@ -602,26 +602,27 @@ class Dialogs:
                     }
                     
                     writer.writerow(purchase_data)
+                add_supplier(supplier_name)
                 
                 # Update product stock
                 for item in items:
-                    for product in app.products:
-                        if product.get('Brand', '') == item['brand'] and product.get('Product Name', '') == item['product']:
-                            purchased = int(product.get('Purchased Stock', 0)) + int(item['qty'])
-                            product['Purchased Stock'] = str(purchased)
-                            product['Closing Stock'] = str(update_closing_stock(
-                                int(product.get('Opening Stock', 0)),
-                                purchased,
-                                int(product.get('Sold Stock', 0))
-                            ))
-                            # Update purchase rate
-                            product['Purchase Rate'] = f"{item['rate']:.2f}"
-                            product['Purchase Date'] = date
-                            break
+                    product = app.catalog.find(item['brand'], item['product'])
+                    if product:
+                        product.purchased_stock += int(item['qty'])
+                        # Update purchase rate
+                        product.purchase_rate = round(item['rate'], 2)
+                        product.purchase_date = date
+                        app.catalog.mark_dirty(product)
+                
+                # One purchase movement (and FIFO cost layer) per line item
+                StockLedger.get().record_document(
+                    PURCHASE, bill_no,
+                    [(item['brand'], item['product'], item['qty'], round(item['rate'], 2)) for item in items],
+                    date
+                )
                 
                 # Save updated products
-                ProductModel.save_products(app.products)
-                app.load_products()
+                ProductModel.save_changes(app.catalog)
                 
                 messagebox.showinfo("Success", f"Purchase saved successfully!\nTotal: ₹{total_purchase:.2f}\nPaid: ₹{amount_paid:.2f}\nRemaining: ₹{remaining:.2f}")
                 
@@ -669,7 +670,10 @@ class Dialogs:
     @staticmethod
     def create_sales_receipt_window(app):
         """Create sales receipt window"""
-        from ..utils.file_operations import load_customers
+        from ..models.receivables import Receivables
+        from .components.place_site_suggestions import get_customer_suggestions
+        
+        receivables = Receivables.get()
         
         receipt_window = tk.Toplevel(app.root)
         receipt_window.title("Add Sales Receipt")
@@ -697,6 +701,14 @@ class Dialogs:
         remaining_amount_label = tk.Label(details_frame, text="0.00", font=("Arial", 10))
         remaining_amount_label.grid(row=2, column=1, sticky="w", padx=10)
         
+        tk.Label(details_frame, text="Last Payment:").grid(row=3, column=0, sticky="w")
+        last_payment_label = tk.Label(details_frame, text="-", font=("Arial", 10))
+        last_payment_label.grid(row=3, column=1, sticky="w", padx=10)
+        
+        tk.Label(details_frame, text="Oldest Unpaid Bill:").grid(row=4, column=0, sticky="w")
+        oldest_bill_label = tk.Label(details_frame, text="-", font=("Arial", 10))
+        oldest_bill_label.grid(row=4, column=1, sticky="w", padx=10)
+        
         # Payment mode frame
         payment_frame = tk.Frame(receipt_window)
         payment_frame.pack(fill=tk.X, padx=10, pady=10)
@@ -751,32 +763,49 @@ class Dialogs:
         cheque_entry.bind("<KeyRelease>", lambda e: update_amount_received_now())
         bank_transfer_entry.bind("<KeyRelease>", lambda e: update_amount_received_now())
         
+        def show_balance(balance):
+            """Show a customer's receivable summary (None clears it)"""
+            if not balance:
+                total_amount_label.config(text="0.00")
+                amount_paid_label.config(text="0.00")
+                remaining_amount_label.config(text="0.00")
+                last_payment_label.config(text="-")
+                oldest_bill_label.config(text="-")
+                return
+            
+            total_amount_label.config(text=f"{balance['total_sales']:.2f} ({balance['bills']} bills)")
+            amount_paid_label.config(text=f"{balance['total_paid']:.2f}")
+            if balance['credit'] > 0:
+                remaining_amount_label.config(text=f"{balance['balance']:.2f} (credit {balance['credit']:.2f})")
+            else:
+                remaining_amount_label.config(text=f"{balance['balance']:.2f}")
+            if balance['last_payment_date']:
+                last_payment_label.config(
+                    text=f"{balance['last_payment_amount']:.2f} on {balance['last_payment_date']}")
+            else:
+                last_payment_label.config(text="-")
+            if balance['oldest_bill_no']:
+                oldest_bill_label.config(
+                    text=f"{balance['oldest_bill_no']} ({balance['oldest_bill_date']}) - "
+                         f"{balance['oldest_bill_outstanding']:.2f} due")
+            else:
+                oldest_bill_label.config(text="-")
+        
         def update_sales_receipt_details(event=None):
             """Update sales receipt details when customer is selected"""
             customer_name = sales_customer_combo.get()
             if not customer_name:
                 return
             
-            # Load customers
-            customers = load_customers()
-            
-            # Find customer
-            customer = None
-            for c in customers:
-                if c.get('Name', '') == customer_name:
-                    customer = c
-                    break
-            
-            if customer:
-                # You would calculate totals from existing bills here
-                # For now, just show customer info
-                total_amount_label.config(text=f"Customer: {customer.get('Name', '')}")
+            # Running balance kept by the receivables ledger, no bills are read
+            show_balance(receivables.balance(customer_name))
         
         sales_customer_combo.bind("<<ComboboxSelected>>", update_sales_receipt_details)
         
         # Load customer suggestions
-        customers = load_customers()
-        sales_customer_combo['values'] = [c.get('Name', '') for c in customers if c.get('Name')]
+        sales_customer_combo['values'] = get_customer_suggestions()
+        sales_customer_combo.bind("<KeyRelease>", lambda e: sales_customer_combo.configure(
+            values=get_customer_suggestions(sales_customer_combo.get())))
         
         # Save button
         def save_sales_receipt():
@@ -804,32 +833,13 @@ class Dialogs:
                     messagebox.showerror("Error", f"Sum of payment modes ({total_payment:.2f}) must equal amount received ({amount_received_now:.2f})")
                     return
                     
-                # Save receipt
-                fieldnames = ['Date', 'Customer', 'Amount Received', 'Cash', 'Cheque', 
-                            'Bank Transfer', 'Total Sales', 'Initial Paid', 
-                            'Total Paid', 'Remaining']
-                
-                file_exists = os.path.exists("sales_receipts.csv")
                 try:
-                    with open("sales_receipts.csv", mode="a", newline="", encoding='utf-8') as file:
-                        writer = csv.DictWriter(file, fieldnames=fieldnames)
-                        if not file_exists:
-                            writer.writeheader()
-                            
-                        writer.writerow({
-                            'Date': payment_date,
-                            'Customer': customer,
-                            'Amount Received': f"{amount_received_now:.2f}",
-                            'Cash': f"{cash:.2f}",
-                            'Cheque': f"{cheque:.2f}",
-                            'Bank Transfer': f"{bank_transfer:.2f}",
-                            'Total Sales': "0.00",  # Would calculate from bills
-                            'Initial Paid': "0.00",
-                            'Total Paid': f"{amount_received_now:.2f}",
-                            'Remaining': "0.00"
-                        })
+                    # Applies the payment to the customer's oldest open bills and
+                    # appends the receipt to sales_receipts.csv, or does neither
+                    balance = receivables.record_payment(customer, amount_received_now, payment_date,
+                                                         cash, cheque, bank_transfer)
                     
-                    messagebox.showinfo("Success", f"Sales receipt saved successfully!\n\nCustomer: {customer}\nAmount Received: ₹{amount_received_now:.2f}\nDate: {payment_date}")
+                    messagebox.showinfo("Success", f"Sales receipt saved successfully!\n\nCustomer: {customer}\nAmount Received: ₹{amount_received_now:.2f}\nDate: {payment_date}\nRemaining: ₹{balance['balance']:.2f}")
                     
                     # Clear the form
                     sales_customer_combo.set('')
@@ -841,9 +851,7 @@ class Dialogs:
                     bank_transfer_entry.insert(0, "0.00")
                     amount_received_now_entry.delete(0, tk.END)
                     amount_received_now_entry.insert(0, "0.00")
-                    total_amount_label.config(text="0.00")
-                    amount_paid_label.config(text="0.00")
-                    remaining_amount_label.config(text="0.00")
+                    show_balance(None)
                     
                 except Exception as e:
                     messagebox.showerror("Error", f"Failed to save receipt: {str(e)}")
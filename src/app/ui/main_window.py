@@ -1,10 +1,11 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from ..ui.components.styled_widgets import StyledButton
-from ..utils.file_operations import load_customers, save_customer_to_csv
-from ..utils.calculations import update_closing_stock
-from ..models.product import ProductModel
-from ..config.colors import COLORS, FONTS
+from ..ui.components.place_site_suggestions import (
+    get_customer_suggestions, get_place_suggestions, get_site_suggestions
+)
+from ..utils.file_operations import save_customer_to_csv
+from ..models.persistence_queue import PersistenceQueue
 
 
 class MainWindow:
@@ -166,41 +167,21 @@ class MainWindow:
     # Just update the imports in the methods:
     def update_customer_suggestions(self, event=None):
         """Update customer suggestions"""
-        try:
-            from ...utils.file_operations import load_customers
-            customers = load_customers()
-        except ImportError:
-            # Fallback if import fails
-            customers = []
-        
-        search_term = self.app.customer_name.get().lower()
-        filtered = [
-            c.get('Name', '')
-            for c in customers 
-            if search_term in c.get('Name', '').lower()
-        ]
-        
-        self.customer_name_combo['values'] = filtered
+        self.customer_name_combo['values'] = get_customer_suggestions(self.app.customer_name.get())
     
     def save_customer(self, phone, name, place="", site=""):
         """Save customer to file"""
-        try:
-            from ...utils.file_operations import save_customer_to_csv
-            save_customer_to_csv(phone, name, place, site)
-        except ImportError:
-            print("Warning: Could not import save_customer_to_csv")
+        save_customer_to_csv(phone, name, place, site)
     
     def auto_fill_customer(self, event):
         """EXACT same as your original method"""
-        selected_name = self.customer_name_combo.get()
-        customers = load_customers()
-        
-        for customer in customers:
-            if customer['Name'] == selected_name:
-                self.app.customer_phone.set(customer['Phone'])
-                self.app.place_var.set(customer.get('Place', ''))
-                self.app.site_var.set(customer.get('Site', ''))
-                break
+        from ..models.customer import CustomerModel
+        
+        customer = CustomerModel.get_customer_by_name(self.customer_name_combo.get())
+        if customer:
+            self.app.customer_phone.set(customer['Phone'])
+            self.app.place_var.set(customer.get('Place', ''))
+            self.app.site_var.set(customer.get('Site', ''))
     
     def setup_product_selection(self, parent):
         """Product Selection Section from your original code"""
@@ -251,14 +232,14 @@ class MainWindow:
     
     def get_brands(self):
         """Get unique brands from products"""
-        return sorted(set(p["Brand"] for p in self.app.products))
+        return self.app.catalog.brands()
     
     def update_product_list(self):
         """Update the product dropdown based on selected brand"""
         selected_brand = self.brand_combo.get()
         
         if selected_brand:
-            products = [p['Product Name'] for p in self.app.products if p['Brand'] == selected_brand]
+            products = [p.name for p in self.app.catalog.products_for_brand(selected_brand)]
             self.product_combo['values'] = products
             if products:
                 self.product_combo.set(products[0])
@@ -294,11 +275,8 @@ class MainWindow:
             print(f"DEBUG: BEFORE adding to bill - Product: {product_name}")
             
             # Find the product
-            product = None
-            for p in self.app.products:
-                if p["Product Name"] == product_name:
-                    product = p
-                    break
+            product = self.app.catalog.find(self.brand_combo.get(), product_name) or \
+                self.app.catalog.find_by_name(product_name)
             
             if not product:
                 from tkinter import messagebox
@@ -317,17 +295,14 @@ class MainWindow:
                 return
             
             # Get current rate based on bill type
-            if self.app.bill_type.get() == "W":
-                rate = float(product.get('Wholesale Rate', 0))
-            else:
-                rate = float(product.get('Retail Rate', 0))
+            rate = product.rate_for(self.app.bill_type.get())
                 
             amount = qty * rate
             
             # Add to bill items
-            self.app.bill_items.append({
-                "brand": product["Brand"],
-                "name": product_name,
+            self.app.bill_items.add({
+                "brand": product.brand,
+                "name": product.name,
                 "qty": qty,
                 "rate": rate,
                 "amount": amount
@@ -336,38 +311,16 @@ class MainWindow:
             print(f"DEBUG: Added {qty} x {product_name} @ {rate} = {amount}")
             
             # Update stock in products (sold stock)
-            stock_updated = False
-            for p in self.app.products:
-                if p['Product Name'] == product_name:
-                    # Get current values
-                    current_opening = int(p.get('Opening Stock', 0))
-                    current_purchased = int(p.get('Purchased Stock', 0))
-                    current_sold = int(p.get('Sold Stock', 0))
-                    current_closing = int(p.get('Closing Stock', 0))
-                    
-                    print(f"DEBUG: Before sale update - O:{current_opening} P:{current_purchased} S:{current_sold} C:{current_closing}")
-                    
-                    # Add the billed quantity to sold stock (ACCUMULATE)
-                    new_sold = current_sold + qty
-                    p['Sold Stock'] = str(int(new_sold))
-                    
-                    # Recalculate closing stock
-                    new_closing = current_opening + current_purchased - new_sold
-                    p['Closing Stock'] = str(int(new_closing))
-                    
-                    print(f"DEBUG: After sale update - O:{current_opening} P:{current_purchased} S:{new_sold} C:{new_closing}")
-                    stock_updated = True
-                    break
+            print(f"DEBUG: Before sale update - O:{product.opening_stock} P:{product.purchased_stock} S:{product.sold_stock} C:{product.closing_stock}")
+            
+            # Add the billed quantity to sold stock (ACCUMULATE); closing stock follows
+            product.sold_stock += int(qty)
+            self.app.catalog.mark_dirty(product)
             
-            # Save updated products to CSV
-            if stock_updated:
-                print("DEBUG: Attempting to save products to CSV after adding to bill...")
-                # We'll implement the save method later
-                # For now, just print
-                print("DEBUG: Products would be saved here")
+            print(f"DEBUG: After sale update - O:{product.opening_stock} P:{product.purchased_stock} S:{product.sold_stock} C:{product.closing_stock}")
             
-            # Update the bill display
-            self.update_bill()
+            # The new row is drawn by on_bill_items_changed
+            self.update_total_display()
             self.app.qty_var.set("1")  # Reset quantity to 1
             
         except Exception as e:
@@ -377,25 +330,47 @@ class MainWindow:
             import traceback
             traceback.print_exc()
 
+    @staticmethod
+    def _bill_row(sno, item):
+        # Display first 5 letters of brand name to save space
+        short_brand = item['brand'][:5] + ('...' if len(item['brand']) > 5 else '')
+        return (
+            sno,
+            short_brand,
+            item["name"],
+            f"{item['qty']:.2f}",
+            f"{item['rate']:.2f}",
+            f"{item['amount']:.2f}",
+            "❌"
+        )
+
+    def on_bill_items_changed(self, event, index, item):
+        """Patch the bill tree for one added, updated or removed line"""
+        if event == "add":
+            self.tree.insert("", tk.END, values=self._bill_row(index + 1, item))
+        elif event == "update":
+            self.tree.item(self.tree.get_children()[index], values=self._bill_row(index + 1, item))
+        elif event == "remove":
+            rows = self.tree.get_children()
+            self.tree.delete(rows[index])
+            # Only the rows below the removed one change their S.No
+            for sno, iid in enumerate(rows[index + 1:], index + 1):
+                self.tree.set(iid, "sno", sno)
+        else:
+            self.tree.delete(*self.tree.get_children())
+
     def update_bill(self):
-        """Update the bill items display - EXACT same as your original"""
-        # Clear the tree
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-            
-        # Add all bill items
-        for i, item in enumerate(self.app.bill_items, 1):
-            # Display first 5 letters of brand name to save space
-            short_brand = item['brand'][:5] + ('...' if len(item['brand']) > 5 else '')
-            self.tree.insert("", tk.END, values=(
-                i,
-                short_brand,
-                item["name"],
-                f"{item['qty']:.2f}",
-                f"{item['rate']:.2f}",
-                f"{item['amount']:.2f}",
-                "❌"
-            ))
+        """Bring the bill items display in line with the bill, touching only rows that differ"""
+        rows = list(self.tree.get_children())
+        for i, item in enumerate(self.app.bill_items):
+            values = self._bill_row(i + 1, item)
+            if i < len(rows):
+                if tuple(str(v) for v in self.tree.item(rows[i], "values")) != tuple(str(v) for v in values):
+                    self.tree.item(rows[i], values=values)
+            else:
+                self.tree.insert("", tk.END, values=values)
+        if len(rows) > len(self.app.bill_items):
+            self.tree.delete(*rows[len(self.app.bill_items):])
         
         # Update total
         self.update_total_display()
@@ -436,6 +411,10 @@ class MainWindow:
         
         self.tree.pack(fill=tk.BOTH, expand=True)
         self.tree.bind("<Double-1>", self.delete_item)
+        
+        # Rows are patched as lines are added or removed
+        if self.on_bill_items_changed not in self.app.bill_items.listeners:
+            self.app.bill_items.listeners.append(self.on_bill_items_changed)
     
     def setup_controls_section(self, parent):
         """Controls Section from your original code"""
@@ -524,8 +503,6 @@ class MainWindow:
         button_frame = tk.Frame(action_section, bg=self.COLORS['light'])
         button_frame.pack(side=tk.RIGHT, padx=10, pady=3)
         
-        from ..ui.components.styled_widgets import StyledButton
-        
         save_btn = StyledButton(button_frame, text="Save Bill", 
                             command=self.save_bill,
                             bg=self.COLORS['secondary'], fg=self.COLORS['text_light'],
@@ -537,6 +514,30 @@ class MainWindow:
                                 bg=self.COLORS['success'], fg=self.COLORS['text_light'],
                                 font=("Arial", 10, "bold"), width=15, height=1)
         receipt_btn.pack(side=tk.LEFT, padx=5)
+        
+        # Background save status
+        self.save_status_label = tk.Label(action_section, text="", font=("Arial", 9),
+                                          fg=self.COLORS['success'], bg=self.COLORS['light'])
+        self.save_status_label.pack(side=tk.RIGHT, padx=10)
+        self.update_save_status()
+    
+    def update_save_status(self):
+        """Show whether saved bills are still being written"""
+        if not self.save_status_label.winfo_exists():
+            return
+        
+        queue = PersistenceQueue.get()
+        pending = queue.pending()
+        if queue.last_error:
+            text, color = f"Save failed, retrying: {queue.last_error}", self.COLORS['danger']
+        elif queue.failed:
+            text, color = f"{queue.failed} bill(s) could not be saved; see {queue.failed_path}", self.COLORS['danger']
+        elif pending:
+            text, color = f"Saving {pending} bill(s)...", self.COLORS['warning']
+        else:
+            text, color = "All changes saved", self.COLORS['success']
+        self.save_status_label.config(text=text, fg=color)
+        self.master.after(500, self.update_save_status)
     
     def delete_item(self, event):
         """Delete item from bill - EXACT same as your original logic"""
@@ -550,23 +551,15 @@ class MainWindow:
                 deleted_item = self.app.bill_items[selected_index]
                 
                 # Update sold stock in products (reduce by deleted quantity)
-                stock_updated = False
-                for p in self.app.products:
-                    if p['Product Name'] == deleted_item['name']:
-                        sold = max(0, int(p.get('Sold Stock', 0)) - int(deleted_item['qty']))
-                        p['Sold Stock'] = str(sold)
-                        p['Closing Stock'] = str(update_closing_stock(
-                            int(p.get('Opening Stock', 0)),
-                            int(p.get('Purchased Stock', 0)),
-                            sold
-                        ))
-                        stock_updated = True
-                        print(f"DEBUG: Deleted item - {deleted_item['name']}: Reduced sold stock by {deleted_item['qty']}")
-                        break
+                p = self.app.catalog.find(deleted_item['brand'], deleted_item['name'])
+                if p:
+                    p.sold_stock = max(0, p.sold_stock - int(deleted_item['qty']))
+                    self.app.catalog.mark_dirty(p)
+                    print(f"DEBUG: Deleted item - {deleted_item['name']}: Reduced sold stock by {deleted_item['qty']}")
                 
-                # Remove from bill items
-                del self.app.bill_items[selected_index]
-                self.update_bill()
+                # Remove from bill items (the row is removed by on_bill_items_changed)
+                self.app.bill_items.remove(selected_index)
+                self.update_total_display()
     
     def edit_bill_item(self):
         """Edit selected bill item"""
@@ -574,17 +567,13 @@ class MainWindow:
     
     def update_total_display(self):
         """Update the total amount displayed based on GST inclusion"""
-        total = sum(item["amount"] for item in self.app.bill_items)
-        if self.app.include_gst.get():
-            total = total * 1.18  # Add 18% GST (9% CGST + 9% SGST)
+        total = self.app.bill_items.total(self.app.include_gst.get())
         self.total_label.config(text=f"{total:.2f}")
         self.update_remaining_amount()  # Also update remaining amount
     
     def update_remaining_amount(self, *args):
         try:
-            total = sum(item["amount"] for item in self.app.bill_items)
-            if self.app.include_gst.get():
-                total = total * 1.18  # Add 18% GST (9% CGST + 9% SGST)
+            total = self.app.bill_items.total(self.app.include_gst.get())
             
             amount_paid = float(self.app.amount_paid_var.get() or 0)
             remaining = max(0, total - amount_paid)
@@ -593,103 +582,12 @@ class MainWindow:
             self.app.remaining_amount_var.set("0.00")
     
     def save_bill(self):
-        """Save the current bill - EXACT same as your original"""
-        from tkinter import messagebox
-        import csv
-        
-        if not self.app.bill_items:
-            messagebox.showerror("Error", "No items in bill to save")
-            return
-            
-        # Generate bill number if not exists
-        if not self.app.bill_no.get():
-            self.generate_and_set_bill_number()
-            
-        filename = f"bill_{self.app.bill_no.get()}.csv"
-        try:
-            with open(filename, mode="w", newline="", encoding='utf-8') as file:
-                writer = csv.writer(file)
-                writer.writerow(["Bill No", "Date", "Customer", "Phone", "Type", "Place", "Site", "Payment Type", "Include GST"])
-                writer.writerow([
-                    self.app.bill_no.get(),
-                    self.app.current_date.get(),
-                    self.app.customer_name.get(),
-                    self.app.customer_phone.get(),
-                    "Wholesale" if self.app.bill_type.get() == "W" else "Retail",
-                    self.app.place_var.get(),
-                    self.app.site_var.get(),
-                    self.app.payment_type.get(),
-                    "Yes" if self.app.include_gst.get() else "No"
-                ])
-                
-                writer.writerow([])
-                writer.writerow(["S.No", "Brand", "Product", "Qty", "Rate", "Amount"])
-                
-                for i, item in enumerate(self.app.bill_items, 1):
-                    writer.writerow([
-                        i,
-                        item["brand"],
-                        item["name"],
-                        item["qty"],
-                        item["rate"],
-                        item["amount"]
-                    ])
-                
-                total = sum(item["amount"] for item in self.app.bill_items)
-                if self.app.include_gst.get():
-                    total = total * 1.18  # Add 18% GST
-                
-                amount_paid = float(self.app.amount_paid_var.get() or 0)
-                remaining = max(0, total - amount_paid)
-                
-                writer.writerow([])
-                writer.writerow(["Total", "", "", "", "", f"{total:.2f}"])
-                writer.writerow(["Amount Paid", "", "", "", "", f"{amount_paid:.2f}"])
-                writer.writerow(["Remaining Amount", "", "", "", "", f"{remaining:.2f}"])
-            
-            # Save customer details if provided
-            if self.app.customer_name.get() != "Cash Sale" and self.app.customer_phone.get():
-                from ..utils.file_operations import save_customer_to_csv
-                save_customer_to_csv(
-                    self.app.customer_phone.get(), 
-                    self.app.customer_name.get(),
-                    self.app.place_var.get(),
-                    self.app.site_var.get()
-                )
-            
-            # Save updated products (with sold stock)
-            from ..models.product import ProductModel
-            if ProductModel.save_products(self.app.products):
-                print("DEBUG: Products saved successfully with sold stock updates")
-                # Reload products to ensure consistency
-                self.app.load_products()
-            else:
-                print("DEBUG: Failed to save products with sold stock")
-            
-            messagebox.showinfo("Success", f"Bill saved as {filename}")
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to save bill: {str(e)}")
+        """Save the current bill"""
+        self.app.billing_ops.save_bill()
     
     def generate_and_set_bill_number(self):
         """Generate automatic bill number"""
-        import os
-        
-        # Simple sequential numbering
-        if not os.path.exists("last_bill.txt"):
-            with open("last_bill.txt", "w") as f:
-                f.write("1")
-        
-        with open("last_bill.txt", "r") as f:
-            last_number = int(f.read().strip())
-        
-        next_number = last_number + 1
-        
-        with open("last_bill.txt", "w") as f:
-            f.write(str(next_number))
-        
-        bill_number = f"{next_number:04d}"  # Format with leading zeros
-        self.app.bill_no.set(bill_number)
+        bill_number = self.app.billing_ops.generate_and_set_bill_number()
         
         # Also update bill entry if exists
         if hasattr(self, 'bill_entry') and self.bill_entry:
@@ -705,16 +603,10 @@ class MainWindow:
             messagebox.showerror("Error", "No items in bill")
             return
             
-        taxable = sum(item["amount"] for item in self.app.bill_items)
+        taxable = self.app.bill_items.subtotal
         
-        if self.app.include_gst.get():
-            cgst = taxable * 0.09
-            sgst = taxable * 0.09
-            total = taxable + cgst + sgst
-        else:
-            cgst = 0
-            sgst = 0
-            total = taxable
+        cgst, sgst = self.app.bill_items.gst(self.app.include_gst.get())
+        total = self.app.bill_items.total(self.app.include_gst.get())
         
         # Remove amount paid and remaining amount calculations for receipt
         # amount_paid = float(self.app.amount_paid_var.get() or 0)
@@ -839,7 +731,8 @@ class MainWindow:
             receipt_text = self.get_receipt_text_for_whatsapp()
             
             # Create WhatsApp URL
-            whatsapp_url = f"https://wa.me/91{phone}?text={receipt_text.replace(' ', '%20').replace('\n', '%0A')}"
+            encoded_text = receipt_text.replace(' ', '%20').replace('\n', '%0A')
+            whatsapp_url = f"https://wa.me/91{phone}?text={encoded_text}"
             
             # Open in default browser
             import webbrowser
@@ -850,16 +743,10 @@ class MainWindow:
 
     def get_receipt_text_for_whatsapp(self):
         """Get receipt text formatted for WhatsApp"""
-        taxable = sum(item['amount'] for item in self.app.bill_items)
+        taxable = self.app.bill_items.subtotal
         
-        if self.app.include_gst.get():
-            cgst = taxable * 0.09
-            sgst = taxable * 0.09
-            total = taxable + cgst + sgst
-        else:
-            cgst = 0
-            sgst = 0
-            total = taxable
+        cgst, sgst = self.app.bill_items.gst(self.app.include_gst.get())
+        total = self.app.bill_items.total(self.app.include_gst.get())
         
         receipt_lines = [
             "RITE ELECTRICALS",
@@ -914,98 +801,17 @@ class MainWindow:
 
     def save_bill_after_receipt(self):
         """Save bill after generating receipt"""
-        # This should be in billing_operations.py, but for now implement here
-        from ..models.product import ProductModel
-        import csv
-        
         if not self.app.bill_items:
             return
-            
-        filename = f"bill_{self.app.bill_no.get()}.csv"
-        try:
-            with open(filename, mode="w", newline="", encoding='utf-8') as file:
-                writer = csv.writer(file)
-                writer.writerow(["Bill No", "Date", "Customer", "Phone", "Type", "Place", "Site", "Payment Type", "Include GST"])
-                writer.writerow([
-                    self.app.bill_no.get(),
-                    self.app.current_date.get(),
-                    self.app.customer_name.get(),
-                    self.app.customer_phone.get(),
-                    "Wholesale" if self.app.bill_type.get() == "W" else "Retail",
-                    self.app.place_var.get(),
-                    self.app.site_var.get(),
-                    self.app.payment_type.get(),
-                    "Yes" if self.app.include_gst.get() else "No"
-                ])
-                
-                writer.writerow([])
-                writer.writerow(["S.No", "Brand", "Product", "Qty", "Rate", "Amount"])
-                
-                for i, item in enumerate(self.app.bill_items, 1):
-                    writer.writerow([
-                        i,
-                        item["brand"],
-                        item["name"],
-                        item["qty"],
-                        item["rate"],
-                        item["amount"]
-                    ])
-                
-                total = sum(item["amount"] for item in self.app.bill_items)
-                if self.app.include_gst.get():
-                    total = total * 1.18  # Add 18% GST
-                
-                writer.writerow([])
-                writer.writerow(["Total", "", "", "", "", f"{total:.2f}"])
-                
-            # Save customer details
-            from ..utils.file_operations import save_customer_to_csv
-            if self.app.customer_name.get() != "Cash Sale" and self.app.customer_phone.get():
-                save_customer_to_csv(
-                    self.app.customer_phone.get(), 
-                    self.app.customer_name.get(),
-                    self.app.place_var.get(),
-                    self.app.site_var.get()
-                )
-            
-            # Save updated products
-            if ProductModel.save_products(self.app.products):
-                print("DEBUG: Products saved successfully after billing receipt!")
-                # Reload products
-                self.app.load_products()
-            else:
-                print("DEBUG: FAILED to save products after billing receipt!")
-            
-            # Generate new bill number for next bill
-            self.generate_and_set_bill_number()
-            self.app.bill_items = []
-            self.update_bill()
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to save bill: {str(e)}")
+        self.app.billing_ops.save_bill_after_receipt()
+        self.update_bill()
     
     def update_place_suggestions(self, event=None):
         """Update place suggestions"""
-        from ..utils.file_operations import load_customers
-        customers = load_customers()
-        places = sorted(set(c.get('Place', '') for c in customers if c.get('Place', '')))
-        places = [p for p in places if p]  # Remove empty strings
-        
-        current_text = self.app.place_var.get().lower()
-        filtered = [p for p in places if current_text in p.lower()]
-        
         if hasattr(self, 'place_combo'):
-            self.place_combo['values'] = filtered
+            self.place_combo['values'] = get_place_suggestions(self.app.place_var.get())
 
     def update_site_suggestions(self, event=None):
         """Update site suggestions"""
-        from ..utils.file_operations import load_customers
-        customers = load_customers()
-        sites = sorted(set(c.get('Site', '') for c in customers if c.get('Site', '')))
-        sites = [s for s in sites if s]  # Remove empty strings
-        
-        current_text = self.app.site_var.get().lower()
-        filtered = [s for s in sites if current_text in s.lower()]
-        
         if hasattr(self, 'site_combo'):
-            self.site_combo['values'] = filtered
\ No newline at end of file
+            self.site_combo['values'] = get_site_suggestions(self.app.site_var.get())
\ No newline at end of file
@@ -0,0 +1,181 @@
+# src/app/utils/autocomplete.py
+import bisect
+import heapq
+import threading
+
+# Number of suggestions returned by default
+TOP_K = 10
+
+# Ranked results are cached for prefixes up to this length, and for any
+# prefix or infix query matching more than CACHE_MIN_MATCHES terms
+CACHED_PREFIX_LENGTH = 2
+CACHE_MIN_MATCHES = 200
+
+NGRAM = 3
+
+
+def _key(term):
+    return " ".join((term or "").lower().split())
+
+
+def _ngrams(key):
+    return {key[i:i + NGRAM] for i in range(len(key) - NGRAM + 1)}
+
+
+class AutocompleteIndex:
+    """Ranked suggestions for a set of terms
+
+    Prefix matches come from a sorted array of normalized terms (bisect),
+    infix matches from a trigram index. Results are ranked by weight (how
+    often the term is used), then alphabetically.
+    """
+
+    def __init__(self, terms=None, top_k=TOP_K):
+        self.top_k = top_k
+        self.lock = threading.RLock()
+        self._keys = []        # sorted normalized terms
+        self._display = {}     # normalized term -> term as first entered
+        self._weights = {}     # normalized term -> weight
+        self._ngrams = {}      # trigram -> set of normalized terms
+        self._cache = {}       # prefix -> ranked normalized terms
+        self._infix_cache = {} # query -> ranked normalized infix matches
+        self.rebuild(terms or [])
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, term):
+        return _key(term) in self._weights
+
+    def rebuild(self, terms):
+        """Replace the index with terms (a term listed n times gets weight n)"""
+        with self.lock:
+            self.clear()
+            for term in terms:
+                key = _key(term)
+                if not key:
+                    continue
+                if key in self._weights:
+                    self._weights[key] += 1
+                else:
+                    self._weights[key] = 1
+                    self._display[key] = " ".join(term.split())
+            self._keys = sorted(self._weights)
+            for key in self._keys:
+                for gram in _ngrams(key):
+                    self._ngrams.setdefault(gram, set()).add(key)
+
+    def add(self, term, weight=1):
+        """Add a term or increase its weight"""
+        key = _key(term)
+        if not key:
+            return
+        with self.lock:
+            if key in self._weights:
+                self._weights[key] += weight
+                self._promote(key)
+            else:
+                self._weights[key] = weight
+                self._display[key] = " ".join(term.split())
+                bisect.insort(self._keys, key)
+                for gram in _ngrams(key):
+                    self._ngrams.setdefault(gram, set()).add(key)
+                self._promote(key)
+
+    def discard(self, term, weight=1):
+        """Decrease a term's weight, removing it when nothing refers to it"""
+        key = _key(term)
+        with self.lock:
+            if key not in self._weights:
+                return
+            self._weights[key] -= weight
+            if self._weights[key] <= 0:
+                del self._weights[key]
+                del self._display[key]
+                del self._keys[bisect.bisect_left(self._keys, key)]
+                for gram in _ngrams(key):
+                    bucket = self._ngrams.get(gram)
+                    if bucket is not None:
+                        bucket.discard(key)
+                        if not bucket:
+                            del self._ngrams[gram]
+            self._invalidate(key)
+
+    def clear(self):
+        with self.lock:
+            self._keys = []
+            self._display = {}
+            self._weights = {}
+            self._ngrams = {}
+            self._cache = {}
+            self._infix_cache = {}
+
+    def _prefixes(self, key):
+        """Cached prefixes of a term"""
+        return [key[:length] for length in range(len(key) + 1) if key[:length] in self._cache]
+
+    def _invalidate(self, key):
+        for prefix in self._prefixes(key):
+            self._cache.pop(prefix, None)
+        self._infix_cache = {}
+
+    def _promote(self, key):
+        """Re-rank cached short-prefix results after a term gained weight"""
+        self._infix_cache = {}
+        order = lambda k: (-self._weights[k], k)
+        for prefix in self._prefixes(key):
+            ranked = self._cache.get(prefix)
+            if ranked is None:
+                continue
+            if key not in ranked:
+                ranked.append(key)
+            ranked.sort(key=order)
+            del ranked[self.top_k:]
+
+    def _rank(self, keys, limit):
+        weights = self._weights
+        return heapq.nsmallest(limit, keys, key=lambda k: (-weights[k], k))
+
+    def _prefix_matches(self, prefix):
+        start = bisect.bisect_left(self._keys, prefix)
+        end = bisect.bisect_left(self._keys, prefix + "\uffff", start)
+        return self._keys[start:end]
+
+    def _ranked_prefix(self, prefix, limit):
+        ranked = self._cache.get(prefix)
+        if ranked is not None and limit <= self.top_k:
+            return ranked[:limit]
+        matches = self._prefix_matches(prefix)
+        if limit > self.top_k:
+            return self._rank(matches, limit)
+        ranked = self._rank(matches, self.top_k)
+        if len(prefix) <= CACHED_PREFIX_LENGTH or len(matches) > CACHE_MIN_MATCHES:
+            self._cache[prefix] = ranked
+        return ranked[:limit]
+
+    def _infix_matches(self, key):
+        grams = sorted(_ngrams(key), key=lambda g: len(self._ngrams.get(g, ())))
+        if not grams:
+            return []
+        candidates = set(self._ngrams.get(grams[0], ()))
+        for gram in grams[1:]:
+            if not candidates:
+                break
+            candidates &= self._ngrams.get(gram, set())
+        return [k for k in candidates if key in k]
+
+    def suggest(self, text="", limit=None):
+        """Top terms starting with text, then (for 3+ characters) terms containing it"""
+        limit = limit or self.top_k
+        key = _key(text)
+        with self.lock:
+            results = self._ranked_prefix(key, limit)
+            if len(results) < limit and len(key) >= NGRAM:
+                infix = self._infix_cache.get(key)
+                if infix is None or limit > self.top_k:
+                    matches = [k for k in self._infix_matches(key) if not k.startswith(key)]
+                    infix = self._rank(matches, max(limit, self.top_k))
+                    if len(matches) > CACHE_MIN_MATCHES:
+                        self._infix_cache[key] = infix
+                results = results + infix[:limit - len(results)]
+            return [self._display[k] for k in results]
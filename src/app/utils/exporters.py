@@ -0,0 +1,257 @@
+# src/app/utils/exporters.py
+"""
+Streaming exports to CSV, JSON Lines and XLSX
+
+Rows come from generators over the stores and reports and are written in
+buffered batches, so an export runs in constant memory however many rows
+it has. XLSX files are written directly with zipfile (one worksheet of
+inline strings), without a spreadsheet library.
+"""
+import csv
+import json
+import os
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+FORMATS = ("csv", "jsonl", "xlsx")
+
+# Rows written per buffered batch
+BATCH_ROWS = 2000
+
+# File buffer for CSV and JSON Lines output
+BUFFER_SIZE = 1 << 20
+
+FILETYPES = [
+    ("CSV files", "*.csv"),
+    ("JSON Lines files", "*.jsonl"),
+    ("Excel workbooks", "*.xlsx")
+]
+
+_ILLEGAL_XML = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+# Characters Excel does not allow in sheet names
+_ILLEGAL_SHEET_NAME = re.compile(r"[\x00-\x1f:\\/?*\[\]]")
+
+
+def format_for(path, default="csv"):
+    """Export format from a file name's extension"""
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    if extension == "json":
+        return "jsonl"
+    return extension if extension in FORMATS else default
+
+
+def _number(value):
+    """A cell value as int/float for numeric columns (text left as is)"""
+    if isinstance(value, (int, float)):
+        return value
+    try:
+        text = str(value).replace(",", "").strip()
+        return int(text) if text.lstrip("-").isdigit() else float(text)
+    except ValueError:
+        return value
+
+
+def _batches(rows, size=BATCH_ROWS):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def write_csv(path, headers, rows, numeric=()):
+    """Write rows to a CSV file; returns the number of rows"""
+    count = 0
+    with open(path, mode="w", newline="", encoding="utf-8", buffering=BUFFER_SIZE) as file:
+        writer = csv.writer(file)
+        writer.writerow(headers)
+        for batch in _batches(rows):
+            writer.writerows(batch)
+            count += len(batch)
+    return count
+
+
+def write_jsonl(path, headers, rows, numeric=()):
+    """Write rows as one JSON object per line; returns the number of rows"""
+    numeric = set(numeric)
+    count = 0
+    with open(path, mode="w", encoding="utf-8", buffering=BUFFER_SIZE) as file:
+        for batch in _batches(rows):
+            lines = []
+            for row in batch:
+                record = {}
+                for i, (header, value) in enumerate(zip(headers, row)):
+                    record[header] = _number(value) if i in numeric else value
+                lines.append(json.dumps(record, ensure_ascii=False))
+            file.write("\n".join(lines) + "\n")
+            count += len(batch)
+    return count
+
+
+def _column_letter(index):
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _cell(ref, value, is_numeric):
+    if is_numeric:
+        value = _number(value)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return f'<c r="{ref}"><v>{value}</v></c>'
+    text = escape(_ILLEGAL_XML.sub("", "" if value is None else str(value)))
+    return f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+
+def write_xlsx(path, headers, rows, numeric=(), sheet_name="Sheet1"):
+    """Write rows to a single-sheet XLSX workbook; returns the number of rows"""
+    numeric = set(numeric)
+    letters = [_column_letter(i) for i in range(len(headers))]
+    # Excel limits the name (before escaping) to 31 characters
+    sheet_name = escape(_ILLEGAL_SHEET_NAME.sub("", sheet_name).strip("'")[:31] or "Sheet1")
+    workbook = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        f'<sheets><sheet name="{sheet_name}" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    )
+
+    count = 0
+    with zipfile.ZipFile(path, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        archive.writestr("_rels/.rels", _ROOT_RELS)
+        archive.writestr("xl/workbook.xml", workbook)
+        archive.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+
+        # The worksheet is compressed as it is written, never held whole
+        with archive.open("xl/worksheets/sheet1.xml", mode="w", force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            header_cells = "".join(_cell(f"{letters[i]}1", h, False) for i, h in enumerate(headers))
+            sheet.write(f'<row r="1">{header_cells}</row>'.encode("utf-8"))
+            for batch in _batches(rows):
+                parts = []
+                for row in batch:
+                    count += 1
+                    number = count + 1
+                    cells = "".join(
+                        _cell(f"{letters[i]}{number}", value, i in numeric)
+                        for i, value in enumerate(row[:len(letters)])
+                    )
+                    parts.append(f'<row r="{number}">{cells}</row>')
+                sheet.write("".join(parts).encode("utf-8"))
+            sheet.write(b"</sheetData></worksheet>")
+    return count
+
+
+WRITERS = {"csv": write_csv, "jsonl": write_jsonl, "xlsx": write_xlsx}
+
+
+def export_rows(path, headers, rows, numeric=(), output_format=None):
+    """Write rows to path in the format given (or implied by its extension)"""
+    output_format = output_format or format_for(path)
+    if output_format not in WRITERS:
+        raise ValueError(f"Unknown export format: {output_format}")
+    return WRITERS[output_format](path, list(headers), rows, numeric)
+
+
+# Row sources
+
+PRODUCT_HEADERS = [
+    "Brand", "Product Name", "Purchase Date", "Purchase Rate",
+    "Margin1 (%)", "Wholesale Rate", "Margin2 (%)", "Retail Rate",
+    "Opening Stock", "Purchased Stock", "Sold Stock", "Closing Stock", "Modified Date"
+]
+PRODUCT_NUMERIC = range(3, 12)
+
+STOCK_HEADERS = ["Brand", "Product Name", "Opening Stock", "Purchased Stock", "Sold Stock", "Closing Stock"]
+STOCK_NUMERIC = range(2, 6)
+
+CUSTOMER_HEADERS = ["Name", "Phone", "Place", "Site"]
+
+REPORT_NUMERIC = (8,)
+
+
+def product_rows(store):
+    """Product rows read from the product store a page at a time"""
+    from ..models.product_store import record_to_row
+    for record in store.iter_records():
+        row = record_to_row(record)
+        yield [row[header] for header in PRODUCT_HEADERS]
+
+
+def stock_rows(store):
+    """Stock summary rows read from the product store a page at a time"""
+    for brand, name, *fields in store.iter_records():
+        opening, purchased, sold = fields[6], fields[7], fields[8]
+        yield [brand, name, opening, purchased, sold, opening + purchased - sold]
+
+
+def customer_rows(customer_store):
+    """Customer rows from the customer directory"""
+    for customer in customer_store.all():
+        yield [customer.get(header, "") for header in CUSTOMER_HEADERS]
+
+
+def report_rows(report):
+    """Sales report rows followed by its TOTAL row"""
+    yield from report.rows()
+    yield report.total_row()
+
+
+def export_products(path, store, output_format=None):
+    return export_rows(path, PRODUCT_HEADERS, product_rows(store), PRODUCT_NUMERIC, output_format)
+
+
+def export_stock(path, store, output_format=None):
+    return export_rows(path, STOCK_HEADERS, stock_rows(store), STOCK_NUMERIC, output_format)
+
+
+def export_customers(path, customer_store, output_format=None):
+    return export_rows(path, CUSTOMER_HEADERS, customer_rows(customer_store), (), output_format)
+
+
+def export_report(path, report, output_format=None):
+    return export_rows(path, report.columns, report_rows(report), REPORT_NUMERIC, output_format)
@@ -0,0 +1,214 @@
+# src/app/utils/report_engine.py
+"""
+Sales report computation, independent of the UI
+
+Used by the report window and by `python -m src.app.cli report`.
+"""
+import csv
+import queue
+import threading
+from datetime import datetime, timedelta
+
+from ..models.bill_index import BillIndex
+
+REPORT_TYPES = ("daily", "fortnight", "monthly", "custom")
+
+# Bills read per page by a background report job
+PAGE_SIZE = 1000
+
+COLUMNS = ("Bill No", "Date", "Customer", "Type", "Place", "Site", "Payment Type", "Include GST", "Amount")
+
+TITLES = {
+    "daily": "Daily Sales Report",
+    "fortnight": "Fortnight Sales Report",
+    "monthly": "Monthly Sales Report",
+    "custom": "Custom Date Sales Report"
+}
+
+
+def report_range(report_type, today=None, start=None, end=None):
+    """(start date, end date) covered by a report type"""
+    today = today or datetime.now().date()
+    if report_type == "daily":
+        return today, today
+    if report_type == "fortnight":
+        return today - timedelta(days=14), today
+    if report_type == "monthly":
+        return today.replace(day=1), today
+    if report_type == "custom":
+        if start is None or end is None:
+            raise ValueError("A custom report needs a start and end date")
+        return start, end
+    raise ValueError(f"Unknown report type: {report_type}")
+
+
+def format_bill_row(bill):
+    """Report row for a bill from the index"""
+    bill_no, date, customer, bill_type, place, site, payment_type, include_gst, amount = bill
+    return (
+        bill_no,
+        date,
+        customer,
+        bill_type,
+        place,
+        site,
+        payment_type,
+        "Yes" if include_gst else "No",
+        f"{amount:.2f}"  # Amount
+    )
+
+
+class SalesReport:
+    """Bills, totals and breakdowns of sales for a date range
+
+    Rows come straight from the bill-date index and totals from the daily
+    rollups, so a month's report does not parse any bills.
+    """
+
+    def __init__(self, start_date, end_date, title="Sales Report", index=None):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.title = title
+        self.index = index or BillIndex.get()
+        self.columns = COLUMNS
+
+    @classmethod
+    def for_type(cls, report_type, start=None, end=None, today=None):
+        """Report of one of REPORT_TYPES (custom needs start and end)"""
+        start_date, end_date = report_range(report_type, today, start, end)
+        return cls(start_date, end_date, TITLES[report_type])
+
+    def bills(self):
+        """Raw bill rows (bill_no, date, customer, type, place, site, payment_type, include_gst, total)"""
+        return self.index.bills_between(self.start_date, self.end_date)
+
+    def pages(self, page_size=PAGE_SIZE):
+        """Formatted report rows in date order, a page at a time"""
+        after = None
+        while True:
+            bills, after = self.index.bills_page(self.start_date, self.end_date, after, page_size)
+            if bills:
+                yield [format_bill_row(bill) for bill in bills]
+            if len(bills) < page_size:
+                return
+
+    def rows(self):
+        """Formatted report rows, in date order"""
+        for page in self.pages():
+            yield from page
+
+    def totals(self):
+        """(number of bills, total sales)"""
+        return self.index.rollup.totals_between(self.start_date, self.end_date)
+
+    def total_row(self):
+        bills, total = self.totals()
+        return ("", "", "", "", "", "", "", "TOTAL:", f"{total:.2f}")
+
+    def breakdown(self):
+        """[(label, bills, amount)] by bill type, payment type and GST"""
+        rollup = self.index.rollup
+        breakdown = []
+        for value, count, amount in rollup.breakdown_between(self.start_date, self.end_date, "bill_type"):
+            breakdown.append((value or "Unknown", count, amount))
+        for value, count, amount in rollup.breakdown_between(self.start_date, self.end_date, "payment_type"):
+            breakdown.append((value or "Unknown", count, amount))
+        for value, count, amount in rollup.breakdown_between(self.start_date, self.end_date, "include_gst"):
+            breakdown.append(("GST" if value else "Non-GST", count, amount))
+        return breakdown
+
+    def breakdown_text(self):
+        return "  |  ".join(f"{label}: {amount:.2f} ({count})" for label, count, amount in self.breakdown())
+
+    def write_csv(self, file):
+        """Write the header, every row and the TOTAL row to an open file; returns the row count"""
+        writer = csv.writer(file)
+        writer.writerow(self.columns)
+        count = 0
+        for row in self.rows():
+            writer.writerow(row)
+            count += 1
+        writer.writerow(self.total_row())
+        return count
+
+    def write_text(self, file):
+        """Write the report as an aligned text table; returns the row count"""
+        widths = (10, 20, 25, 10, 12, 12, 12, 11, 12)
+
+        def line(values):
+            return "  ".join(str(v)[:w].ljust(w) for v, w in zip(values, widths)).rstrip() + "\n"
+
+        bills, total = self.totals()
+        file.write(f"{self.title}: {self.start_date.isoformat()} to {self.end_date.isoformat()}\n")
+        file.write(line(self.columns))
+        count = 0
+        for row in self.rows():
+            file.write(line(row))
+            count += 1
+        if not count:
+            file.write("No bills found in selected date range\n")
+        file.write(f"Total Bills: {bills}  Total Sales: {total:.2f}\n")
+        breakdown = self.breakdown_text()
+        if breakdown:
+            file.write(breakdown + "\n")
+        return count
+
+
+class ReportJob:
+    """Computes a report on a worker thread, streaming rows through a queue
+
+    Messages, in order: ("summary", (bills, total), breakdown text), then
+    ("rows", [formatted rows]) per page, then ("done", rows read),
+    ("cancelled", rows read) or ("error", message). The UI drains them
+    with poll(); cancel() stops the job after the page being read.
+    """
+
+    def __init__(self, report, page_size=PAGE_SIZE):
+        self.report = report
+        self.page_size = page_size
+        self.messages = queue.Queue()
+        self.cancelled = threading.Event()
+        self.finished = False
+        self.total = 0
+        self.read = 0
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="report-job", daemon=True)
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def _run(self):
+        report = self.report
+        try:
+            self.total, total_sales = report.totals()
+            self.messages.put(("summary", (self.total, total_sales), report.breakdown_text()))
+
+            for rows in report.pages(self.page_size):
+                if self.cancelled.is_set():
+                    break
+                self.read += len(rows)
+                self.messages.put(("rows", rows))
+
+            if self.cancelled.is_set():
+                self.messages.put(("cancelled", self.read))
+            else:
+                self.messages.put(("done", self.read))
+        except Exception as e:
+            self.messages.put(("error", str(e)))
+
+    def poll(self, limit=20):
+        """Take up to limit waiting messages without blocking"""
+        messages = []
+        while len(messages) < limit:
+            try:
+                message = self.messages.get_nowait()
+            except queue.Empty:
+                break
+            if message[0] in ("done", "cancelled", "error"):
+                self.finished = True
+            messages.append(message)
+        return messages
@@ -0,0 +1,113 @@
+# src/app/utils/sequence.py
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+BILL_NUMBER_FILE = "last_bill.txt"
+PURCHASE_NUMBER_FILE = "last_purchase_bill.txt"
+
+# Numbers reserved from the shared counter at a time. 1 keeps bill numbers
+# gap-free; a larger block lets each terminal allocate without touching the
+# file, at the cost of unused numbers when a terminal closes.
+BLOCK_SIZE = 1
+
+
+class _FileLock:
+    """Exclusive OS lock on a file, held across processes"""
+
+    def __init__(self, path):
+        self.path = path
+        self.fd = None
+
+    def __enter__(self):
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl:
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+        else:
+            # LK_LOCK retries for about 10 seconds before failing
+            msvcrt.locking(self.fd, msvcrt.LK_LOCK, 1)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if fcntl:
+                fcntl.flock(self.fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(self.fd, 0, os.SEEK_SET)
+                msvcrt.locking(self.fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self.fd)
+            self.fd = None
+
+
+class SequenceAllocator:
+    """Number sequence stored in a counter file and shared between terminals"""
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, path, block_size=BLOCK_SIZE, start=1):
+        self.path = path
+        self.block_size = max(1, int(block_size))
+        self.start = start
+        self.lock = threading.Lock()
+        self._next = 0
+        self._end = 0  # reserved block is [_next, _end)
+
+    @classmethod
+    def get(cls, path, block_size=BLOCK_SIZE):
+        """Get the shared allocator for a counter file"""
+        key = os.path.abspath(path)
+        with cls._instances_lock:
+            allocator = cls._instances.get(key)
+            if allocator is None:
+                allocator = cls(path, block_size)
+                cls._instances[key] = allocator
+            return allocator
+
+    def _read_last(self):
+        try:
+            with open(self.path, "r") as f:
+                return int(f.read().strip())
+        except (OSError, ValueError):
+            return self.start
+
+    def _write_last(self, number):
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as f:
+            f.write(str(number))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+
+    def reserve(self, count):
+        """Reserve count numbers from the counter file; returns the first"""
+        with _FileLock(f"{self.path}.lock"):
+            last = self._read_last()
+            self._write_last(last + count)
+        return last + 1
+
+    def next(self):
+        """Allocate the next number, refilling the reserved block when empty"""
+        with self.lock:
+            if self._next >= self._end:
+                self._next = self.reserve(self.block_size)
+                self._end = self._next + self.block_size
+            number = self._next
+            self._next += 1
+            return number
+
+
+def next_bill_number():
+    """Allocate the next sales bill number ("0007")"""
+    return f"{SequenceAllocator.get(BILL_NUMBER_FILE).next():04d}"
+
+
+def next_purchase_bill_number():
+    """Allocate the next purchase bill number ("P0007")"""
+    return f"P{SequenceAllocator.get(PURCHASE_NUMBER_FILE).next():04d}"
@@ -0,0 +1,92 @@
+# src/app/utils/stock_summary.py
+try:
+    import numpy as np
+except ImportError:  # summaries fall back to plain Python
+    np = None
+
+# Closing stock at or below this is flagged as low
+LOW_STOCK_THRESHOLD = 5
+
+COLUMNS = ("opening", "purchased", "sold", "purchase_rate", "wholesale_rate", "retail_rate")
+
+
+class StockColumns:
+    """Columnar copy of product stock counts and rates for fast summaries
+
+    Built once per catalog version; summaries over it are single
+    vectorized passes (NumPy when installed, otherwise one Python loop).
+    """
+
+    def __init__(self, products):
+        self.products = list(products)
+        rows = [(p.opening_stock, p.purchased_stock, p.sold_stock,
+                 p.purchase_rate, p.wholesale_rate, p.retail_rate) for p in self.products]
+        if np is not None:
+            table = np.array(rows, dtype=np.float64).reshape(len(rows), len(COLUMNS))
+            self.columns = {name: table[:, i] for i, name in enumerate(COLUMNS)}
+            self.columns["closing"] = self.columns["opening"] + self.columns["purchased"] - self.columns["sold"]
+        else:
+            self.rows = rows
+
+    def __len__(self):
+        return len(self.products)
+
+    def summary(self, low_stock=LOW_STOCK_THRESHOLD):
+        """Stock totals, stock value at purchase/wholesale/retail rates and low-stock rows"""
+        if np is not None:
+            c = self.columns
+            closing = c["closing"]
+            low = np.flatnonzero(closing <= low_stock)
+            return {
+                "products": len(self.products),
+                "opening": int(c["opening"].sum()),
+                "purchased": int(c["purchased"].sum()),
+                "sold": int(c["sold"].sum()),
+                "closing": int(closing.sum()),
+                "value_purchase": round(float(closing @ c["purchase_rate"]), 2),
+                "value_wholesale": round(float(closing @ c["wholesale_rate"]), 2),
+                "value_retail": round(float(closing @ c["retail_rate"]), 2),
+                "low_stock": low.tolist()
+            }
+
+        opening = purchased = sold = 0
+        value_purchase = value_wholesale = value_retail = 0.0
+        low = []
+        for i, (o, p, s, purchase_rate, wholesale_rate, retail_rate) in enumerate(self.rows):
+            closing = o + p - s
+            opening += o
+            purchased += p
+            sold += s
+            value_purchase += closing * purchase_rate
+            value_wholesale += closing * wholesale_rate
+            value_retail += closing * retail_rate
+            if closing <= low_stock:
+                low.append(i)
+        return {
+            "products": len(self.products),
+            "opening": opening,
+            "purchased": purchased,
+            "sold": sold,
+            "closing": opening + purchased - sold,
+            "value_purchase": round(value_purchase, 2),
+            "value_wholesale": round(value_wholesale, 2),
+            "value_retail": round(value_retail, 2),
+            "low_stock": low
+        }
+
+
+_cache = {}
+
+
+def stock_columns(catalog):
+    """Columns for a catalog, rebuilt only when the catalog has changed"""
+    cached = _cache.get(id(catalog))
+    if cached is None or cached[0] != catalog.version:
+        cached = (catalog.version, StockColumns(catalog.products))
+        _cache[id(catalog)] = cached
+    return cached[1]
+
+
+def stock_summary(catalog, low_stock=LOW_STOCK_THRESHOLD):
+    """Summary of a catalog's stock (see StockColumns.summary)"""
+    return stock_columns(catalog).summary(low_stock)
@@ -0,0 +1,5 @@
+"""
+Tests for the storage layer (run from the project root):
+
+    python -m unittest discover -s tests -t .
+"""
@@ -0,0 +1,70 @@
+# tests/support.py
+import os
+import tempfile
+import unittest
+
+from src.app.models.database import Database
+from src.app.models.sales_ledger import SalesLedger
+from src.app.models.bill_index import BillIndex
+from src.app.models.receivables import Receivables
+from src.app.models.stock_ledger import StockLedger
+from src.app.models.cost_layers import CostLayers
+from src.app.models.price_history import PriceHistory
+from src.app.models.persistence_queue import PersistenceQueue
+from src.app.models.rate_schedule import RateSchedule
+from src.app.models.customer_store import CustomerStore
+from src.app.models.product_backup import ProductBackups
+from src.app.models.product import ProductModel
+from src.app.utils.sequence import SequenceAllocator
+
+
+def reset_shared_instances():
+    """Close and forget every shared store so the next get() opens the current directory"""
+    for backups in list(ProductBackups._instances.values()):
+        if backups._worker is not None:
+            backups._worker.join()
+    for ledger in list(SalesLedger._instances.values()):
+        ledger.close()
+    for db in list(Database._instances.values()):
+        db.close()
+    for cls in (BillIndex, Receivables, StockLedger, CostLayers, PriceHistory,
+                PersistenceQueue, RateSchedule):
+        cls._instance = None
+    CustomerStore._instances.clear()
+    ProductBackups._instances.clear()
+    SequenceAllocator._instances.clear()
+    ProductModel._store = None
+
+
+def make_bill(bill_no, day, customer="A", total=100.0, paid=0.0, items=None):
+    """A bill dict as BillModel.build_bill makes it, dated day (1-28) of January 2026"""
+    return {
+        "bill_no": bill_no,
+        "date": f"{day:02d}/01/2026 10:00 AM",
+        "customer": customer,
+        "phone": "",
+        "type": "Retail",
+        "place": "",
+        "site": "",
+        "payment_type": "Cash",
+        "include_gst": False,
+        "items": items or [],
+        "total": total,
+        "amount_paid": paid,
+        "remaining": max(0.0, total - paid)
+    }
+
+
+class DataDirTestCase(unittest.TestCase):
+    """Runs each test in an empty data directory with fresh shared stores"""
+
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory()
+        os.chdir(self._tmp.name)
+        reset_shared_instances()
+
+    def tearDown(self):
+        reset_shared_instances()
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
@@ -0,0 +1,52 @@
+# tests/test_autocomplete.py
+import unittest
+
+from src.app.utils import autocomplete
+from src.app.utils.autocomplete import AutocompleteIndex
+
+
+class AutocompleteIndexTest(unittest.TestCase):
+
+    def test_prefix_matches_ignore_case_and_spacing(self):
+        index = AutocompleteIndex(["Pune", "Panvel", "  pune  camp", "Nashik"])
+        self.assertEqual(index.suggest("p"), ["Panvel", "Pune", "pune camp"])
+        self.assertEqual(index.suggest("PUNE "), ["Pune", "pune camp"])
+        self.assertEqual(index.suggest("x"), [])
+        self.assertIn("PUNE", index)
+
+    def test_infix_matches_follow_prefix_matches(self):
+        index = AutocompleteIndex(["Shivaji Nagar", "Nagar Road", "Ahmednagar", "Nagpur"])
+        self.assertEqual(index.suggest("nagar"), ["Nagar Road", "Ahmednagar", "Shivaji Nagar"])
+        self.assertEqual(index.suggest("na"), ["Nagar Road", "Nagpur"])  # infix needs 3 characters
+
+    def test_top_k_ranks_by_weight_then_name(self):
+        index = AutocompleteIndex(["Site B", "Site A", "Site C", "Site C"], top_k=2)
+        self.assertEqual(index.suggest("site"), ["Site C", "Site A"])
+        self.assertEqual(index.suggest("site", limit=3), ["Site C", "Site A", "Site B"])
+
+        index.add("Site B", weight=5)
+        self.assertEqual(index.suggest("site"), ["Site B", "Site C"])
+
+    def test_cached_results_follow_adds_and_discards(self):
+        index = AutocompleteIndex(["Asha", "Amit", "Anil"])
+        self.assertEqual(index.suggest("a"), ["Amit", "Anil", "Asha"])  # cached short prefix
+
+        index.add("Aarav")
+        index.add("Anil")
+        self.assertEqual(index.suggest("a"), ["Anil", "Aarav", "Amit", "Asha"])
+        index.discard("Anil")
+        index.discard("Amit")
+        self.assertEqual(index.suggest("a"), ["Aarav", "Anil", "Asha"])
+        self.assertNotIn("Amit", index)
+
+    def test_large_infix_results_are_cached_and_invalidated(self):
+        terms = [f"Plot {n:03d} Kharadi" for n in range(autocomplete.CACHE_MIN_MATCHES + 5)]
+        index = AutocompleteIndex(terms, top_k=3)
+        self.assertEqual(index.suggest("kharadi"), ["Plot 000 Kharadi", "Plot 001 Kharadi", "Plot 002 Kharadi"])
+
+        index.add("Plot 150 Kharadi", weight=2)
+        self.assertEqual(index.suggest("kharadi")[0], "Plot 150 Kharadi")
+
+
+if __name__ == "__main__":
+    unittest.main()
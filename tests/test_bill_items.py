@@ -0,0 +1,63 @@
+# tests/test_bill_items.py
+import random
+import unittest
+
+from src.app.models.bill_items import BillItems, ADD, UPDATE, REMOVE, CLEAR
+
+
+def item(name, qty, rate):
+    return {"brand": "Acme", "name": name, "qty": qty, "rate": rate, "amount": qty * rate}
+
+
+class BillItemsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.items = BillItems()
+        self.events = []
+        self.items.listeners.append(lambda event, index, line: self.events.append((event, index)))
+
+    def test_subtotal_follows_each_change(self):
+        self.items.add(item("Bulb", 2, 25.0))
+        self.items.append(item("Fan", 1, 1200.0))
+        self.assertEqual(self.items.subtotal, 1250.0)
+
+        self.items.update(0, qty=4)
+        self.assertEqual((self.items[0]["amount"], self.items.subtotal), (100.0, 1300.0))
+        self.items.update(1, amount=1000.0)
+        self.assertEqual(self.items.subtotal, 1100.0)
+
+        del self.items[0]
+        self.assertEqual((len(self.items), self.items.subtotal), (1, 1000.0))
+        self.items.clear()
+        self.assertEqual((len(self.items), self.items.subtotal), (0, 0.0))
+        self.assertEqual(self.events, [(ADD, 0), (ADD, 1), (UPDATE, 0), (UPDATE, 1), (REMOVE, 0), (CLEAR, None)])
+
+    def test_gst_and_total(self):
+        self.items.add(item("Bulb", 4, 25.0))
+        self.assertEqual(self.items.gst(False), (0.0, 0.0))
+        self.assertEqual(self.items.gst(True), (9.0, 9.0))
+        self.assertEqual(self.items.total(True), 118.0)
+        self.assertEqual(self.items.total(False), 100.0)
+
+    def test_negative_index_removes_from_the_end(self):
+        for name in ("A", "B", "C"):
+            self.items.add(item(name, 1, 10.0))
+        self.assertEqual(self.items.remove(-1)["name"], "C")
+        self.assertEqual(self.events[-1], (REMOVE, 2))
+        self.assertEqual([line["name"] for line in self.items], ["A", "B"])
+
+    def test_running_subtotal_matches_a_full_sum(self):
+        rng = random.Random(7)
+        for _ in range(2000):
+            choice = rng.random()
+            if choice < 0.5 or not len(self.items):
+                self.items.add(item("X", rng.randint(1, 9), round(rng.uniform(1, 500), 2)))
+            elif choice < 0.8:
+                self.items.update(rng.randrange(len(self.items)), qty=rng.randint(1, 9))
+            else:
+                self.items.remove(rng.randrange(len(self.items)))
+            self.assertAlmostEqual(self.items.subtotal, sum(line["amount"] for line in self.items), places=6)
+
+
+if __name__ == "__main__":
+    unittest.main()
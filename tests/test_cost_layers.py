@@ -0,0 +1,80 @@
+# tests/test_cost_layers.py
+import unittest
+
+from src.app.models.stock_ledger import StockLedger, PURCHASE, OPENING
+from src.app.models.cost_layers import CostLayers
+
+from .support import DataDirTestCase, make_bill
+
+
+def sale(bill_no, day, *lines):
+    return make_bill(bill_no, day, items=[{"brand": b, "name": n, "qty": q, "rate": 0, "amount": 0}
+                                          for b, n, q in lines])
+
+
+class CostLayersTest(DataDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.ledger = StockLedger.get()
+        self.layers = CostLayers.get()
+
+    def purchase(self, qty, cost, day, ref="P1"):
+        self.ledger.record(PURCHASE, "Acme", "Bulb", qty, ref, f"2026-01-{day:02d}", cost)
+
+    def test_sales_consume_the_oldest_layers_first(self):
+        self.purchase(10, 5.0, 1, "P1")
+        self.purchase(10, 7.0, 2, "P2")
+        self.ledger.record_bill(sale("0001", 3, ("Acme", "Bulb", 15)))
+
+        self.assertEqual(self.layers.bill_cogs("0001"), [("Acme", "Bulb", 15, 10 * 5.0 + 5 * 7.0)])
+        self.assertEqual(self.layers.layers("Acme", "Bulb")[0][:2], (5, 7.0))
+        self.assertEqual(self.layers.valuation(), {("Acme", "Bulb"): (5, 35.0)})
+        self.assertEqual(self.ledger.on_hand("Acme", "Bulb"), 5)
+
+    def test_incremental_layers_match_a_rebuild(self):
+        self.ledger.record(OPENING, "Acme", "Fan", 4, "baseline", "2026-01-01", 100.0)
+        self.purchase(10, 5.0, 1)
+        self.layers.valuation()  # build, then apply the rest incrementally
+        self.ledger.record_bill(sale("0001", 2, ("Acme", "Bulb", 3), ("Acme", "Fan", 1)))
+        self.purchase(6, 6.0, 3, "P2")
+        self.ledger.record_bill(sale("0002", 4, ("Acme", "Bulb", 9)))
+
+        incremental = self.layers.valuation()
+        self.layers.rebuild()
+        self.assertEqual(self.layers.valuation(), incremental)
+        self.assertEqual(incremental, {("Acme", "Bulb"): (4, 24.0), ("Acme", "Fan"): (3, 300.0)})
+
+    def test_resaved_bill_is_costed_once(self):
+        self.purchase(10, 5.0, 1, "P1")
+        self.purchase(10, 7.0, 2, "P2")
+        self.ledger.record_bill(sale("0001", 3, ("Acme", "Bulb", 12)))
+        self.assertEqual(self.layers.bill_cogs("0001"), [("Acme", "Bulb", 12, 64.0)])
+
+        self.ledger.record_bill(sale("0001", 3, ("Acme", "Bulb", 4)))
+        self.assertEqual(self.layers.bill_cogs("0001"), [("Acme", "Bulb", 4, 20.0)])
+        self.assertEqual(self.layers.valuation(), {("Acme", "Bulb"): (16, 6 * 5.0 + 10 * 7.0)})
+        self.assertEqual(self.ledger.on_hand("Acme", "Bulb"), 16)
+
+    def test_short_sale_uses_the_last_cost_and_is_offset_by_the_next_purchase(self):
+        self.purchase(2, 5.0, 1, "P1")
+        self.ledger.record_bill(sale("0001", 2, ("Acme", "Bulb", 5)))
+        self.assertEqual(self.layers.bill_cogs("0001"), [("Acme", "Bulb", 5, 25.0)])
+        self.assertEqual(self.layers.valuation(), {})
+
+        self.purchase(10, 8.0, 3, "P2")
+        self.assertEqual(self.layers.valuation(), {("Acme", "Bulb"): (7, 56.0)})
+        self.assertEqual(self.ledger.on_hand("Acme", "Bulb"), 7)
+
+    def test_period_summary(self):
+        self.purchase(10, 5.0, 1, "P1")
+        self.ledger.record_bill(sale("0001", 3, ("Acme", "Bulb", 4)))
+        self.purchase(5, 5.0, 10, "P2")
+
+        summary = self.ledger.period_summary("2026-01-02", "2026-01-05")[("Acme", "Bulb")]
+        self.assertEqual((summary["opening"], summary["purchased"], summary["sold"], summary["closing"]),
+                         (10, 0, 4, 6))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+# tests/test_customer_store.py
+import threading
+import unittest
+from unittest import mock
+
+from src.app.models import customer_store
+from src.app.models.customer_store import CustomerStore, CUSTOMERS_FILE
+
+from .support import DataDirTestCase
+
+
+class CustomerStoreTest(DataDirTestCase):
+
+    def lines(self):
+        with open(CUSTOMERS_FILE, encoding="utf-8") as file:
+            return file.read().splitlines()
+
+    def test_upsert_appends_one_row_per_change(self):
+        store = CustomerStore.get()
+        self.assertTrue(store.upsert("98765 43210", "Ravi", "Pune", "Site A"))
+        self.assertFalse(store.upsert("98765 43210", "Ravi", "Pune", "Site A"))  # unchanged
+        self.assertTrue(store.upsert("9876543210", "Ravi K", "Pune", "Site B"))
+        self.assertTrue(store.upsert("9123456780", "Asha"))
+
+        self.assertEqual(len(store), 2)
+        self.assertEqual(store.find_by_phone("+91 98765 43210")["Site"], "Site B")
+        self.assertEqual(store.find_by_name("ravi k")["Phone"], "9876543210")
+        self.assertIsNone(store.find_by_name("Ravi"))
+        self.assertEqual(len(self.lines()), 4)  # header and three appended rows
+
+    def test_compaction_keeps_the_latest_row_per_customer(self):
+        store = CustomerStore.get()
+        for number in range(5):
+            store.upsert("9876543210", f"Ravi {number}")
+        store.upsert("9123456780", "Asha")
+        store.compact()
+
+        self.assertEqual(self.lines(), ["Name,Phone,Place,Site", "Ravi 4,9876543210,,", "Asha,9123456780,,"])
+        store.upsert("9123456780", "Asha P")
+        self.assertEqual(len(self.lines()), 4)
+        self.assertEqual([c["Name"] for c in CustomerStore(CUSTOMERS_FILE).all()], ["Ravi 4", "Asha P"])
+
+    def test_rows_appended_during_compaction_are_kept(self):
+        store = CustomerStore.get()
+        other = CustomerStore(CUSTOMERS_FILE)  # another terminal
+        store.upsert("9876543210", "Ravi")
+        store.upsert("9876543210", "Ravi K")
+
+        write = customer_store.csv.DictWriter.writerows
+
+        def append_while_writing(writer, rows):
+            # Another terminal saves a customer while the compacted copy is being written
+            other.upsert("9123456780", "Asha")
+            return write(writer, rows)
+
+        with mock.patch.object(customer_store.csv.DictWriter, "writerows", append_while_writing):
+            store.compact()
+
+        self.assertEqual(self.lines(), ["Name,Phone,Place,Site", "Ravi K,9876543210,,", "Asha,9123456780,,"])
+        self.assertEqual(store.find_by_phone("9123456780")["Name"], "Asha")
+
+    def test_terminals_appending_to_a_new_file_write_one_header(self):
+        # One store per terminal, all appending their first row at once
+        stores = [CustomerStore(CUSTOMERS_FILE) for _ in range(8)]
+        start = threading.Barrier(len(stores))
+
+        def append(number, store):
+            start.wait()
+            store._append({"Name": f"C{number}", "Phone": f"98765432{number:02d}", "Place": "", "Site": ""})
+
+        threads = [threading.Thread(target=append, args=(n, s)) for n, s in enumerate(stores)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        lines = self.lines()
+        self.assertEqual(lines.count("Name,Phone,Place,Site"), 1)
+        self.assertEqual(lines[0], "Name,Phone,Place,Site")
+        self.assertEqual(len(CustomerStore(CUSTOMERS_FILE)), 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+# tests/test_exporters.py
+import csv
+import json
+import unittest
+import zipfile
+from xml.etree import ElementTree
+
+from src.app.utils import exporters
+from src.app.utils.exporters import export_rows, format_for
+
+from .support import DataDirTestCase
+
+NS = {"m": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+
+
+def read_xlsx(path):
+    """Sheet name and rows of cell values (numbers as floats) from a written workbook"""
+    with zipfile.ZipFile(path) as archive:
+        assert archive.testzip() is None
+        workbook = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+        sheet = ElementTree.fromstring(archive.read("xl/worksheets/sheet1.xml"))
+    rows = []
+    for row in sheet.iter(f"{{{NS['m']}}}row"):
+        values = {}
+        for cell in row.findall("m:c", NS):
+            if cell.get("t") == "inlineStr":
+                values[cell.get("r")] = cell.find("m:is/m:t", NS).text or ""
+            else:
+                values[cell.get("r")] = float(cell.find("m:v", NS).text)
+        rows.append(values)
+    return workbook.find("m:sheets/m:sheet", NS).get("name"), rows
+
+
+class ExportersTest(DataDirTestCase):
+
+    def test_format_follows_the_extension(self):
+        self.assertEqual([format_for(p) for p in ("a.CSV", "a.json", "a.jsonl", "a.xlsx", "a.txt")],
+                         ["csv", "jsonl", "jsonl", "xlsx", "csv"])
+        with self.assertRaises(ValueError):
+            export_rows("out.txt", ["A"], [], output_format="pdf")
+
+    def test_xlsx_cells_numbers_and_escaping(self):
+        rows = iter([
+            ["Acme & Sons", "1,250.50", 3, "<b>"],
+            ["Bell\x07", "n/a", "-2", None],
+        ])
+        count = export_rows("out.xlsx", ["Brand", "Amount", "Qty", "Note"], rows, numeric=(1, 2))
+
+        self.assertEqual(count, 2)
+        name, cells = read_xlsx("out.xlsx")
+        self.assertEqual(name, "Sheet1")
+        self.assertEqual(cells[0], {"A1": "Brand", "B1": "Amount", "C1": "Qty", "D1": "Note"})
+        self.assertEqual(cells[1], {"A2": "Acme & Sons", "B2": 1250.5, "C2": 3.0, "D2": "<b>"})
+        self.assertEqual(cells[2], {"A3": "Bell", "B3": "n/a", "C3": -2.0, "D3": ""})
+
+    def test_xlsx_streams_many_rows_and_wide_sheets(self):
+        headers = [f"C{i}" for i in range(30)]
+        rows = ([n] + ["x"] * 29 for n in range(exporters.BATCH_ROWS * 2 + 7))
+        count = exporters.write_xlsx("wide.xlsx", headers, rows, numeric=(0,), sheet_name="Stock: Jan/26")
+
+        self.assertEqual(count, exporters.BATCH_ROWS * 2 + 7)
+        name, cells = read_xlsx("wide.xlsx")
+        self.assertEqual(name, "Stock Jan26")
+        self.assertEqual(len(cells), count + 1)
+        self.assertEqual(cells[0]["AD1"], "C29")
+        self.assertEqual(cells[-1][f"A{count + 1}"], float(count - 1))
+
+    def test_sheet_names_are_made_valid_for_excel(self):
+        for given, expected in (("Sales & Returns [2026] - Jan to Dec*", "Sales & Returns 2026 - Jan to D"),
+                                ("'?'", "Sheet1")):
+            exporters.write_xlsx("named.xlsx", ["A"], [], sheet_name=given)
+            self.assertEqual(read_xlsx("named.xlsx")[0], expected)
+
+    def test_column_letters(self):
+        self.assertEqual([exporters._column_letter(i) for i in (0, 25, 26, 51, 701, 702)],
+                         ["A", "Z", "AA", "AZ", "ZZ", "AAA"])
+
+    def test_csv_and_jsonl(self):
+        rows = [["Acme", "10.50"], ["Zeta, Ltd", "7"]]
+        self.assertEqual(export_rows("out.csv", ["Brand", "Rate"], iter(rows)), 2)
+        with open("out.csv", newline="", encoding="utf-8") as file:
+            self.assertEqual(list(csv.reader(file)), [["Brand", "Rate"]] + rows)
+
+        self.assertEqual(export_rows("out.jsonl", ["Brand", "Rate"], iter(rows), numeric=(1,)), 2)
+        with open("out.jsonl", encoding="utf-8") as file:
+            self.assertEqual([json.loads(line) for line in file],
+                             [{"Brand": "Acme", "Rate": 10.5}, {"Brand": "Zeta, Ltd", "Rate": 7}])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+# tests/test_persistence_queue.py
+import json
+import os
+import time
+import unittest
+from unittest import mock
+
+from src.app.models import persistence_queue
+from src.app.models.persistence_queue import PersistenceQueue, JOURNAL_FILE, FAILED_FILE, MAX_ATTEMPTS
+from src.app.models.product import ProductModel
+from src.app.models.sales_ledger import SalesLedger
+from src.app.models.stock_ledger import StockLedger
+from src.app.models.receivables import Receivables
+
+from .support import DataDirTestCase, make_bill
+
+
+def bill_intent(intent_id, bill_no, qty=2):
+    bill = make_bill(bill_no, 3, total=50.0, items=[
+        {"brand": "Acme", "name": "Bulb", "qty": qty, "rate": 25.0, "amount": qty * 25.0}
+    ])
+    return {"id": intent_id, "kind": "bill", "bill": bill, "customer": None, "products": []}
+
+
+def product(name, sold, purchase_rate=10.0):
+    return ("Acme", name, "2026-01-01", purchase_rate, 0.0, 10.0, 0.0, 10.0, 20, 0, sold, "2026-01-01")
+
+
+def write_journal(*entries):
+    with open(JOURNAL_FILE, mode="w", encoding="utf-8") as file:
+        for entry in entries:
+            file.write(json.dumps(entry) + "\n")
+
+
+class PersistenceQueueTest(DataDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(persistence_queue, "RETRY_DELAY", 0.01)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_recover_replays_unfinished_intents(self):
+        write_journal(bill_intent(1, "0001"), bill_intent(2, "0002"), {"done": 1})
+        with open(JOURNAL_FILE, mode="a", encoding="utf-8") as file:
+            file.write('{"id": 3, "kind": "bi')  # torn final line
+
+        queue = PersistenceQueue.get()
+        self.assertEqual(queue.recover(), 1)
+
+        ledger = SalesLedger.get()
+        self.assertFalse(ledger.has_bill("0001"))  # already written before the crash
+        self.assertTrue(ledger.has_bill("0002"))
+        self.assertEqual(StockLedger.get().on_hand("Acme", "Bulb"), -2)
+        self.assertEqual(Receivables.get().balance("A")["balance"], 50.0)
+        self.assertFalse(os.path.exists(JOURNAL_FILE))
+
+    def test_replaying_twice_writes_each_bill_once(self):
+        write_journal(bill_intent(1, "0001", qty=3))
+        PersistenceQueue.get().recover()
+        write_journal(bill_intent(1, "0001", qty=3))
+        PersistenceQueue.get().recover()
+
+        self.assertEqual(SalesLedger.get().bill_count(), 1)
+        self.assertEqual(StockLedger.get().on_hand("Acme", "Bulb"), -3)
+        self.assertEqual(Receivables.get().balance("A")["bills"], 1)
+
+    def test_failed_intents_stay_journaled_until_written(self):
+        write_journal(bill_intent(1, "0001"), bill_intent(2, "0002"), bill_intent(5, "0005"), {"done": 1})
+        apply = PersistenceQueue._apply
+        failing = {"0002"}
+
+        def flaky_apply(intent):
+            if intent["bill"]["bill_no"] in failing:
+                raise OSError("disk full")
+            apply(intent)
+
+        queue = PersistenceQueue.get()
+        with mock.patch.object(PersistenceQueue, "_apply", staticmethod(flaky_apply)):
+            self.assertEqual(queue.recover(), 1)
+            self.assertEqual(queue.pending(), 1)
+            self.assertEqual(queue.last_error, "disk full")
+
+            # The failed intent is still journaled, and new ids follow every journaled id
+            with open(JOURNAL_FILE, encoding="utf-8") as file:
+                self.assertEqual([json.loads(line)["id"] for line in file], [2])
+            new_id = queue.submit_bill(make_bill("0006", 4, total=10.0))
+            self.assertEqual(new_id, 6)
+            self.assertTrue(os.path.exists(JOURNAL_FILE))
+
+            failing.clear()
+            self.assertTrue(queue.flush(timeout=5))
+
+        ledger = SalesLedger.get()
+        self.assertEqual(sorted(ledger.offsets), ["0002", "0005", "0006"])
+        self.assertFalse(os.path.exists(JOURNAL_FILE))
+
+    def test_write_that_keeps_failing_is_moved_aside(self):
+        queue = PersistenceQueue.get()
+        queue._journal({"id": 1, "kind": "refund", "bill": {}})
+        queue._next_id = 2
+        queue._queue.append({"id": 1, "kind": "refund", "bill": {}})
+        queue.submit_bill(make_bill("0002", 4, total=10.0))
+
+        self.assertTrue(queue.flush(timeout=5))
+        self.assertTrue(SalesLedger.get().has_bill("0002"))
+        self.assertFalse(os.path.exists(JOURNAL_FILE))
+        self.assertEqual((queue.failed, queue.last_error), (1, None))
+        with open(FAILED_FILE, encoding="utf-8") as file:
+            entries = [json.loads(line) for line in file]
+        self.assertEqual([entry["intent"]["id"] for entry in entries], [1])
+        self.assertTrue(entries[0]["error"].startswith("ValueError"))
+
+    def test_transient_errors_are_retried_past_the_attempt_limit(self):
+        apply = PersistenceQueue._apply
+        calls = []
+
+        def busy_apply(intent):
+            calls.append(intent["id"])
+            if len(calls) <= MAX_ATTEMPTS + 1:
+                raise OSError("database is locked")
+            apply(intent)
+
+        queue = PersistenceQueue.get()
+        with mock.patch.object(PersistenceQueue, "_apply", staticmethod(busy_apply)):
+            queue.submit_bill(make_bill("0001", 3))
+            self.assertTrue(queue.flush(timeout=5))
+
+        self.assertEqual(queue.failed, 0)
+        self.assertTrue(SalesLedger.get().has_bill("0001"))
+
+    def test_replay_keeps_products_saved_after_the_snapshot(self):
+        store = ProductModel.get_store()
+        intent = bill_intent(1, "0001")
+        intent["at"] = time.time() - 60
+        intent["products"] = [list(product("Bulb", sold=2)), list(product("Fan", sold=1))]
+        write_journal(intent)
+
+        # Bulb was saved directly after the bill was queued, Fan before it
+        store.commit([product("Bulb", sold=5, purchase_rate=12.0)])
+        with mock.patch.object(time, "time", return_value=intent["at"] - 60):
+            store.commit([product("Fan", sold=0)])
+        PersistenceQueue.get().recover()
+
+        records = {r[1]: r for r in store.load_records()}
+        self.assertEqual((records["Bulb"][3], records["Bulb"][10]), (12.0, 5))
+        self.assertEqual(records["Fan"][10], 1)
+        self.assertTrue(SalesLedger.get().has_bill("0001"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+# tests/test_price_history.py
+import unittest
+from datetime import date, datetime
+
+from src.app.models.price_history import PriceHistory
+from src.app.models.product import Product
+
+from .support import DataDirTestCase, reset_shared_instances
+
+
+def rates(purchase):
+    return {"purchase_rate": purchase, "wholesale_rate": purchase * 1.1, "retail_rate": purchase * 1.2}
+
+
+class RateAtTest(DataDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.history = PriceHistory.get()
+        self.history.record("Acme", "Bulb", "2026-01-01", rates(10.0))
+        self.history.record("Acme", "Bulb", "2026-03-01", rates(12.0))
+        self.history.record("Acme", "Bulb", "2026-02-01", rates(11.0))  # recorded out of order
+
+    def purchase_rate(self, when):
+        found = self.history.rate_at("Acme", "Bulb", when)
+        return found and found["purchase_rate"]
+
+    def test_rates_in_effect_on_a_day(self):
+        self.assertIsNone(self.purchase_rate("2025-12-31"))
+        self.assertEqual(self.purchase_rate("2026-01-01"), 10.0)
+        self.assertEqual(self.purchase_rate("2026-01-31"), 10.0)
+        self.assertEqual(self.purchase_rate(date(2026, 2, 1)), 11.0)
+        self.assertEqual(self.purchase_rate(datetime(2026, 2, 28, 18, 0)), 11.0)
+        self.assertEqual(self.purchase_rate("15/03/2026 10:00 AM"), 12.0)
+        self.assertIsNone(self.history.rate_at("Acme", "Fan", "2026-03-01"))
+
+    def test_same_day_replaces_and_unchanged_rates_are_skipped(self):
+        self.assertTrue(self.history.record("Acme", "Bulb", "2026-02-01", rates(11.5)))
+        self.assertFalse(self.history.record("Acme", "Bulb", "2026-02-10", rates(11.5)))
+        self.assertEqual([day for day, _ in self.history.versions("Acme", "Bulb")],
+                         ["2026-01-01", "2026-02-01", "2026-03-01"])
+        self.assertEqual(self.purchase_rate("2026-02-15"), 11.5)
+
+    def test_history_survives_reopening(self):
+        reset_shared_instances()
+        self.assertEqual(PriceHistory.get().rate_at("Acme", "Bulb", "2026-02-15")["purchase_rate"], 11.0)
+
+    def test_baseline_only_for_products_without_history(self):
+        products = [Product("Acme", "Bulb", "2026-01-01", purchase_rate=99.0),
+                    Product("Acme", "Fan", "2026-01-05", purchase_rate=800.0)]
+        self.assertEqual(self.history.ensure_baseline(products), 1)
+        self.assertEqual(self.history.rate_at("Acme", "Fan", "2026-01-05")["purchase_rate"], 800.0)
+        self.assertEqual(self.purchase_rate("2026-01-05"), 10.0)
+
+    def test_reprice_items_at_a_day(self):
+        items = [{"brand": "Acme", "name": "Bulb", "qty": 2, "rate": 15.0},
+                 {"brand": "Acme", "name": "Fan", "qty": 1, "rate": 900.0}]
+        priced = self.history.reprice_items(items, "2026-02-15")
+        self.assertEqual([(rate, amount) for _, rate, amount in priced], [(11.0, 22.0), (900.0, 900.0)])
+
+
+class PriceHistorySpellingTest(DataDirTestCase):
+
+    def test_respelled_product_shares_its_history(self):
+        history = PriceHistory.get()
+        history.record("Acme", "Bulb", "2026-01-01", rates(10.0))
+        history.record("ACME", " bulb", "2026-02-01", rates(12.0))
+
+        self.assertEqual([day for day, _ in history.versions("acme", "BULB")], ["2026-01-01", "2026-02-01"])
+        self.assertEqual(history.rate_at("Acme", "Bulb", "2026-02-10")["purchase_rate"], 12.0)
+        self.assertEqual(history.db.query("SELECT DISTINCT brand, product_name FROM price_history"),
+                         [("Acme", "Bulb")])
+
+    def test_spellings_recorded_apart_are_merged_on_load(self):
+        history = PriceHistory.get()
+        insert = ("INSERT INTO price_history (brand, product_name, effective_date, purchase_rate, "
+                  "wholesale_rate, retail_rate, recorded_at) VALUES (?, ?, ?, ?, 0, 0, ?)")
+        with history.db.transaction() as conn:
+            conn.execute(insert, ("Acme", "Bulb", "2026-01-01", 10.0, "2026-01-01 09:00:00"))
+            conn.execute(insert, ("acme", "bulb", "2026-01-01", 11.0, "2026-01-01 10:00:00"))
+            conn.execute(insert, ("acme", "bulb", "2026-03-01", 13.0, "2026-03-01 10:00:00"))
+        reset_shared_instances()
+
+        history = PriceHistory.get()
+        self.assertEqual([(day, r["purchase_rate"]) for day, r in history.versions("Acme", "Bulb")],
+                         [("2026-01-01", 11.0), ("2026-03-01", 13.0)])
+        self.assertEqual(history.db.query("SELECT brand, product_name, effective_date FROM price_history "
+                                          "ORDER BY effective_date"),
+                         [("Acme", "Bulb", "2026-01-01"), ("Acme", "Bulb", "2026-03-01")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+# tests/test_product_model.py
+import unittest
+
+from src.app.models.catalog import ProductCatalog
+from src.app.models.product import Product, ProductModel
+from src.app.models.stock_ledger import StockLedger, OPENING, ADJUSTMENT
+
+from .support import DataDirTestCase
+
+
+class SaveChangesTest(DataDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.catalog = ProductCatalog()
+        self.bulb = self.catalog.add(Product("Acme", "Bulb", purchase_rate=5.0, opening_stock=10))
+        self.assertTrue(ProductModel.save_changes(self.catalog, [(OPENING, "Acme", "Bulb", 10, "admin", 5.0)]))
+
+    def stored(self):
+        return {(r[0], r[1]): r for r in ProductModel.get_store().load_records()}
+
+    def test_movements_are_saved_with_the_products(self):
+        self.catalog.update(self.bulb, purchased_stock=4)
+        self.assertTrue(ProductModel.save_changes(self.catalog, [(ADJUSTMENT, "Acme", "Bulb", 4, "admin", 5.0)]))
+
+        self.assertEqual(self.stored()[("Acme", "Bulb")][9], 4)
+        self.assertEqual(StockLedger.get().on_hand("Acme", "Bulb"), 14)
+        self.assertFalse(self.catalog.has_changes())
+
+    def test_failed_movement_rolls_back_the_products(self):
+        self.catalog.update(self.bulb, purchased_stock=4)
+        self.assertFalse(ProductModel.save_changes(self.catalog, [("recount", "Acme", "Bulb", 4, "admin", 5.0)]))
+
+        self.assertEqual(self.stored()[("Acme", "Bulb")][9], 0)
+        self.assertEqual(StockLedger.get().on_hand("Acme", "Bulb"), 10)
+        self.assertTrue(self.catalog.has_changes())  # still dirty, so the next save writes it
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+# tests/test_product_store.py
+import unittest
+from unittest import mock
+
+from src.app.models.catalog import ProductCatalog
+from src.app.models.product import Product, ProductModel
+from src.app.models.product_store import ProductStore
+
+from .support import DataDirTestCase
+
+
+def record(brand, name, rate=10.0, sold=0):
+    return (brand, name, "2026-01-01", rate, 0.0, rate, 0.0, rate, 20, 0, sold, "2026-01-01")
+
+
+class ProductStoreTest(DataDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.store = ProductModel.get_store()
+
+    def stored(self):
+        return [(r[0], r[1], r[3]) for r in self.store.snapshot_records()]
+
+    def test_save_writes_only_changed_products(self):
+        catalog = ProductCatalog([Product.from_record(record("Acme", f"Item {n}")) for n in range(50)])
+        catalog.mark_dirty(*catalog)
+        self.assertTrue(ProductModel.save_changes(catalog))
+
+        catalog.update(catalog.find("Acme", "Item 7"), purchase_rate=12.0)
+        catalog.remove("Acme", "Item 9")
+        with mock.patch.object(ProductStore, "commit", wraps=self.store.commit) as commit:
+            self.assertTrue(ProductModel.save_changes(catalog))
+            self.assertTrue(ProductModel.save_changes(catalog))  # nothing left to write
+
+        commit.assert_called_once()
+        written, removed = commit.call_args[0][:2]
+        self.assertEqual([(r[0], r[1]) for r in written], [("Acme", "Item 7")])
+        self.assertEqual(removed, [("acme", "item 9")])
+        self.assertEqual(len(self.stored()), 49)
+        self.assertIn(("Acme", "Item 7", 12.0), self.stored())
+
+    def test_respelled_record_renames_the_stored_row(self):
+        self.store.commit([record("Acme", "Bulb")])
+        committed = self.store.commit([record("ACME ", "bulb", rate=11.0)])
+
+        self.assertEqual(self.stored(), [("ACME ", "bulb", 11.0)])
+        self.assertEqual(list(committed), [("acme", "bulb")])
+
+    def test_renamed_product_replaces_its_old_row(self):
+        catalog = ProductCatalog([Product.from_record(record("Acme", "Bulb"))])
+        catalog.mark_dirty(*catalog)
+        ProductModel.save_changes(catalog)
+
+        catalog.update(catalog.find("Acme", "Bulb"), name="LED Bulb")
+        self.assertTrue(ProductModel.save_changes(catalog))
+        self.assertEqual(self.stored(), [("Acme", "LED Bulb", 10.0)])
+
+    def test_duplicate_spellings_are_merged_on_the_next_write(self):
+        with self.store.db.transaction() as conn:
+            conn.execute("INSERT INTO products (brand, product_name, purchase_rate) VALUES ('Acme', 'Bulb', 10)")
+            conn.execute("INSERT INTO products (brand, product_name, purchase_rate) VALUES ('acme', 'bulb', 9)")
+        records = self.store.load_records()
+        self.assertEqual(len(records), 2)
+
+        self.store.commit([record("Acme", "Bulb", rate=12.0)])
+        self.assertEqual(self.stored(), [("Acme", "Bulb", 12.0)])
+
+    def test_sync_records_writes_only_differences(self):
+        self.store.commit([record("Acme", "Bulb"), record("Acme", "Fan"), record("Acme", "Tube")])
+        changed, removed = self.store.sync_records([record("Acme", "Bulb"), record("acme", "fan", rate=15.0)])
+
+        self.assertEqual((changed, removed), (1, 1))
+        self.assertEqual(self.stored(), [("Acme", "Bulb", 10.0), ("acme", "fan", 15.0)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+# tests/test_rate_schedule.py
+import csv
+import unittest
+from datetime import date
+
+from src.app.models.rate_schedule import RateSchedule, FUTURE_RATES_FILE
+
+from .support import DataDirTestCase
+
+
+def change(name, day, rate, brand="Acme"):
+    return {"Brand": brand, "Product Name": name, "Effective Date": day, "New Purchase Rate": f"{rate:.2f}"}
+
+
+class RateScheduleTest(DataDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.schedule = RateSchedule.get()
+
+    def due_names(self, today):
+        return [(c.product_name, c.effective_date.isoformat()) for c in self.schedule.due(today)]
+
+    def test_due_changes_come_earliest_first_and_stay_until_removed(self):
+        self.schedule.schedule(change("Fan", "2026-01-05", 900))
+        self.schedule.schedule(change("Bulb", "2026-01-03", 20))
+        self.schedule.schedule(change("Tube", "2026-02-01", 40))
+
+        self.assertEqual(self.due_names(date(2026, 1, 2)), [])
+        self.assertEqual(self.schedule.next_due(after=date(2026, 1, 2)), date(2026, 1, 3))
+        self.assertEqual(self.due_names(date(2026, 1, 10)), [("Bulb", "2026-01-03"), ("Fan", "2026-01-05")])
+        self.assertEqual(self.due_names(date(2026, 1, 10)), [("Bulb", "2026-01-03"), ("Fan", "2026-01-05")])
+        self.assertEqual(self.schedule.next_due(after=date(2026, 1, 10)), date(2026, 2, 1))
+
+        self.assertEqual(self.schedule.remove(self.schedule.due(date(2026, 1, 10))), 2)
+        self.assertEqual(self.due_names(date(2026, 1, 10)), [])
+        self.assertEqual(len(self.schedule), 1)
+
+    def test_change_due_earlier_than_those_held_is_returned_first(self):
+        self.schedule.schedule(change("Fan", "2026-01-05", 900))
+        self.schedule.due(date(2026, 1, 10))
+        self.schedule.schedule(change("Bulb", "2026-01-01", 20))
+        self.assertEqual(self.due_names(date(2026, 1, 10)), [("Bulb", "2026-01-01"), ("Fan", "2026-01-05")])
+
+    def test_scheduling_the_same_product_and_day_replaces_the_change(self):
+        first = self.schedule.schedule(change("Bulb", "2026-01-03", 20))
+        self.schedule.schedule(change("bulb", "2026-01-03", 22))
+
+        due = self.schedule.due(date(2026, 1, 3))
+        self.assertEqual([c.rates["purchase_rate"] for c in due], [22.0])
+        self.assertEqual(self.schedule.remove([first]), 0)  # replaced, so not removed
+        self.assertEqual(len(self.schedule), 1)
+
+    def test_rates_and_pending_changes_are_per_brand(self):
+        self.schedule.schedule(change("Bulb", "2026-01-03", 20))
+        self.schedule.schedule(change("Bulb", "2026-01-03", 30, brand="Zeta"))
+        self.schedule.schedule(change("Bulb", "2026-02-01", 25))
+
+        self.assertEqual(self.schedule.rates_on("Acme", "Bulb", date(2026, 1, 15))["purchase_rate"], 20.0)
+        self.assertEqual(self.schedule.rates_on("ACME", "bulb", date(2026, 2, 15))["purchase_rate"], 25.0)
+        self.assertEqual(self.schedule.rates_on("Zeta", "Bulb", date(2026, 2, 15))["purchase_rate"], 30.0)
+        self.assertIsNone(self.schedule.rates_on("Acme", "Bulb", date(2026, 1, 1)))
+        self.assertEqual(len(self.schedule.pending_changes("Acme", "Bulb")), 2)
+
+    def test_schedule_is_saved_and_reloaded(self):
+        self.schedule.schedule(change("Bulb", "2026-01-03", 20))
+        self.schedule.schedule(change("Fan", "2026-01-05", 900))
+        self.schedule.remove(self.schedule.due(date(2026, 1, 3)))
+
+        with open(FUTURE_RATES_FILE, newline="", encoding="utf-8") as file:
+            rows = list(csv.DictReader(file))
+        self.assertEqual([(r["Brand"], r["Product Name"]) for r in rows], [("Acme", "Fan")])
+        reloaded = RateSchedule(FUTURE_RATES_FILE)
+        self.assertEqual(reloaded.next_due(), date(2026, 1, 5))
+
+    def test_replaced_changes_do_not_pile_up_in_the_heap(self):
+        for rate in range(500):
+            self.schedule.schedule(change("Bulb", "2026-01-03", rate))
+        self.assertEqual(len(self.schedule), 1)
+        self.assertLess(len(self.schedule._heap), 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
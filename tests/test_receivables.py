@@ -0,0 +1,133 @@
+# tests/test_receivables.py
+import csv
+import os
+import unittest
+
+from src.app.models.sales_ledger import SalesLedger
+from src.app.models.receivables import Receivables, RECEIPTS_FILE, RECEIPT_FIELDNAMES
+
+from .support import DataDirTestCase, make_bill, reset_shared_instances
+
+
+class ReceivablesTest(DataDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.ledger = SalesLedger.get()
+        self.receivables = Receivables.get()
+
+    def save(self, bill):
+        """Save a bill the way BillModel.persist_bill does"""
+        self.ledger.append_bill(bill)
+        self.receivables.add_bill(bill)
+
+    def balances(self):
+        return self.receivables.db.query("SELECT * FROM customer_balances ORDER BY customer")
+
+    def test_bills_add_their_remaining_amount(self):
+        self.save(make_bill("0001", 3, total=100.0, paid=20.0))
+        self.save(make_bill("0002", 1, total=50.0))
+        self.save(make_bill("0003", 5, total=30.0, paid=30.0))
+        self.save(make_bill("0004", 2, customer="B", total=10.0))
+
+        balance = self.receivables.balance("A")
+        self.assertEqual((balance["bills"], balance["total_sales"], balance["initial_paid"]), (3, 180.0, 50.0))
+        self.assertEqual(balance["balance"], 130.0)
+        self.assertEqual((balance["oldest_bill_no"], balance["oldest_bill_outstanding"]), ("0002", 50.0))
+        self.assertEqual(self.receivables.balance("B")["balance"], 10.0)
+        self.assertIsNone(self.receivables.balance("Nobody"))
+
+    def test_payments_settle_the_oldest_bills_first(self):
+        self.save(make_bill("0001", 3, total=100.0, paid=20.0))
+        self.save(make_bill("0002", 1, total=50.0))
+
+        balance = self.receivables.record_payment("A", 60.0, "2026-01-10", cash=60.0)
+        self.assertEqual(balance["balance"], 70.0)
+        self.assertEqual(self.receivables.open_bills("A"), [("0001", "2026-01-03", 100.0, 70.0)])
+        self.assertEqual((balance["last_payment_date"], balance["last_payment_amount"]), ("2026-01-10", 60.0))
+
+        # A backdated receipt is applied but is not the last payment
+        balance = self.receivables.record_payment("A", 100.0, "2026-01-09", cheque=100.0)
+        self.assertEqual((balance["outstanding"], balance["credit"], balance["balance"]), (0.0, 30.0, -30.0))
+        self.assertEqual(balance["last_payment_date"], "2026-01-10")
+        self.assertEqual(self.receivables.open_bills("A"), [])
+
+    def test_credit_is_applied_to_the_next_bill(self):
+        self.receivables.record_payment("A", 40.0, "2026-01-01")
+        self.save(make_bill("0001", 2, total=25.0))
+        self.save(make_bill("0002", 3, total=25.0))
+
+        balance = self.receivables.balance("A")
+        self.assertEqual((balance["credit"], balance["outstanding"]), (0.0, 10.0))
+        self.assertEqual(self.receivables.open_bills("A"), [("0002", "2026-01-03", 25.0, 10.0)])
+
+    def test_resaved_bill_releases_its_payments(self):
+        self.save(make_bill("0001", 1, total=50.0))
+        self.save(make_bill("0002", 2, total=100.0))
+        self.receivables.record_payment("A", 60.0, "2026-01-10")
+
+        # Bill 1 is re-saved as paid in full: the receipt goes to bill 2
+        self.save(make_bill("0001", 1, total=50.0, paid=50.0))
+        balance = self.receivables.balance("A")
+        self.assertEqual((balance["bills"], balance["initial_paid"], balance["balance"]), (2, 50.0, 40.0))
+        self.assertEqual(self.receivables.open_bills("A"), [("0002", "2026-01-02", 100.0, 40.0)])
+
+        # Saving the same version again (a replayed write) changes nothing
+        before = self.balances()
+        self.save(make_bill("0001", 1, total=50.0, paid=50.0))
+        self.assertEqual(self.balances(), before)
+
+    def test_rebuild_matches_incremental_balances(self):
+        self.save(make_bill("0001", 3, total=100.0, paid=20.0))
+        self.save(make_bill("0002", 1, total=50.0))
+        self.receivables.record_payment("A", 60.0, "2026-01-10")
+        self.save(make_bill("0003", 12, total=45.0))
+        self.save(make_bill("0004", 4, customer="B", total=80.0, paid=5.0))
+        self.receivables.record_payment("B", 100.0, "2026-01-11")
+        self.save(make_bill("0002", 1, total=50.0, paid=50.0))
+
+        incremental = self.balances()
+        open_bills = self.receivables.open_bills("A")
+        self.receivables.rebuild()
+        self.assertEqual(self.balances(), incremental)
+        self.assertEqual(self.receivables.open_bills("A"), open_bills)
+
+    def test_balances_are_built_from_the_ledger_and_receipts_file(self):
+        self.save(make_bill("0001", 1, total=50.0))
+        self.save(make_bill("0002", 2, total=100.0))
+        self.receivables.record_payment("A", 60.0, "2026-01-10")
+        expected = self.balances()
+
+        # Same ledger and sales_receipts.csv, database lost
+        self.ledger.sync()
+        db_path = self.receivables.db.path
+        reset_shared_instances()
+        os.remove(db_path)
+
+        receivables = Receivables.get()
+        self.assertEqual(receivables.db.query("SELECT * FROM customer_balances ORDER BY customer"), expected)
+
+    def test_receipt_row_is_written_with_the_payment(self):
+        self.save(make_bill("0001", 1, total=50.0, paid=10.0))
+        self.receivables.record_payment("A", 15.0, "2026-01-10", cash=5.0, bank_transfer=10.0)
+
+        with open(RECEIPTS_FILE, newline="", encoding="utf-8") as file:
+            rows = list(csv.DictReader(file))
+        self.assertEqual(list(rows[0]), RECEIPT_FIELDNAMES)
+        self.assertEqual((rows[0]["Amount Received"], rows[0]["Total Sales"], rows[0]["Initial Paid"],
+                          rows[0]["Total Paid"], rows[0]["Remaining"]),
+                         ("15.00", "50.00", "10.00", "25.00", "25.00"))
+
+    def test_failed_receipt_write_rolls_back_the_payment(self):
+        self.save(make_bill("0001", 1, total=50.0))
+        before = self.balances()
+
+        with self.assertRaises(OSError):
+            self.receivables.record_payment("A", 20.0, "2026-01-10", receipts_path="missing/receipts.csv")
+
+        self.assertEqual(self.balances(), before)
+        self.assertEqual(self.receivables.db.query("SELECT COUNT(*) FROM receivable_payments"), [(0,)])
+
+
+if __name__ == "__main__":
+    unittest.main()
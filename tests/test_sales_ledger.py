@@ -0,0 +1,86 @@
+# tests/test_sales_ledger.py
+import unittest
+
+from src.app.models.sales_ledger import SalesLedger, LEDGER_FILE
+
+from .support import DataDirTestCase, make_bill
+
+
+def items(*lines):
+    return [{"brand": brand, "name": name, "qty": qty, "rate": rate, "amount": qty * rate}
+            for brand, name, qty, rate in lines]
+
+
+class SalesLedgerTest(DataDirTestCase):
+
+    def reopen(self, ledger):
+        ledger.close()
+        return SalesLedger.get()
+
+    def test_append_and_read(self):
+        ledger = SalesLedger.get()
+        bill = make_bill("0001", 3, total=50.0, paid=20.0, items=items(("Acme", "Bulb", 2, 25.0)))
+        ledger.append_bill(bill)
+
+        saved = ledger.get_bill("0001")
+        self.assertEqual(saved["customer"], "A")
+        self.assertEqual(saved["total"], 50.0)
+        self.assertEqual(saved["remaining"], 30.0)
+        self.assertEqual(saved["items"], [{"brand": "Acme", "name": "Bulb", "qty": 2.0, "rate": 25.0, "amount": 50.0}])
+        self.assertTrue(ledger.has_bill("0001"))
+        self.assertIsNone(ledger.get_bill("0002"))
+
+    def test_bills_survive_reopening(self):
+        ledger = SalesLedger.get()
+        for number in range(1, 6):
+            ledger.append_bill(make_bill(f"{number:04d}", number, items=items(("Acme", "Bulb", number, 1.0))))
+
+        ledger = self.reopen(ledger)
+        self.assertEqual(ledger.bill_count(), 5)
+        self.assertEqual([b["bill_no"] for b in ledger.iter_bills()], ["0001", "0002", "0003", "0004", "0005"])
+        self.assertEqual(ledger.get_bill("0004")["items"][0]["qty"], 4.0)
+
+    def test_resaved_bill_replaces_the_earlier_version(self):
+        ledger = SalesLedger.get()
+        ledger.append_bill(make_bill("0001", 3, total=50.0, items=items(("Acme", "Bulb", 2, 25.0))))
+        ledger.append_bill(make_bill("0002", 4, total=10.0))
+        resaved = make_bill("0001", 3, total=75.0, items=items(("Acme", "Bulb", 3, 25.0)))
+        ledger.append_bill(resaved)
+
+        self.assertEqual(ledger.bill_count(), 2)
+        self.assertEqual(ledger.get_bill("0001")["total"], 75.0)
+        self.assertTrue(ledger.has_same_bill(resaved))
+        self.assertEqual([b["bill_no"] for b in ledger.iter_bills()], ["0002", "0001"])
+
+        ledger = self.reopen(ledger)
+        self.assertEqual(ledger.get_bill("0001")["items"][0]["qty"], 3.0)
+
+    def test_torn_write_is_skipped_and_later_bills_are_read(self):
+        ledger = SalesLedger.get()
+        ledger.append_bill(make_bill("0001", 3, items=items(("Acme", "Bulb", 1, 1.0))))
+        ledger.close()
+        with open(LEDGER_FILE, mode="ab") as file:
+            file.write(b"H,0002,04/01/2026 10:00 AM,A,,Ret")  # crashed mid-write
+
+        ledger = SalesLedger.get()
+        self.assertEqual(ledger.bill_count(), 1)
+        ledger.append_bill(make_bill("0003", 5, items=items(("Acme", "Fan", 1, 9.0))))
+
+        ledger = self.reopen(ledger)
+        self.assertEqual(sorted(ledger.offsets), ["0001", "0003"])
+        self.assertEqual(ledger.get_bill("0003")["items"][0]["name"], "Fan")
+
+    def test_bills_appended_without_the_index_are_recovered(self):
+        ledger = SalesLedger.get()
+        ledger.append_bill(make_bill("0001", 3))
+        ledger.append_bill(make_bill("0002", 4))
+        ledger.close()
+        open(ledger.index_path, mode="w").close()  # index lost, ledger intact
+
+        ledger = SalesLedger.get()
+        self.assertEqual(ledger.bill_count(), 2)
+        self.assertEqual(ledger.get_bill("0002")["bill_no"], "0002")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+# tests/test_sequence.py
+import multiprocessing
+import threading
+import unittest
+
+from src.app.utils.sequence import SequenceAllocator, next_bill_number, BILL_NUMBER_FILE
+
+from .support import DataDirTestCase
+
+
+def allocate(path, count, results=None):
+    numbers = [SequenceAllocator(path).next() for _ in range(count)]
+    if results is not None:
+        results.put(numbers)
+    return numbers
+
+
+class SequenceAllocatorTest(DataDirTestCase):
+
+    def last(self):
+        with open(BILL_NUMBER_FILE) as file:
+            return int(file.read())
+
+    def test_numbers_follow_the_counter_file(self):
+        self.assertEqual([next_bill_number() for _ in range(3)], ["0002", "0003", "0004"])
+        self.assertEqual(self.last(), 4)
+
+        with open(BILL_NUMBER_FILE, "w") as file:
+            file.write("41")
+        self.assertEqual(next_bill_number(), "0042")
+
+    def test_threads_sharing_an_allocator_get_distinct_numbers(self):
+        allocator = SequenceAllocator.get(BILL_NUMBER_FILE)
+        numbers = []
+
+        def take():
+            for _ in range(50):
+                numbers.append(allocator.next())
+
+        threads = [threading.Thread(target=take) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(numbers), list(range(2, 402)))
+        self.assertEqual(self.last(), 401)
+
+    def test_terminals_with_their_own_allocators_get_distinct_numbers(self):
+        threads = [threading.Thread(target=allocate, args=(BILL_NUMBER_FILE, 25)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.last(), 101)
+
+    @unittest.skipUnless("fork" in multiprocessing.get_all_start_methods(), "needs fork")
+    def test_processes_get_distinct_numbers(self):
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+        processes = [context.Process(target=allocate, args=(BILL_NUMBER_FILE, 25, results)) for _ in range(4)]
+        for process in processes:
+            process.start()
+        numbers = [n for _ in processes for n in results.get(timeout=30)]
+        for process in processes:
+            process.join()
+
+        self.assertEqual(sorted(numbers), list(range(2, 102)))
+
+    def test_blocks_reserved_by_two_terminals_do_not_overlap(self):
+        first = SequenceAllocator(BILL_NUMBER_FILE, block_size=10)
+        second = SequenceAllocator(BILL_NUMBER_FILE, block_size=10)
+        self.assertEqual([first.next(), second.next(), first.next()], [2, 12, 3])
+        self.assertEqual(self.last(), 21)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+# tests/test_stock_ledger.py
+import unittest
+
+from src.app.models.stock_ledger import StockLedger, PURCHASE, ADJUSTMENT
+from src.app.models.cost_layers import CostLayers
+
+from .support import DataDirTestCase, make_bill, reset_shared_instances
+
+
+class StockLedgerSpellingTest(DataDirTestCase):
+
+    def test_respelled_product_keeps_one_balance(self):
+        ledger = StockLedger.get()
+        ledger.record(PURCHASE, "Acme", "Bulb", 10, "P1", "2026-01-01", 5.0)
+        ledger.record(ADJUSTMENT, "acme", " BULB ", -2, "admin", "2026-01-02")
+        ledger.record_bill(make_bill("0001", 3, items=[{"brand": "ACME", "name": "bulb", "qty": 3}]))
+
+        self.assertEqual(ledger.on_hand("Acme", "Bulb"), 5)
+        self.assertEqual(ledger.on_hand("acme", "bulb"), 5)
+        self.assertEqual(len(ledger.movements("ACME", "BULB")), 3)
+        self.assertEqual(list(ledger.period_summary("2026-01-01", "2026-01-31")), [("Acme", "Bulb")])
+        self.assertEqual(CostLayers.get().layers("acme", "bulb")[0][:2], (5, 5.0))
+
+    def test_spellings_recorded_apart_are_merged_on_open(self):
+        ledger = StockLedger.get()
+        ledger.record(PURCHASE, "Acme", "Bulb", 10, "P1", "2026-01-01", 5.0)
+        with ledger.db.transaction() as conn:
+            # A second spelling, as recorded before products were matched by key
+            conn.execute("INSERT INTO stock_movements (ts, brand, product_name, kind, qty, ref) "
+                         "VALUES ('2026-01-02 00:00:00', 'acme', 'bulb', 'adjustment', 4, 'admin')")
+            conn.execute("INSERT INTO stock_balances (brand, product_name, adjusted) VALUES ('acme', 'bulb', 4)")
+        reset_shared_instances()
+
+        ledger = StockLedger.get()
+        self.assertEqual(ledger.db.query("SELECT brand, product_name, purchased, adjusted FROM stock_balances"),
+                         [("Acme", "Bulb", 10, 4)])
+        self.assertEqual(ledger.on_hand("acme", "bulb"), 14)
+        self.assertEqual({m[0:2] for m in ledger.db.query("SELECT brand, product_name FROM stock_movements")},
+                         {("Acme", "Bulb")})
+
+
+if __name__ == "__main__":
+    unittest.main()